@@ -206,7 +206,10 @@ setup(
     entry_points={
         'console_scripts': [
             'rafcon_start = rafcon.core.start:main',
-            'rafcon_core = rafcon.core.start:main'
+            'rafcon_core = rafcon.core.start:main',
+            'rafcon_convert_execution_log = rafcon.utils.execution_log_stream:main',
+            'rafcon_execution_log_summary = rafcon.utils.execution_log_analytics:main',
+            'rafcon_pack_state_machine = rafcon.core.storage.packed_storage:main'
         ],
         'gui_scripts': [
             'rafcon_execution_log_viewer = rafcon.gui.execution_log_viewer:main',
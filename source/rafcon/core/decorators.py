@@ -27,13 +27,22 @@ def wraps_safely(obj, attr_names=functools.WRAPPER_ASSIGNMENTS):
 global_lock_counter = 0
 
 
-def lock_state_machine(func):
+def lock_state_machine(func=None, invalidate_hash=True):
+    """ Decorate method to observable core edit methods. If the core method of rafcon core object is called
+    the respective state machine object edition will be locked by the respective thread until the handed function
+    execution is finished.
+
+    Can be used as ``@lock_state_machine`` or with arguments as ``@lock_state_machine(invalidate_hash=False)``.
+
+    :param func: the decorated method
+    :param bool invalidate_hash: whether the method modifies data of the state, which is part of its hash digest (see
+        :meth:`rafcon.core.states.state.State.invalidate_hash`); False for methods only changing runtime data
+    """
+    if func is None:
+        return functools.partial(lock_state_machine, invalidate_hash=invalidate_hash)
+
     @wraps_safely(func)
     def func_wrapper(*args, **kwargs):
-        """ Decorate method to observable core edit methods. If the core method of rafcon core object is called
-        the respective state machine object edition will be locked by the respective thread until the handed function
-        execution is finished.
-        """
         from rafcon.core.state_elements.state_element import StateElement
         from rafcon.core.states.state import State
         global global_lock_counter
@@ -54,6 +63,12 @@ def lock_state_machine(func):
             # logger.debug("Exception occurred during execution of function {0}. ".format(str(func)))
             raise
         finally:
+            # the cached digest of the modified state is outdated, it is invalidated before the lock is released
+            if invalidate_hash:
+                if isinstance(self_reference, State):
+                    self_reference.invalidate_hash()
+                elif isinstance(self_reference, StateElement) and isinstance(self_reference.parent, State):
+                    self_reference.parent.invalidate_hash()
             if target_state_machine:
                 target_state_machine.release_modification_lock()
                 global_lock_counter -= 1
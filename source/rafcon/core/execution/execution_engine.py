@@ -28,6 +28,7 @@ import sys
 from gtkmvc import Observable
 from rafcon.core.execution.execution_status import ExecutionStatus
 from rafcon.core.execution.execution_status import StateMachineExecutionStatus
+from rafcon.core.config import global_config
 from rafcon.utils import log
 from rafcon.utils import plugins
 
@@ -197,6 +198,11 @@ class ExecutionEngine(Observable):
         """Store running state machine and observe its status
         """
 
+        # The pool executing the child states is configured once per execution
+        import rafcon.core.singleton
+        rafcon.core.singleton.state_thread_pool.max_idle_workers = \
+            global_config.get_config_value("EXECUTION_THREAD_POOL_SIZE", 0)
+
         # Create new concurrency queue for root state to be able to synchronize with the execution
         self.__running_state_machine = self.state_machine_manager.get_active_state_machine()
         self.__running_state_machine.root_state.concurrency_queue = Queue.Queue(maxsize=0)
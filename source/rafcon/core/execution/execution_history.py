@@ -19,39 +19,306 @@
 """
 import time
 import copy
+import hashlib
 from collections import Iterable, Sized
 import json
 from jsonconversion.decoder import JSONObjectDecoder
 from jsonconversion.encoder import JSONObjectEncoder
 
 import shelve
-from threading import Lock
+import Queue
+from threading import Lock, Thread
 from enum import Enum
 from gtkmvc import Observable
 import traceback
 
 from rafcon.core.id_generator import history_item_id_generator
+from rafcon.core.config import global_config
 from rafcon.utils import log
+from rafcon.utils import storage_utils
+from rafcon.utils.type_helpers import copy_value
+from rafcon.utils.execution_log import get_start_definition_path
+from rafcon.utils.execution_log_stream import ExecutionLogStreamWriter
 logger = log.get_logger(__name__)
 import os
 import subprocess
 import pickle
 from weakref import ref
 
+# the number of distinct state machine start definitions kept in memory
+MAX_CACHED_START_DEFINITIONS = 32
+
+_start_definitions_lock = Lock()
+# the last snapshot of the environment variables and its digest
+_environment_snapshot = None, None
+# maps the content hash of a start definition to the definition
+_start_definitions = {}
+
+
+def _get_environment_snapshot():
+    """Returns a snapshot of the environment variables and its digest
+
+    The snapshot is only created again if the environment variables changed since the last call.
+
+    :return: the environment variables and their digest
+    :rtype: dict, str
+    """
+    global _environment_snapshot
+    environment, environment_digest = _environment_snapshot
+    if environment is None or environment != os.environ:
+        environment = dict(os.environ)
+        obj_hash = hashlib.sha256()
+        for key, value in sorted(environment.iteritems()):
+            obj_hash.update(key + "=" + value + "\0")
+        environment_digest = obj_hash.digest()
+        _environment_snapshot = environment, environment_digest
+    return environment, environment_digest
+
+
+def get_start_definition(state_machine):
+    """Returns the definition of a state machine at the start of its execution
+
+    The definition consists of the meta data of the state machine (see
+    :meth:`rafcon.core.state_machine.StateMachine.state_machine_to_dict`) and the environment variables. It is
+    identified by a content hash, which also covers the root state (see
+    :attr:`rafcon.core.states.state.State.hash_digest`). Starts with the same content share the same definition.
+
+    :param rafcon.core.state_machine.StateMachine state_machine: the state machine being started
+    :return: the content hash and the definition with the keys "state_machine" and "os_environment", which must not
+        be modified
+    :rtype: str, dict
+    """
+    from rafcon.core.state_machine import StateMachine
+    sm_dict = StateMachine.state_machine_to_dict(state_machine)
+    obj_hash = hashlib.sha256(state_machine.root_state.hash_digest)
+    for key, value in sorted(sm_dict.iteritems()):
+        obj_hash.update("{0}={1!r}\0".format(key, value))
+    with _start_definitions_lock:
+        environment, environment_digest = _get_environment_snapshot()
+        obj_hash.update(environment_digest)
+        definition_hash = obj_hash.hexdigest()
+        definition = _start_definitions.get(definition_hash)
+        if definition is None:
+            if len(_start_definitions) >= MAX_CACHED_START_DEFINITIONS:
+                _start_definitions.clear()
+            definition = _start_definitions[definition_hash] = {'state_machine': sm_dict,
+                                                                'os_environment': environment}
+    return definition_hash, definition
+
 
 class ExecutionHistoryStorage(object):
-    def __init__(self, filename):
+    """Stores the records of history items in a shelve file or in an append-only log file of the stream format (see
+    :mod:`rafcon.utils.execution_log_stream`)
+
+    If the storage is asynchronous, the records of history items are created by the executing thread, as the data
+    of the states can change afterwards, and handed over to a writer thread, which writes them in batches. Thus, the
+    executing states are not delayed by the file operations. Records waiting to be written are kept in memory, so
+    that they can be read without waiting for the writer thread. The size of the queue of the writer thread is
+    limited. If the queue is full, the executing thread either waits until the writer thread catches up (policy
+    "block") or the history item is not stored (policy "drop").
+
+    :ivar str filename: the path of the log file
+    :ivar str log_format: the format of the log file, either "shelve" or "stream"
+    :ivar bool asynchronous: whether history items are written by a writer thread
+    :ivar int max_queue_depth: the maximum number of history items waiting to be written so far
+    :ivar int number_of_dropped_items: the number of history items not stored due to a full queue
+    """
+
+    WRITER_BATCH_SIZE = 100
+
+    def __init__(self, filename, asynchronous=None, log_format=None):
         self.filename = filename
         self.store_lock = Lock()
+        # the paths of the start definition files known to exist, the files can be deleted along with the log files
+        # of other storages
+        self._stored_start_definitions = set()
+        if log_format is None:
+            log_format = global_config.get_config_value("EXECUTION_LOG_FORMAT", "shelve")
+        self.log_format = log_format
         try:
-            # 'c' for read/write/create
-            # protocol 2 cause of in some cases smaller file size
-            # writeback disabled, cause we don't need caching of entries in memory but continuous writes to the disk
-            self.store = shelve.open(filename, flag='c', protocol=2, writeback=False)
+            if self.log_format == "stream":
+                self.store = ExecutionLogStreamWriter(filename)
+            else:
+                # 'c' for read/write/create
+                # protocol 2 cause of in some cases smaller file size
+                # writeback disabled, cause we don't need caching of entries in memory but continuous writes to the
+                # disk
+                self.store = shelve.open(filename, flag='c', protocol=2, writeback=False)
             logger.debug('Openend log file for writing %s' % self.filename)
         except Exception as e:
             logger.error('Exception: ' + str(e) + str(traceback.format_exc()))
 
+        if asynchronous is None:
+            asynchronous = global_config.get_config_value("EXECUTION_LOG_ASYNC", False)
+        self.asynchronous = asynchronous
+        self.max_queue_depth = 0
+        self.number_of_dropped_items = 0
+        self._writer_thread = None
+        # the records handed over to the writer thread, which are not written, yet
+        self._queued_records = {}
+        self._queued_records_lock = Lock()
+        if self.asynchronous:
+            self._flush_interval = global_config.get_config_value("EXECUTION_LOG_FLUSH_INTERVAL", 1.)
+            self._block_if_full = global_config.get_config_value("EXECUTION_LOG_QUEUE_FULL_POLICY", "block") != "drop"
+            self._queue = Queue.Queue(maxsize=max(0, global_config.get_config_value("EXECUTION_LOG_QUEUE_SIZE",
+                                                                                    10000)))
+            self._writer_thread = Thread(target=self._write_queued_items, name="ExecutionLogWriter")
+            self._writer_thread.daemon = True
+            self._writer_thread.start()
+
+    @property
+    def queue_depth(self):
+        """The number of history items waiting to be written
+
+        :rtype: int
+        """
+        return self._queue.qsize() if self.asynchronous else 0
+
+    def store_history_item(self, history_item):
+        """Stores the record of a history item
+
+        The record is always created by the calling thread, in the asynchronous case it is written by the writer
+        thread.
+
+        :param HistoryItem history_item: the history item to be stored
+        """
+        prev_history_item_id = history_item.prev.history_item_id if history_item.prev is not None else None
+        key = history_item.history_item_id
+        if self._writer_thread is None:
+            record = self._history_item_to_record(history_item, prev_history_item_id)
+            if isinstance(history_item, StateMachineStartItem):
+                record = self._add_start_definition(history_item, record)
+            self.store_item(key, record)
+            return
+        try:
+            record = self._history_item_to_record(history_item, prev_history_item_id)
+        except Exception as e:
+            logger.error('Exception: ' + str(e) + str(traceback.format_exc()))
+            return
+        # the definition of a start item does not change, the writer thread stores it
+        start_item = history_item if isinstance(history_item, StateMachineStartItem) else None
+        if start_item is not None:
+            # published records are never modified, thus the reference to the definition is added beforehand
+            record['definition_path'] = get_start_definition_path(self.filename, start_item.definition_hash)
+        with self._queued_records_lock:
+            self._queued_records[key] = record
+        try:
+            self._queue.put((key, record, start_item), block=self._block_if_full)
+        except Queue.Full:
+            with self._queued_records_lock:
+                self._queued_records.pop(key, None)
+            if not self.number_of_dropped_items:
+                logger.warning("The execution log queue of {0} is full, history items are dropped".format(
+                    self.filename))
+            self.number_of_dropped_items += 1
+            return
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    @staticmethod
+    def _history_item_to_record(history_item, prev_history_item_id):
+        if isinstance(history_item, StateMachineStartItem):
+            record = history_item.to_dict(include_definition=False)
+        else:
+            record = history_item.to_dict()
+        # the links of history items can be changed afterwards, when old items are evicted from the history
+        record['prev_history_item_id'] = prev_history_item_id
+        return record
+
+    def _add_start_definition(self, start_item, record):
+        """Stores the definition of a state machine start and references it in a copy of the record of the start item
+
+        If the definition cannot be stored, the copy holds the definition itself. The passed record is not modified.
+
+        :param StateMachineStartItem start_item: the start item holding the definition
+        :param dict record: the record of the start item
+        :return: the record to be stored
+        :rtype: dict
+        """
+        record = dict(record)
+        try:
+            record['definition_path'] = self._store_start_definition(start_item)
+        except (IOError, OSError, ValueError) as e:
+            logger.warning("Could not store the definition of the state machine start: {0}".format(e))
+            record.pop('definition_path', None)
+            record.update(start_item.to_dict())
+        return record
+
+    def _store_start_definition(self, start_item):
+        """Stores the definition of a state machine start next to the log file, once per content hash
+
+        :param StateMachineStartItem start_item: the start item holding the definition
+        :return: the path of the definition file
+        :rtype: str
+        """
+        definition_path = get_start_definition_path(self.filename, start_item.definition_hash)
+        if definition_path not in self._stored_start_definitions:
+            if not os.path.isfile(definition_path):
+                if not os.path.isdir(os.path.dirname(definition_path)):
+                    os.makedirs(os.path.dirname(definition_path))
+                # other processes might write the same definition concurrently
+                tmp_definition_path = "{0}.{1}.tmp".format(definition_path, os.getpid())
+                storage_utils.write_dict_to_json(start_item.definition, tmp_definition_path)
+                os.rename(tmp_definition_path, definition_path)
+            self._stored_start_definitions.add(definition_path)
+        return definition_path
+
+    def _write_queued_items(self):
+        """Writes the history items of the queue in batches until the storage is closed"""
+        last_sync = time.time()
+        unsynced_records = False
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self._flush_interval)]
+            except Queue.Empty:
+                batch = []
+            while batch and len(batch) < self.WRITER_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Queue.Empty:
+                    break
+            records = []
+            for queue_entry in batch:
+                if queue_entry is None:  # the storage is closed
+                    running = False
+                    continue
+                key, record, start_item = queue_entry
+                if start_item is not None:
+                    record = self._add_start_definition(start_item, record)
+                records.append((key, record))
+            number_of_entries = len(batch)
+            batch = None  # explicitly drop the references to the start items
+            with self.store_lock:
+                try:
+                    for key, record in records:
+                        self.store[key] = record
+                    unsynced_records = unsynced_records or bool(records)
+                    if unsynced_records and time.time() - last_sync >= self._flush_interval:
+                        self.store.sync()
+                        unsynced_records = False
+                        last_sync = time.time()
+                except Exception as e:
+                    logger.error('Exception: ' + str(e) + str(traceback.format_exc()))
+                # the records are only removed after they were written, so that readers find them in either place
+                with self._queued_records_lock:
+                    for key, _ in records:
+                        self._queued_records.pop(key, None)
+            for _ in range(number_of_entries):
+                self._queue.task_done()
+
+    def wait_for_queued_items(self):
+        """Blocks until all history items handed over to the writer thread are written"""
+        if self._writer_thread is not None:
+            self._queue.join()
+
+    def _stop_writer_thread(self):
+        if self._writer_thread is not None:
+            self._queue.put(None)
+            self._writer_thread.join()
+            self._writer_thread = None
+            logger.debug("Execution log writer of {0} stopped (maximum queue depth: {1}, dropped items: {2})"
+                         "".format(self.filename, self.max_queue_depth, self.number_of_dropped_items))
+
     def store_item(self, key, value):
         self.store_lock.acquire()
         try:
@@ -61,11 +328,37 @@ class ExecutionHistoryStorage(object):
         finally:
             self.store_lock.release()
 
+    def get_item(self, key):
+        """Reads a stored history item record
+
+        Records waiting to be written by the writer thread are served from memory.
+
+        :param str key: the history item id of the record
+        :return: the record or None, if no record is stored for the key
+        :rtype: dict
+        """
+        with self._queued_records_lock:
+            record = self._queued_records.get(key)
+            if record is not None:
+                return dict(record)
+        self.store_lock.acquire()
+        try:
+            return self.store.get(key)
+        except Exception as e:
+            logger.error('Exception: ' + str(e) + str(traceback.format_exc()))
+        finally:
+            self.store_lock.release()
+
     def flush(self):
+        self.wait_for_queued_items()
         self.store_lock.acquire()
         try:
-            self.store.close()
-            self.store = shelve.open(self.filename, flag='c', protocol=2, writeback=False)
+            if self.log_format == "stream":
+                # the stream format is append-only, thus it cannot be closed and reopened
+                self.store.sync()
+            else:
+                self.store.close()
+                self.store = shelve.open(self.filename, flag='c', protocol=2, writeback=False)
             logger.debug('Flushed log file %s' % self.filename)
         except Exception as e:
             logger.error('Exception: ' + str(e) + str(traceback.format_exc()))
@@ -73,8 +366,10 @@ class ExecutionHistoryStorage(object):
             self.store_lock.release()
 
     def close(self, make_read_and_writable_for_all=False):
+        self._stop_writer_thread()
         self.store_lock.acquire()
         try:
+            self._stored_start_definitions.clear()
             self.store.close()
             logger.debug('Closed log file %s' % self.filename)
             if make_read_and_writable_for_all:
@@ -104,16 +399,35 @@ class ExecutionHistory(Observable, Iterable, Sized):
 
         It stores all history elements in a stack wise fashion.
 
+        If a maximum number of items is configured (EXECUTION_HISTORY_MAX_ITEMS), the history only keeps a window of
+        the most recent items in memory. Older items are evicted, except for the start item and the call items of all
+        states that are still running or whose return item is still within the window. Thus, backward stepping works
+        within the window. Evicted items remain available in the execution history storage, if execution logging is
+        enabled (see :meth:`get_evicted_history_item_records`).
+
         :ivar initial_prev: optional link to a previous element for the first element pushed into this history of
                             type :class:`rafcon.core.execution.execution_history.HistoryItem`
+        :ivar int max_items: the maximum number of items kept in memory, 0 if unlimited
+        :ivar int number_of_evicted_items: the number of items removed from memory so far
+        :ivar int number_of_popped_items: the number of items removed by backward steps so far
     """
 
-    def __init__(self, initial_prev=None):
+    def __init__(self, initial_prev=None, max_items=None):
         super(ExecutionHistory, self).__init__()
         self._history_items = []            
         self.initial_prev = initial_prev
         self.execution_history_storage = None
         self.new_execution_command_handled = True
+        if max_items is None:
+            max_items = global_config.get_config_value("EXECUTION_HISTORY_MAX_ITEMS", 0)
+        self.max_items = max_items if max_items and max_items > 0 else 0
+        self.number_of_evicted_items = 0
+        self.number_of_popped_items = 0
+        # call items of states, which did not return, yet
+        self._open_call_items = []
+        # number of items at the beginning of the history that were kept during the last eviction
+        self._number_of_pinned_items = 0
+        self._eviction_length = self.max_items
 
     def destroy(self):
         # logger.verbose("Destroy execution history!")
@@ -126,6 +440,7 @@ class ExecutionHistory(Observable, Iterable, Sized):
                 for history_item in execution_history_iterator:
                     history_item.destroy()
         self._history_items = None
+        self._open_call_items = None
         self.initial_prev = None
 
     def __iter__(self):
@@ -157,10 +472,88 @@ class ExecutionHistory(Observable, Iterable, Sized):
         if last_history_item is not None:
             last_history_item.next = current_item
         if self.execution_history_storage is not None:
-            self.execution_history_storage.store_item(current_item.history_item_id, current_item.to_dict())
+            self.execution_history_storage.store_history_item(current_item)
         self._history_items.append(current_item)
+        if isinstance(current_item, CallItem):
+            self._open_call_items.append(current_item)
+        elif isinstance(current_item, ReturnItem):
+            if self._open_call_items and self._open_call_items[-1].state_reference is current_item.state_reference:
+                current_item.call_item = self._open_call_items.pop()
+        if self.max_items and len(self._history_items) > self._eviction_length:
+            self._evict_items()
         return current_item
 
+    def _evict_items(self):
+        """Removes the oldest history items from memory
+
+        The history is shrunk to 90 % of its maximum size. Items needed for backward stepping within the remaining
+        window are kept: the start item, the call items of all states, which are still running or whose return item is
+        kept, as well as the concurrency items following such call items. The links of the kept items are updated,
+        so that the kept items form a consistent list again.
+        """
+        history_items = self._history_items
+        cut_index = len(history_items) - self.max_items * 9 // 10
+        if cut_index <= 0:
+            return
+        index_of_item = {id(history_item): index for index, history_item in enumerate(history_items[:cut_index])}
+        pinned_indices = set()
+        if isinstance(history_items[0], StateMachineStartItem):
+            pinned_indices.add(0)
+        call_items = list(self._open_call_items)
+        call_items.extend(history_item.call_item for history_item in history_items[cut_index:]
+                          if isinstance(history_item, ReturnItem))
+        for call_item in call_items:
+            index = index_of_item.get(id(call_item))
+            if index is not None:
+                pinned_indices.add(index)
+                if index + 1 < cut_index and isinstance(history_items[index + 1], ConcurrencyItem):
+                    pinned_indices.add(index + 1)
+
+        retained_items = [history_items[index] for index in sorted(pinned_indices)]
+        self._number_of_pinned_items = len(retained_items)
+        retained_items.extend(history_items[cut_index:])
+        self.number_of_evicted_items += len(history_items) - len(retained_items)
+
+        # relink the retained items, to release the references to the evicted ones
+        prev_item = None if isinstance(retained_items[0], StateMachineStartItem) else self.initial_prev
+        for history_item in retained_items:
+            if prev_item is not None and prev_item is not self.initial_prev:
+                prev_item.next = history_item
+            history_item.prev = prev_item
+            prev_item = history_item
+        self._history_items = retained_items
+        # avoid an eviction with each push, if many items are pinned
+        self._eviction_length = max(self.max_items, len(retained_items) + max(1, self.max_items // 10))
+
+    def get_evicted_history_item_records(self, number=None, offset=0):
+        """Reads the records of history items evicted from memory from the execution history storage
+
+        The records are found by following the chain of previous history item ids, starting at the oldest item
+        retained in memory.
+
+        :param int number: the maximum number of records to return, None for all
+        :param int offset: the number of most recent evicted records to skip, e.g. records that were already read
+        :return: the records of the evicted items in chronological order
+        :rtype: list[dict]
+        """
+        if self.execution_history_storage is None or not self.number_of_evicted_items or not self._history_items:
+            return []
+        retained_item_ids = set(history_item.history_item_id for history_item in self._history_items)
+        stop_item_id = self.initial_prev.history_item_id if self.initial_prev is not None else None
+        oldest_item = self._history_items[min(self._number_of_pinned_items, len(self._history_items) - 1)]
+        record = self.execution_history_storage.get_item(oldest_item.history_item_id)
+        records = []
+        while record is not None and (number is None or len(records) < number + offset):
+            history_item_id = record.get('prev_history_item_id')
+            if history_item_id is None or history_item_id == stop_item_id:
+                break
+            record = self.execution_history_storage.get_item(history_item_id)
+            if record is not None and history_item_id not in retained_item_ids:
+                records.append(record)
+        records = records[offset:]
+        records.reverse()
+        return records
+
     @Observable.observed
     def push_call_history_item(self, state, call_type, state_for_scoped_data, input_data=None):
         """Adds a new call-history-item to the history item list
@@ -217,14 +610,14 @@ class ExecutionHistory(Observable, Iterable, Sized):
         last_history_item = self.get_last_history_item()
         return_item = ConcurrencyItem(state, self.get_last_history_item(),
                                       number_concurrent_threads, state.run_id,
-                                      self.execution_history_storage)
+                                      self.execution_history_storage, self.max_items)
         return self._push_item(last_history_item, return_item)
 
     @Observable.observed
     def push_state_machine_start_history_item(self, state_machine, run_id):
         return_item = StateMachineStartItem(state_machine, run_id)
         if self.execution_history_storage is not None:
-            self.execution_history_storage.store_item(return_item.history_item_id, return_item.to_dict())
+            self.execution_history_storage.store_history_item(return_item)
         self._history_items.append(return_item)
         return return_item
 
@@ -236,10 +629,17 @@ class ExecutionHistory(Observable, Iterable, Sized):
         :rtype: HistoryItem
         """
         try:
-            return self._history_items.pop()
+            history_item = self._history_items.pop()
         except IndexError:
             logger.error("No item left in the history item list in the execution history.")
             return None
+        self.number_of_popped_items += 1
+        if isinstance(history_item, ReturnItem):
+            if history_item.call_item is not None:
+                self._open_call_items.append(history_item.call_item)
+        elif self._open_call_items and self._open_call_items[-1] is history_item:
+            self._open_call_items.pop()
+        return history_item
 
 
 class HistoryItem(object):
@@ -257,7 +657,7 @@ class HistoryItem(object):
 
     def __init__(self, state, prev, run_id):
         self._state_reference = state
-        self.path = copy.deepcopy(state.get_path())
+        self.path = state.get_path()
         self.timestamp = time.time()
         self.run_id = run_id
         self.prev = prev
@@ -336,25 +736,48 @@ class HistoryItem(object):
 
 
 class StateMachineStartItem(HistoryItem):
+    """Class representing the start of a state machine execution
+
+    The definition of the started state machine (its meta data and the environment variables) is shared by all start
+    items with the same content hash, see :func:`get_start_definition`. In the log, the definition is only stored once
+    per content hash and referenced by the records.
+
+    :ivar str definition_hash: the content hash of the definition
+    :ivar dict definition: the definition, must not be modified
+    """
+
     def __init__(self, state_machine, run_id):
         HistoryItem.__init__(self, state_machine.root_state, None, run_id)
-        from rafcon.core.state_machine import StateMachine
-        self.sm_dict = StateMachine.state_machine_to_dict(state_machine)
+        self.definition_hash, self.definition = get_start_definition(state_machine)
         self.prev = None
-        self.os_environment = dict(os.environ)
+
+    @property
+    def sm_dict(self):
+        return self.definition['state_machine']
+
+    @property
+    def os_environment(self):
+        return self.definition['os_environment']
 
     def __str__(self):
         return "StateMachineStartItem with name %s (time: %s)" % (self.sm_dict['root_state_storage_id'], self.timestamp)
 
-    def to_dict(self):
+    def to_dict(self, include_definition=True):
+        """Creates the record of the start item
+
+        :param bool include_definition: whether to include the definition or only reference it by its content hash
+        :rtype: dict
+        """
         record = HistoryItem.to_dict(self)
-        record.update(self.sm_dict)
+        if include_definition:
+            record.update(self.sm_dict)
+            record['os_environment'] = self.os_environment
+        record['definition_hash'] = self.definition_hash
         record['call_type'] = 'EXECUTE'
         record['state_name'] = 'StateMachineStartItem'
         record['state_type'] = 'StateMachine'
         record['path'] = ''
         record['path_by_name'] = ''
-        record['os_environment'] = self.os_environment
         if self.prev is not None:
             record['prev_history_item_id'] = self.prev.history_item_id
         else:
@@ -368,17 +791,28 @@ class ScopedDataItem(HistoryItem):
     :ivar call_type: the call type of the execution step, i.e. if it refers to a container state or an execution state
     :ivar state_for_scoped_data: the state of which the scoped data will be stored as the context data that is necessary
         to re-execute the state
+    :ivar data_ports: the data ports of the input/output data, their policy defines if the data is copied
     """
 
-    def __init__(self, state, prev, call_type, state_for_scoped_data, child_state_input_output_data, run_id):
+    def __init__(self, state, prev, call_type, state_for_scoped_data, child_state_input_output_data, run_id,
+                 data_ports=None):
         HistoryItem.__init__(self, state, prev, run_id)
         if call_type in CallType:
             self.call_type_str = call_type.name
         else:
             raise Exception('unkown calltype, neither CONTAINER nor EXECUTE')
         self.call_type = call_type
+        # mutable values are only copied, if they are not passed by reference
         self.scoped_data = {} if state_for_scoped_data is None else copy.deepcopy(state_for_scoped_data._scoped_data)
-        self.child_state_input_output_data = copy.deepcopy(child_state_input_output_data)
+        if child_state_input_output_data is None:
+            self.child_state_input_output_data = None
+        else:
+            per_reference_names = set(data_port.name for data_port in (data_ports or {}).itervalues()
+                                      if data_port.pass_by_reference)
+            memo = {}
+            self.child_state_input_output_data = {
+                name: copy_value(value, name in per_reference_names, memo)
+                for name, value in child_state_input_output_data.iteritems()}
 
     def to_dict(self):
         record = HistoryItem.to_dict(self)
@@ -427,7 +861,8 @@ class CallItem(ScopedDataItem):
     """A history item to represent a state call
     """
     def __init__(self, state, prev, call_type, state_for_scoped_data, input_data, run_id):
-        ScopedDataItem.__init__(self, state, prev, call_type, state_for_scoped_data, input_data, run_id)
+        ScopedDataItem.__init__(self, state, prev, call_type, state_for_scoped_data, input_data, run_id,
+                                state.input_data_ports)
         self.outcome = None
 
     def __str__(self):
@@ -440,10 +875,14 @@ class CallItem(ScopedDataItem):
 
 class ReturnItem(ScopedDataItem):
     """A history item to represent the return of a root state call
+
+    :ivar call_item: the call item matching this return item
     """
     def __init__(self, state, prev, call_type, state_for_scoped_data, output_data, run_id):
-        ScopedDataItem.__init__(self, state, prev, call_type, state_for_scoped_data, output_data, run_id)
+        ScopedDataItem.__init__(self, state, prev, call_type, state_for_scoped_data, output_data, run_id,
+                                state.output_data_ports)
         self.outcome = copy.deepcopy(state.final_outcome)
+        self.call_item = None
 
     def __str__(self):
         return "ReturnItem %s" % (ScopedDataItem.__str__(self))
@@ -462,12 +901,13 @@ class ReturnItem(ScopedDataItem):
 class ConcurrencyItem(HistoryItem):
     """A class to hold all the data for an invocation of several concurrent threads.
     """
-    def __init__(self, container_state, prev, number_concurrent_threads, run_id, execution_history_storage):
+    def __init__(self, container_state, prev, number_concurrent_threads, run_id, execution_history_storage,
+                 execution_history_max_items=None):
         HistoryItem.__init__(self, container_state, prev, run_id)
         self.execution_histories = []
 
         for i in range(number_concurrent_threads):
-            execution_history = ExecutionHistory(initial_prev=self)
+            execution_history = ExecutionHistory(initial_prev=self, max_items=execution_history_max_items)
             execution_history.set_execution_history_storage(execution_history_storage)
             self.execution_histories.append(execution_history)
 
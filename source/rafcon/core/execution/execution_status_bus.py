@@ -0,0 +1,99 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: execution_status_bus
+   :synopsis: A coalescing bus for the changes of the execution status of states
+
+Without subscribers, the observers of a state are notified synchronously about each change of its execution status,
+i.e. within the executing thread. As long as the bus has subscribers (e.g. the GUI), the changes are only queued and
+the subscriber notifies the observers by draining the queue at its own rate, e.g. a fixed frame rate. Several changes
+of the same state between two drains are coalesced, the observers are only notified about the latest status.
+
+Publishing a change does not take any lock, as the queue is a dict mapping the id of a state to the state, whose item
+assignments and removals are atomic.
+"""
+
+from threading import Lock
+
+
+class ExecutionStatusBus(object):
+    """Queues the changes of the execution status of states for the subscribers"""
+
+    def __init__(self):
+        self._pending = {}
+        self._subscribers = 0
+        self._subscription_lock = Lock()
+
+    @property
+    def active(self):
+        """Whether changes are queued, which is the case as long as the bus has subscribers
+
+        :rtype: bool
+        """
+        return self._subscribers > 0
+
+    def subscribe(self):
+        """Registers a subscriber, which from now on has to call :meth:`notify_changes` regularly"""
+        with self._subscription_lock:
+            self._subscribers += 1
+
+    def unsubscribe(self):
+        """Unregisters a subscriber
+
+        After the last subscriber is gone, the queued changes are notified and further changes are notified
+        synchronously again.
+        """
+        with self._subscription_lock:
+            self._subscribers = max(0, self._subscribers - 1)
+            if not self._subscribers:
+                self.notify_changes()
+
+    def publish(self, state):
+        """Queues the change of the execution status of a state
+
+        :param rafcon.core.states.state.State state: the state whose execution status changed
+        :return: whether the change was queued, False if the bus has no subscriber
+        :rtype: bool
+        """
+        if not self._subscribers:
+            return False
+        self._pending[id(state)] = state
+        return True
+
+    def drain(self):
+        """Removes all queued changes
+
+        :return: the states whose execution status changed since the last drain, each state only once
+        :rtype: list
+        """
+        pending = self._pending
+        states = []
+        for key in pending.keys():
+            state = pending.pop(key, None)
+            if state is not None:
+                states.append(state)
+        return states
+
+    def notify_changes(self):
+        """Notifies the observers of all states with queued changes about their latest execution status
+
+        Subscribers have to call the method from the thread expected by the observers, e.g. the GUI thread.
+
+        :return: the number of notified states
+        :rtype: int
+        """
+        states = self.drain()
+        for state in states:
+            state.notify_state_execution_status()
+        return len(states)
+
+
+execution_status_bus = ExecutionStatusBus()
@@ -97,7 +97,8 @@ class GlobalVariableManager(Observable):
             if unlock:
                 self.unlock_variable(key, access_key)
 
-        logger.debug("Global variable '{}' was set to value '{}' with type '{}'".format(key, value, data_type.__name__))
+        # the (possibly large) value is only converted to a string if debug messages are logged
+        logger.debug("Global variable '%s' was set to value '%s' with type '%s'", key, value, data_type.__name__)
 
     def get_variable(self, key, per_reference=None, access_key=None, default=None):
         """Fetches the value of a global variable
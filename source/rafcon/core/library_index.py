@@ -0,0 +1,212 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: library_index
+   :synopsis: A persistent index of the directories within the library root paths
+
+The index stores for each directory below a library root path its modification time, whether it is a library (i.e.
+contains a state machine file) and its sub-directories. As the modification time of a directory changes, whenever an
+entry is added, removed or renamed in it, an unchanged directory can be validated with a single ``stat`` call instead
+of listing it and checking each of its entries. Only changed directories are scanned again.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+
+from rafcon.core.storage import storage
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+# directories modified within this time span before their scan are scanned again on the next validation, as further
+# modifications within the resolution of the file system time stamps would not change their modification time
+RACY_MODIFICATION_TIME_SPAN = 2.
+
+
+def _encode_path(path):
+    """Converts a path read from the JSON index into a byte string like those returned by os.listdir"""
+    if isinstance(path, unicode):
+        return path.encode(sys.getfilesystemencoding() or 'utf-8')
+    return path
+
+
+class LibraryIndex(object):
+    """Caches the structure of the library root paths
+
+    All validations between :meth:`start_validation` and :meth:`finish_validation` form a validation pass, in which each
+    directory is validated at most once.
+
+    :ivar str filename: the path of the file the index is persisted to, None if the index is not persisted
+    :ivar bool modified: whether the index was modified since it was loaded or saved
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.modified = False
+        self._directories = {}
+        self._validated_directories = set()
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        """Loads the index from its file
+
+        A missing or invalid file results in an empty index.
+        """
+        self._directories = {}
+        self.modified = False
+        if self.filename is None or not os.path.isfile(self.filename):
+            return
+        try:
+            with open(self.filename) as index_file:
+                index = json.load(index_file)
+            if index.get('version') == INDEX_FORMAT_VERSION:
+                self._directories = {_encode_path(path): dict(entry, sub_directories=[
+                    _encode_path(name) for name in entry['sub_directories']])
+                    for path, entry in index['directories'].iteritems()}
+            else:
+                logger.info("Ignoring library index {0} of another format version".format(self.filename))
+        except (IOError, OSError, ValueError, KeyError, AttributeError) as e:
+            logger.warning("The library index {0} could not be loaded: {1}".format(self.filename, e))
+
+    def save(self):
+        """Saves the index to its file, if it was modified
+
+        The file is replaced atomically, thus concurrently running processes never read a partially written index.
+        """
+        if self.filename is None or not self.modified:
+            return
+        with self._lock:
+            try:
+                index_dir = os.path.dirname(self.filename)
+                if index_dir and not os.path.isdir(index_dir):
+                    os.makedirs(index_dir)
+                tmp_filename = "{0}.{1}.tmp".format(self.filename, os.getpid())
+                with open(tmp_filename, 'w') as index_file:
+                    json.dump({'version': INDEX_FORMAT_VERSION, 'directories': self._directories}, index_file)
+                os.rename(tmp_filename, self.filename)
+                self.modified = False
+            except (IOError, OSError) as e:
+                logger.warning("The library index {0} could not be saved: {1}".format(self.filename, e))
+
+    def start_validation(self):
+        """Starts a new validation pass"""
+        with self._lock:
+            self._validated_directories = set()
+
+    def finish_validation(self, root_paths):
+        """Finishes a validation pass
+
+        Entries of directories below the given root paths, which were not validated during the pass, do not exist any
+        more and are removed. Afterwards, the index is saved.
+
+        :param list root_paths: the library root paths validated during the pass
+        """
+        with self._lock:
+            root_prefixes = [os.path.join(root_path, '') for root_path in root_paths]
+            for path in self._directories.keys():
+                if path in self._validated_directories:
+                    continue
+                if path in root_paths or any(path.startswith(prefix) for prefix in root_prefixes):
+                    del self._directories[path]
+                    self.modified = True
+            self._validated_directories = set()
+        self.save()
+
+    def _get_entry(self, path):
+        """Returns the validated entry of a directory
+
+        :param str path: the path of the directory
+        :return: the entry or None if the directory does not exist
+        :rtype: dict
+        """
+        with self._lock:
+            entry = self._directories.get(path)
+            if path in self._validated_directories:
+                return entry
+            self._validated_directories.add(path)
+            try:
+                modification_time = os.stat(path).st_mtime
+            except OSError:
+                if entry is not None:
+                    del self._directories[path]
+                    self.modified = True
+                return None
+            if entry is None or entry['mtime'] != modification_time or \
+                    entry['scan_time'] - modification_time < RACY_MODIFICATION_TIME_SPAN:
+                entry = self._scan_directory(path, modification_time)
+                if entry != self._directories.get(path):
+                    self.modified = True
+                self._directories[path] = entry
+            return entry
+
+    @staticmethod
+    def _scan_directory(path, modification_time):
+        scan_time = time.time()
+        is_library = os.path.exists(os.path.join(path, storage.STATEMACHINE_FILE)) or \
+            os.path.exists(os.path.join(path, storage.STATEMACHINE_FILE_OLD))
+        sub_directories = []
+        if not is_library:
+            for name in os.listdir(path):
+                if name[0] != '.' and os.path.isdir(os.path.join(path, name)):
+                    sub_directories.append(name)
+        return {'mtime': modification_time, 'scan_time': scan_time, 'is_library': is_library,
+                'sub_directories': sorted(sub_directories)}
+
+    def get_sub_directories(self, path):
+        """Returns the names of the non-hidden sub-directories of a directory
+
+        :param str path: the path of the directory
+        :rtype: list
+        """
+        entry = self._get_entry(path)
+        return list(entry['sub_directories']) if entry else []
+
+    def is_library(self, path):
+        """Checks whether a directory contains a state machine
+
+        :param str path: the path of the directory
+        :rtype: bool
+        """
+        entry = self._get_entry(path)
+        return entry['is_library'] if entry else False
+
+
+class LibraryWatcher(threading.Thread):
+    """Polls the library root paths for changes
+
+    The watcher thread periodically calls the update callback, which is expected to validate the library index and to
+    update the library tree, if necessary.
+
+    :ivar float interval: the time in seconds between two updates
+    """
+
+    def __init__(self, update_callback, interval):
+        super(LibraryWatcher, self).__init__(name="LibraryWatcher")
+        self.daemon = True
+        self.interval = interval
+        self._update_callback = update_callback
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self._update_callback()
+            except Exception as e:
+                logger.exception("Error while updating the libraries: {0}".format(e))
+
+    def stop(self):
+        self._stop_event.set()
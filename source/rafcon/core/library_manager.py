@@ -19,11 +19,12 @@
 
 import os
 import shutil
-import copy
+import threading
 from gtkmvc import Observable
 
 from rafcon.core import interface
 from rafcon.core.storage import storage
+from rafcon.core.library_index import LibraryIndex, LibraryWatcher
 from rafcon.core.custom_exceptions import LibraryNotFoundException
 import rafcon.core.config as config
 
@@ -48,6 +49,9 @@ class LibraryManager(Observable):
     The library_root_path can be relative paths and could include environment variables.
     A library is pointed on by the file system path library_os_path which again partial consists of 
     library_root_path + library_path (partly) + library_name.
+    The structure of the library root paths is cached in a persistent :class:`rafcon.core.library_index.LibraryIndex`,
+    thus only changed directories are scanned. If LIBRARY_WATCH_INTERVAL is configured, a
+    :class:`rafcon.core.library_index.LibraryWatcher` updates the libraries periodically.
     :ivar _libraries: a dictionary to hold  all libraries
     """
 
@@ -66,7 +70,12 @@ class LibraryManager(Observable):
         self._loaded_libraries = {}
         self._libraries_instances = {}
 
+        self._library_index = None
+        self._library_watcher = None
+        self._libraries_lock = threading.RLock()
+
     def prepare_destruction(self):
+        self.stop_library_watcher()
         self.clean_loaded_libraries()
 
     def clean_loaded_libraries(self):
@@ -81,11 +90,32 @@ class LibraryManager(Observable):
         singleton.py before the state*.pys are loaded
         """
         logger.debug("Initializing LibraryManager: Loading libraries ... ")
-        self._libraries = {}
-        self._library_root_paths = {}
         self._replaced_libraries = {}
         self._skipped_states = []
         self._skipped_library_roots = []
+        with self._libraries_lock:
+            self._libraries = self._load_libraries()
+        self._start_library_watcher()
+        logger.debug("Initialization of LibraryManager done")
+
+    def _get_library_index(self):
+        index_path = config.global_config.get_config_value("LIBRARY_INDEX_PATH", None)
+        if index_path is not None:
+            index_path = os.path.abspath(os.path.expandvars(os.path.expanduser(index_path)))
+        if self._library_index is None or self._library_index.filename != index_path:
+            self._library_index = LibraryIndex(index_path)
+        return self._library_index
+
+    def _load_libraries(self):
+        """Determines the library root paths and searches them for libraries
+
+        The library root paths are directly updated, the library tree is returned, thus the current library tree stays
+        valid during the search.
+
+        :return: the library tree
+        :rtype: dict
+        """
+        library_root_paths = {}
 
         # 1. Load libraries from config.yaml
         for library_root_key, library_root_path in config.global_config.get_config_value("LIBRARY_PATHS").iteritems():
@@ -93,7 +123,7 @@ class LibraryManager(Observable):
             if os.path.exists(library_root_path):
                 logger.debug("Adding library root key '{0}' from path '{1}'".format(
                     library_root_key, library_root_path))
-                self._load_libraries_from_root_path(library_root_key, library_root_path)
+                library_root_paths[library_root_key] = library_root_path
             else:
                 logger.warn("Configured path for library root key '{}' does not exist: {}".format(
                     library_root_key, library_root_path))
@@ -109,14 +139,52 @@ class LibraryManager(Observable):
                 logger.warn("The library specified in RAFCON_LIBRARY_PATH does not exist: {}".format(library_root_path))
                 continue
             _, library_root_key = os.path.split(library_root_path)
-            if library_root_key in self._libraries:
+            if library_root_key in library_root_paths:
                 logger.warn("The library '{}' is already existing and will be overridden with '{}'".format(
                     library_root_key, library_root_path))
-            self._load_libraries_from_root_path(library_root_key, library_root_path)
+            library_root_paths[library_root_key] = library_root_path
             logger.debug("Adding library '{1}' from {0}".format(library_root_path, library_root_key))
 
-        self._libraries = OrderedDict(sorted(self._libraries.items()))
-        logger.debug("Initialization of LibraryManager done")
+        self._library_root_paths = library_root_paths
+        library_index = self._get_library_index()
+        library_index.start_validation()
+        libraries = {}
+        for library_root_key, library_root_path in library_root_paths.iteritems():
+            libraries[library_root_key] = self._load_libraries_from_root_path(library_root_path)
+        library_index.finish_validation(library_root_paths.values())
+        return OrderedDict(sorted(libraries.items()))
+
+    def _start_library_watcher(self):
+        interval = config.global_config.get_config_value("LIBRARY_WATCH_INTERVAL", 0)
+        if self._library_watcher is not None and self._library_watcher.interval == interval:
+            return
+        self.stop_library_watcher()
+        if interval:
+            self._library_watcher = LibraryWatcher(self.update_libraries, interval)
+            self._library_watcher.start()
+
+    def stop_library_watcher(self):
+        """Stops the thread watching the library root paths for changes"""
+        if self._library_watcher is not None:
+            self._library_watcher.stop()
+            self._library_watcher = None
+
+    def update_libraries(self):
+        """Updates the library tree from the file system
+
+        In contrast to :meth:`refresh_libraries`, only changed directories are scanned and observers are only notified,
+        if the library tree changed.
+
+        :return: True, if the library tree changed
+        :rtype: bool
+        """
+        with self._libraries_lock:
+            libraries = self._load_libraries()
+            if libraries == self._libraries:
+                return False
+            logger.debug("Libraries changed on the file system")
+            self.libraries = libraries
+            return True
 
     @staticmethod
     def _clean_path(path):
@@ -136,11 +204,10 @@ class LibraryManager(Observable):
         path = os.path.realpath(path)
         return path
 
-    def _load_libraries_from_root_path(self, library_root_key, library_root_path):
-        self._library_root_paths[library_root_key] = library_root_path
-        self._libraries[library_root_key] = {}
-        self._load_nested_libraries(library_root_path, self._libraries[library_root_key])
-        self._libraries[library_root_key] = OrderedDict(sorted(self._libraries[library_root_key].items()))
+    def _load_libraries_from_root_path(self, library_root_path):
+        libraries = {}
+        self._load_nested_libraries(library_root_path, libraries)
+        return OrderedDict(sorted(libraries.items()))
 
     def check_clean_path_of_library(self, folder_path, folder_name):
         library_root_path = self._library_root_paths[self._get_library_root_key_for_os_path(folder_path)]
@@ -162,17 +229,15 @@ class LibraryManager(Observable):
         :param library_path: the path to add all libraries from
         :param target_dict: the target dictionary to store all loaded libraries to
         """
-        for library_name in os.listdir(library_path):
+        for library_name in self._library_index.get_sub_directories(library_path):
             library_folder_path, library_name = self.check_clean_path_of_library(library_path, library_name)
             full_library_path = os.path.join(library_path, library_name)
-            if os.path.isdir(full_library_path) and library_name[0] != '.':
-                if os.path.exists(os.path.join(full_library_path, storage.STATEMACHINE_FILE)) \
-                        or os.path.exists(os.path.join(full_library_path, storage.STATEMACHINE_FILE_OLD)):
-                    target_dict[library_name] = full_library_path
-                else:
-                    target_dict[library_name] = {}
-                    self._load_nested_libraries(full_library_path, target_dict[library_name])
-                    target_dict[library_name] = OrderedDict(sorted(target_dict[library_name].items()))
+            if self._library_index.is_library(full_library_path):
+                target_dict[library_name] = full_library_path
+            else:
+                target_dict[library_name] = {}
+                self._load_nested_libraries(full_library_path, target_dict[library_name])
+                target_dict[library_name] = OrderedDict(sorted(target_dict[library_name].items()))
 
     @Observable.observed
     def refresh_libraries(self):
@@ -368,33 +433,20 @@ class LibraryManager(Observable):
         else:
             logger.warning("Library manager will not create a library instance which is not in the mounted libraries.")
 
-    def get_library_state_copy_instance(self, lib_os_path):
-        """ A method to get a state copy of the library specified via the lib_os_path.
+    def get_library_root_state(self, lib_os_path):
+        """ A method to get the root state of the library specified via the lib_os_path without copying it
 
-        :param lib_os_path: the location of the library to get a copy for
-        :return:
-        """
+        The library is loaded, if it is not yet loaded. The returned root state is shared by all library states of the
+        library and thus must not be modified.
 
-        # originally libraries were called like this; DO NOT DELETE; interesting for performance tests
-        # state_machine = storage.load_state_machine_from_path(lib_os_path)
-        # return state_machine.version, state_machine.root_state
-
-        # TODO observe changes on file system and update data
-        if lib_os_path in self._loaded_libraries:
-            # this list can also be taken to open library state machines TODO -> implement it -> because faster
-            state_machine = self._loaded_libraries[lib_os_path]
-            # logger.info("Take copy of {0}".format(lib_os_path))
-            # as long as the a library state root state is never edited so the state first has to be copied here
-            state_copy = copy.deepcopy(state_machine.root_state)
-            return state_machine.version, state_copy
-        else:
-            state_machine = storage.load_state_machine_from_path(lib_os_path)
-            self._loaded_libraries[lib_os_path] = state_machine
-            if config.global_config.get_config_value("NO_PROGRAMMATIC_CHANGE_OF_LIBRARY_STATES_PERFORMED", False):
-                return state_machine.version, state_machine.root_state
-            else:
-                state_copy = copy.deepcopy(state_machine.root_state)
-                return state_machine.version, state_copy
+        :param lib_os_path: the location of the library
+        :return: the version of the library and its root state
+        :rtype: tuple
+        """
+        if lib_os_path not in self._loaded_libraries:
+            self._loaded_libraries[lib_os_path] = storage.load_state_machine_from_path(lib_os_path)
+        state_machine = self._loaded_libraries[lib_os_path]
+        return state_machine.version, state_machine.root_state
 
     def remove_library_from_file_system(self, library_path, library_name):
         """Remove library from hard disk."""
@@ -43,6 +43,7 @@ class Script(Observable, yaml.YAMLObject):
     :ivar path: the path where the script resides
     :ivar filename: the full name of the script file
     :ivar _compiled_module: the compiled module
+    :ivar _compiled_code: the cached code object of the script, compiled from the script text `_compiled_script`
     :ivar _script_id: the id of the script
     :ivar check_path: a flag to indicate if the path should be checked for existence
 
@@ -56,6 +57,10 @@ class Script(Observable, yaml.YAMLObject):
         self._path = None
         self._filename = None
         self._compiled_module = None
+        # script text of the compiled code and the compiled module, used to detect changes of the script
+        self._compiled_code = None
+        self._compiled_script = None
+        self._module_script = None
         self._script_id = generate_script_id()
         self._parent = None
         self._check_path = check_path
@@ -75,6 +80,8 @@ class Script(Observable, yaml.YAMLObject):
         if not isinstance(value, str):
             raise ValueError("The script text of  Script class needs to be string it was handed {0}".format(value))
         self._script = value
+        if self.parent is not None:
+            self.parent.invalidate_hash()
 
     def execute(self, state, inputs=None, outputs=None, backward_execution=False):
         """Execute the user 'execute' function specified in the script
@@ -114,11 +121,20 @@ class Script(Observable, yaml.YAMLObject):
                           "".format(os.path.join(self.path, self.filename)))
         self.script = script_text
 
-    def build_module(self):
+    def build_module(self, reuse_module=False):
         """Builds a temporary module from the script file
 
+        The code object of the script is cached and only compiled again, if the script text changed.
+
+        :param bool reuse_module: if True, the previously built module is kept as long as the script text did not
+            change, otherwise the module is always created with fresh module globals
         :raises exceptions.IOError: if the compilation of the script module failed
         """
+        script = self.script
+        # comparing identical strings is cheap, thus the check is negligible compared to building the module
+        if reuse_module and self._compiled_module is not None and self._module_script == script:
+            return
+
         try:
             imp.acquire_lock()
             module_name = os.path.splitext(self.filename)[0] + str(self._script_id)
@@ -126,15 +142,18 @@ class Script(Observable, yaml.YAMLObject):
             # load module
             tmp_module = imp.new_module(module_name)
 
-            code = compile(self.script, '%s (%s)' % (self.filename, self._script_id), 'exec')
+            if self._compiled_code is None or self._compiled_script != script:
+                self._compiled_code = compile(script, '%s (%s)' % (self.filename, self._script_id), 'exec')
+                self._compiled_script = script
 
             try:
-                exec code in tmp_module.__dict__
+                exec self._compiled_code in tmp_module.__dict__
             except RuntimeError, e:
                 raise IOError("The compilation of the script module failed - error message: %s" % str(e))
 
             # return the module
             self.compiled_module = tmp_module
+            self._module_script = script
         finally:
             imp.release_lock()
 
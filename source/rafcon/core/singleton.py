@@ -24,6 +24,7 @@ from rafcon.core.global_variable_manager import GlobalVariableManager
 from rafcon.core.library_manager import LibraryManager
 from rafcon.core.execution.execution_engine import ExecutionEngine
 from rafcon.core.state_machine_manager import StateMachineManager
+from rafcon.utils.thread_pool import ThreadPool
 
 # thread id of the thread which created the core singletons
 thread_identifier = threading.currentThread().ident
@@ -40,6 +41,9 @@ state_machine_manager = StateMachineManager()
 # This variable holds the execution engine singleton
 state_machine_execution_engine = ExecutionEngine(state_machine_manager)
 
+# This variable holds the pool of worker threads, which can be used to execute child states
+state_thread_pool = ThreadPool(name="StateThreadPool")
+
 # signal that cause shut down
 shut_down_signal = None
 
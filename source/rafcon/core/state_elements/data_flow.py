@@ -118,6 +118,18 @@ class DataFlow(StateElement):
             'to_key': state_element.to_key
         }
 
+    def _change_property_with_validity_check(self, property_name, value):
+        try:
+            super(DataFlow, self)._change_property_with_validity_check(property_name, value)
+        finally:
+            self._invalidate_parent_data_flow_routing()
+
+    def _invalidate_parent_data_flow_routing(self):
+        """Informs the parent about a changed data flow, which outdates its data flow routing tables"""
+        parent = self.parent
+        if parent is not None:
+            parent.invalidate_data_flow_routing()
+
 #########################################################################
 # Properties for all class field that must be observed by the gtkmvc
 #########################################################################
@@ -142,6 +154,7 @@ class DataFlow(StateElement):
         self._from_key = from_key
 
         valid, message = self._check_validity()
+        self._invalidate_parent_data_flow_routing()
         if not valid:
             self._from_state = old_from_state
             self._from_key = old_from_key
@@ -197,6 +210,7 @@ class DataFlow(StateElement):
         self._to_key = to_key
 
         valid, message = self._check_validity()
+        self._invalidate_parent_data_flow_routing()
         if not valid:
             self._to_state = old_to_state
             self._to_key = old_to_key
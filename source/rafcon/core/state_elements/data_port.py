@@ -41,6 +41,8 @@ class DataPort(StateElement):
     :ivar bool DataPort.init_without_default_value_type_exceptions: if true it is allowed to initiate with any default
                                                                     value type used to load not matching default value
                                                                     data types and correct them using the GUI.
+    :ivar bool DataPort.pass_by_reference: if true, values are passed to the port per reference instead of being
+                                           copied; the state must then not modify the value
     """
 
     # Define all parameters and set their default values
@@ -48,9 +50,10 @@ class DataPort(StateElement):
     _data_port_id = None
     _data_type = type(None)
     _default_value = None
+    _pass_by_reference = False
 
     def __init__(self, name=None, data_type=None, default_value=None, data_port_id=None, parent=None, force_type=False,
-                 init_without_default_value_type_exceptions=False):
+                 init_without_default_value_type_exceptions=False, pass_by_reference=False):
         if type(self) == DataPort and not force_type:
             raise NotImplementedError
         super(DataPort, self).__init__()
@@ -67,6 +70,7 @@ class DataPort(StateElement):
         if data_type is not None:
             self.data_type = data_type
         self.default_value = default_value
+        self.pass_by_reference = pass_by_reference
 
         # Checks for validity
         self.parent = parent
@@ -81,7 +85,7 @@ class DataPort(StateElement):
 
     def __copy__(self):
         return self.__class__(self._name, self._data_type, self._default_value, self._data_port_id, None,
-                              self._was_forced_type)
+                              self._was_forced_type, pass_by_reference=self._pass_by_reference)
 
     def __deepcopy__(self, memo=None, _nil=[]):
         return self.__copy__()
@@ -96,23 +100,28 @@ class DataPort(StateElement):
         name = dictionary['name']
         data_type = dictionary['data_type']
         default_value = dictionary['default_value']
+        pass_by_reference = dictionary.get('pass_by_reference', False)
         # Allow creation of DataPort class when loading from YAML file
         if cls == DataPort:
             return DataPort(name, data_type, default_value, data_port_id, force_type=True,
-                            init_without_default_value_type_exceptions=True)
+                            init_without_default_value_type_exceptions=True, pass_by_reference=pass_by_reference)
         # Call appropriate constructor, e.g. InputDataPort(...) for input data ports
         else:
             return cls(name, data_type, default_value, data_port_id, force_type=True,
-                       init_without_default_value_type_exceptions=True)
+                       init_without_default_value_type_exceptions=True, pass_by_reference=pass_by_reference)
 
     @staticmethod
     def state_element_to_dict(state_element):
-        return {
+        dict_representation = {
             'data_port_id': state_element.data_port_id,
             'name': state_element.name,
             'data_type': state_element.data_type,
             'default_value': state_element.default_value
         }
+        # only stored if set to keep the representation (and hash) of existing data ports
+        if state_element.pass_by_reference:
+            dict_representation['pass_by_reference'] = True
+        return dict_representation
 
     #########################################################################
     # Properties for all class fields that must be observed by gtkmvc
@@ -183,6 +192,21 @@ class DataPort(StateElement):
         except (TypeError, AttributeError) as e:
             raise e
 
+    @property
+    def pass_by_reference(self):
+        """Property for the _pass_by_reference field
+
+        """
+        return self._pass_by_reference
+
+    @pass_by_reference.setter
+    @lock_state_machine
+    @Observable.observed
+    def pass_by_reference(self, pass_by_reference):
+        if not isinstance(pass_by_reference, bool):
+            raise TypeError("pass_by_reference must be of type bool")
+        self._pass_by_reference = pass_by_reference
+
     @lock_state_machine
     @Observable.observed
     def change_data_type(self, data_type, default_value=None):
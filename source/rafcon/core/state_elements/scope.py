@@ -18,12 +18,12 @@
 
 import datetime
 import time
+from weakref import ref
 
 from gtkmvc import Observable
 
 from rafcon.core.state_elements.state_element import StateElement
 from rafcon.core.state_elements.data_port import DataPort
-from rafcon.core.decorators import lock_state_machine
 from rafcon.utils import type_helpers
 
 
@@ -57,22 +57,27 @@ class ScopedVariable(DataPort):
     :ivar int scoped_variable_id: the id of the scoped variable (see DataPort.data_port_id),
                                   must be unique for the parent state
     :ivar rafcon.core.states.container_state.ContainerState StateElement.parent: reference to the parent state
+    :ivar bool DataPort.pass_by_reference: if true, the values of the scoped variable are passed per reference instead
+                                           of being copied
     """
 
     yaml_tag = u'!ScopedVariable'
 
-    def __init__(self, name=None, data_type=None, default_value=None, scoped_variable_id=None, parent=None):
+    def __init__(self, name=None, data_type=None, default_value=None, scoped_variable_id=None, parent=None,
+                 pass_by_reference=False):
 
         Observable.__init__(self)
 
-        DataPort.__init__(self, name, data_type, default_value, scoped_variable_id, parent)
+        DataPort.__init__(self, name, data_type, default_value, scoped_variable_id, parent,
+                          pass_by_reference=pass_by_reference)
 
     def __str__(self):
         return "ScopedVariable '{0}' [{1}] ({3} {2})".format(self.name, self.data_port_id, self.data_type,
                                                              self.default_value)
 
     def __copy__(self):
-        return self.__class__(self._name, self._data_type, self._default_value, self._data_port_id, None)
+        return self.__class__(self._name, self._data_type, self._default_value, self._data_port_id, None,
+                              pass_by_reference=self._pass_by_reference)
 
     def __deepcopy__(self, memo=None, _nil=[]):
         return self.__copy__()
@@ -86,16 +91,21 @@ class ScopedVariable(DataPort):
         name = dictionary['name']
         data_type = dictionary['data_type']
         default_value = dictionary['default_value']
-        return cls(name, data_type, default_value, data_port_id)
+        pass_by_reference = dictionary.get('pass_by_reference', False)
+        return cls(name, data_type, default_value, data_port_id, pass_by_reference=pass_by_reference)
 
     @staticmethod
     def state_element_to_dict(state_element):
-        return {
+        dict_representation = {
             'data_port_id': state_element.data_port_id,
             'name': state_element.name,
             'data_type': state_element.data_type,
             'default_value': state_element.default_value
         }
+        # only stored if set to keep the representation (and hash) of existing scoped variables
+        if state_element.pass_by_reference:
+            dict_representation['pass_by_reference'] = True
+        return dict_representation
 
 
 class ScopedData(StateElement):
@@ -110,6 +120,7 @@ class ScopedData(StateElement):
     :ivar value: the current value of the scoped data
     :ivar data_port_type: the type of the data port that wrote to the scoped data last
     :ivar str timestamp: the timestamp when the scoped data was written to last
+    :ivar bool pass_by_reference: if true, the value is not copied when the scoped data is copied
 
     """
     _from_state = None
@@ -119,10 +130,12 @@ class ScopedData(StateElement):
     _data_port_type = None
     _primary_key = None
 
-    def __init__(self, name, value, value_type, from_state, data_port_type, parent=None):
+    def __init__(self, name, value, value_type, from_state, data_port_type, parent=None, pass_by_reference=False):
 
         super(ScopedData, self).__init__()
 
+        self.pass_by_reference = pass_by_reference
+
         self.from_state = from_state
         self.name = name
 
@@ -141,6 +154,15 @@ class ScopedData(StateElement):
     def state_element_id(self):
         return self._primary_key
 
+    def __deepcopy__(self, memo=None, _nil=[]):
+        value = type_helpers.copy_value(self._value, self.pass_by_reference, memo)
+        scoped_data = self.__class__(self._name, value, self._value_type, self._from_state, self._data_port_type,
+                                     pass_by_reference=self.pass_by_reference)
+        # the copy represents the same data: keep the time of writing and the reference to the container state
+        scoped_data._timestamp = self._timestamp
+        scoped_data._parent = self._parent
+        return scoped_data
+
     def __str__(self):
         return "ScopedData: \n name: %s \n data_type: %s \n value: %s \n from_state %s" % \
                (self.name, self.value_type, self.value, self.from_state)
@@ -163,8 +185,22 @@ class ScopedData(StateElement):
 
     #########################################################################
     # Properties for all class field that must be observed by the gtkmvc
+    # Scoped data is written during the execution and is no part of the state machine definition, thus the setters do
+    # not lock the state machine.
     #########################################################################
 
+    @property
+    def parent(self):
+        """Property for the _parent field
+
+        """
+        return self._parent() if self._parent is not None else None
+
+    @parent.setter
+    @Observable.observed
+    def parent(self, parent):
+        self._parent = ref(parent) if parent is not None else None
+
     @property
     def name(self):
         """Property for the _name field
@@ -173,7 +209,6 @@ class ScopedData(StateElement):
         return self._name
 
     @name.setter
-    @lock_state_machine
     @Observable.observed
     def name(self, name):
         if not isinstance(name, basestring):
@@ -190,7 +225,6 @@ class ScopedData(StateElement):
         return self._value
 
     @value.setter
-    @lock_state_machine
     @Observable.observed
     def value(self, value):
         # check for primitive data types
@@ -215,7 +249,6 @@ class ScopedData(StateElement):
         return self._value_type
 
     @value_type.setter
-    @lock_state_machine
     @Observable.observed
     def value_type(self, value_type):
         self._value_type = type_helpers.convert_string_to_type(value_type)
@@ -228,7 +261,6 @@ class ScopedData(StateElement):
         return self._from_state
 
     @from_state.setter
-    @lock_state_machine
     @Observable.observed
     def from_state(self, from_state):
         if from_state is not None:
@@ -247,7 +279,6 @@ class ScopedData(StateElement):
         return self._data_port_type
 
     @data_port_type.setter
-    @lock_state_machine
     @Observable.observed
     def data_port_type(self, data_port_type):
         if not issubclass(data_port_type, DataPort):
@@ -264,7 +295,6 @@ class ScopedData(StateElement):
     # WARNING: This setter function should never be used, as the timestamp is generated when the setter function of
     # the self._result variable is called
     @timestamp.setter
-    @lock_state_machine
     @Observable.observed
     def timestamp(self, timestamp):
         if not isinstance(timestamp, float):
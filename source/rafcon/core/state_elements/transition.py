@@ -102,6 +102,12 @@ class Transition(StateElement):
             'to_outcome': state_element.to_outcome
         }
 
+    def _invalidate_parent_transition_index(self):
+        """Informs the parent about a changed origin of the transition, which outdates its transition index"""
+        parent = self.parent
+        if parent is not None:
+            parent.invalidate_transition_index()
+
 #########################################################################
 # Properties for all class field that must be observed by the gtkmvc
 #########################################################################
@@ -127,6 +133,7 @@ class Transition(StateElement):
         self._from_outcome = from_outcome
 
         valid, message = self._check_validity()
+        self._invalidate_parent_transition_index()
         if not valid:
             self._from_state = old_from_state
             self._from_outcome = old_from_outcome
@@ -173,7 +180,10 @@ class Transition(StateElement):
         if from_state is not None and not isinstance(from_state, basestring):
             raise ValueError("from_state must be of type str")
 
-        self._change_property_with_validity_check('_from_state', from_state)
+        try:
+            self._change_property_with_validity_check('_from_state', from_state)
+        finally:
+            self._invalidate_parent_transition_index()
 
     @property
     def from_outcome(self):
@@ -189,7 +199,10 @@ class Transition(StateElement):
         if from_outcome is not None and not isinstance(from_outcome, int):
             raise ValueError("from_outcome must be of type int")
 
-        self._change_property_with_validity_check('_from_outcome', from_outcome)
+        try:
+            self._change_property_with_validity_check('_from_outcome', from_outcome)
+        finally:
+            self._invalidate_parent_transition_index()
 
     @property
     def to_state(self):
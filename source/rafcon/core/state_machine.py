@@ -36,6 +36,7 @@ from rafcon.core.id_generator import generate_state_machine_id, run_id_generator
 from rafcon.utils import log
 from rafcon.utils.hashable import Hashable
 from rafcon.utils.storage_utils import get_current_time_string
+from rafcon.utils.execution_log_stream import STREAM_LOG_EXTENSION
 import time
 
 from rafcon.utils.constants import RAFCON_TEMP_PATH_BASE
@@ -228,10 +229,12 @@ class StateMachine(Observable, JSONObject, Hashable):
                 base_dir = base_dir.replace('%RAFCON_TEMP_PATH_BASE', RAFCON_TEMP_PATH_BASE)
             if not os.path.exists(base_dir):
                 os.makedirs(base_dir)
-            shelve_name = os.path.join(base_dir, '%s_rafcon_execution_log_%s.shelve' %
+            log_format = global_config.get_config_value("EXECUTION_LOG_FORMAT", "shelve")
+            shelve_name = os.path.join(base_dir, '%s_rafcon_execution_log_%s%s' %
                                        (time.strftime('%Y-%m-%d-%H:%M:%S', time.localtime()),
-                                        self.root_state.name.replace(' ', '-')))
-            execution_history_store = ExecutionHistoryStorage(shelve_name)
+                                        self.root_state.name.replace(' ', '-'),
+                                        STREAM_LOG_EXTENSION if log_format == "stream" else '.shelve'))
+            execution_history_store = ExecutionHistoryStorage(shelve_name, log_format=log_format)
             new_execution_history.set_execution_history_storage(execution_history_store)
         self._execution_histories.append(new_execution_history)
         return new_execution_history
@@ -84,8 +84,8 @@ class BarrierConcurrencyState(ConcurrencyState):
             if state_id != UNIQUE_DECIDER_STATE_ID:
                 for outcome in self.states[state_id].outcomes.values():
                     # TODO figure out how to solve this clinch better #3
-                    match = [t.from_state == state_id and t.from_outcome == outcome.outcome_id for t in self.transitions.itervalues()]
-                    if not outcome.outcome_id < 0 and not any(match):
+                    connected = self.get_transition_for_origin(state_id, outcome.outcome_id) is not None
+                    if not outcome.outcome_id < 0 and not connected:
                         try:
                             self.add_transition(from_state_id=state_id, from_outcome=outcome.outcome_id,
                                                 to_state_id=UNIQUE_DECIDER_STATE_ID, to_outcome=None)
@@ -100,7 +100,7 @@ class BarrierConcurrencyState(ConcurrencyState):
 
         :return:
         """
-        logger.debug("Starting execution of {0}{1}".format(self, " (backwards)" if self.backward_execution else ""))
+        logger.debug("Starting execution of %s%s", self, " (backwards)" if self.backward_execution else "")
         self.setup_run()
 
         # data to be accessed by the decider state
@@ -194,8 +194,7 @@ class BarrierConcurrencyState(ConcurrencyState):
         # standard state execution
         decider_state.input_data = self.get_inputs_for_state(decider_state)
         decider_state.output_data = self.create_output_dictionary_for_state(decider_state)
-        decider_state.start(self.execution_history, backward_execution=False)
-        decider_state.join()
+        self.execute_child_state(decider_state, self.execution_history, backward_execution=False)
         decider_state_error = None
         if decider_state.final_outcome.outcome_id == -1:
             if 'error' in decider_state.output_data:
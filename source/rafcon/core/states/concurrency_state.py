@@ -87,6 +87,7 @@ class ConcurrencyState(ContainerState):
         # actually the queue is not needed in the barrier concurrency case
         # to avoid code duplication both concurrency states have the same start child function
         concurrency_queue = Queue.Queue(maxsize=0)  # infinite Queue size
+        thread_pool = self.get_child_state_thread_pool()
 
         for index, state in enumerate(self.states.itervalues()):
             if state is not do_not_start_state:
@@ -104,7 +105,8 @@ class ConcurrencyState(ContainerState):
                 else:  # backward execution
                     last_history_item = concurrency_history_item.execution_histories[index].pop_last_item()
                     assert isinstance(last_history_item, ReturnItem)
-                state.start(concurrency_history_item.execution_histories[index], self.backward_execution, False)
+                state.start(concurrency_history_item.execution_histories[index], self.backward_execution, False,
+                            thread_pool=thread_pool)
 
         return concurrency_queue
 
@@ -21,15 +21,16 @@
 """
 import traceback
 from copy import copy, deepcopy
-from threading import Condition
+from threading import Condition, RLock
 
 from gtkmvc import Observable
 
+from rafcon.core.config import global_config
 from rafcon.core.custom_exceptions import RecoveryModeException
 from rafcon.core.decorators import lock_state_machine
 from rafcon.core.execution.execution_status import StateMachineExecutionStatus
 from rafcon.core.id_generator import *
-from rafcon.core.singleton import state_machine_execution_engine
+from rafcon.core.singleton import state_machine_execution_engine, state_thread_pool
 from rafcon.core.state_elements.data_flow import DataFlow
 from rafcon.core.state_elements.outcome import Outcome
 from rafcon.core.state_elements.scope import ScopedData, ScopedVariable
@@ -46,7 +47,7 @@ try:
 except ImportError:
     OrderedDict = dict
 
-from rafcon.utils import log
+from rafcon.utils import log, type_helpers
 
 logger = log.get_logger(__name__)
 
@@ -73,9 +74,15 @@ class ContainerState(State):
 
         self._states = OrderedDict()
         self._transitions = {}
+        # index of all transitions by their origin (from_state, from_outcome), built lazily
+        self._transitions_by_origin = None
         self._data_flows = {}
+        # routing tables of the data flows, built lazily (see get_data_flow_routing)
+        self._data_flow_routing = None
         self._scoped_variables = {}
         self._scoped_data = {}
+        # protects the scoped data, which is written during the execution without locking the state machine
+        self._scoped_data_lock = RLock()
         self._current_state = None
         # condition variable to wait for not connected states
         self._transitions_cv = Condition()
@@ -94,9 +101,8 @@ class ContainerState(State):
     # ----------------------------------- generic methods -----------------------------------------
     # ---------------------------------------------------------------------------------------------
 
-    @lock_state_machine
-    def update_hash(self, obj_hash):
-        super(ContainerState, self).update_hash(obj_hash)
+    def update_content_hash(self, obj_hash):
+        super(ContainerState, self).update_content_hash(obj_hash)
         for state_element in sorted(self.states.values()) + sorted(self.transitions.values() +
                                                                    self.data_flows.values() + \
                                                                    self.scoped_variables.values()):
@@ -246,6 +252,38 @@ class ContainerState(State):
         self.add_default_values_of_scoped_variables_to_scoped_data()
         self.add_input_data_to_scoped_data(self.input_data)
 
+    @staticmethod
+    def get_child_state_thread_pool():
+        """Returns the thread pool used to execute child states
+
+        The size of the pool is set from the config value EXECUTION_THREAD_POOL_SIZE by the execution engine, when a
+        state machine is started.
+
+        :return: the thread pool or None, if a new thread is to be created for each child state execution
+        :rtype: rafcon.utils.thread_pool.ThreadPool
+        """
+        if not state_thread_pool.max_idle_workers:
+            return None
+        return state_thread_pool
+
+    def execute_child_state(self, state, execution_history, backward_execution=False, generate_run_id=True):
+        """Executes a child state and waits until it finished
+
+        If the config value EXECUTION_SEQUENTIAL_CHILDREN_INLINE is set, the child state is executed in the thread of
+        the container state. Otherwise the child is started in a separate thread, which is joined.
+
+        :param state: the child state to be executed
+        :param execution_history: the execution history the child state pushes its history items to
+        :param bool backward_execution: whether the child state is executed backwards
+        :param bool generate_run_id: whether a new run id is generated for the child state
+        """
+        if global_config.get_config_value("EXECUTION_SEQUENTIAL_CHILDREN_INLINE", False):
+            state.run_inline(execution_history, backward_execution, generate_run_id)
+        else:
+            state.start(execution_history, backward_execution, generate_run_id,
+                        thread_pool=self.get_child_state_thread_pool())
+            state.join()
+
     def handle_no_transition(self, state):
         """ This function handles the case that there is no transition for a specific outcome of a sub-state.
 
@@ -271,8 +309,8 @@ class ContainerState(State):
                 else:
                     self.final_outcome = Outcome(-2, "preempted")
 
-                logger.debug("{0} of {1} not connected, using default transition to parental {2}".format(
-                    state.final_outcome, state, self.final_outcome))
+                logger.debug("%s of %s not connected, using default transition to parental %s",
+                             state.final_outcome, state, self.final_outcome)
                 return None
 
             # depending on the execution mode pause execution
@@ -1096,12 +1134,10 @@ class ContainerState(State):
         # It is possible to connect the income directly with an outcome
         if self.start_state_id == self.state_id:
             if set_final_outcome:
-                for transition_id in self.transitions:
-                    # the transition of which the from state is None is the transition that directly connects the income
-                    if self.transitions[transition_id].from_state is None:
-                        to_outcome_id = self.transitions[transition_id].to_outcome
-                        self.final_outcome = self.outcomes[to_outcome_id]
-                        break
+                # the transition of which the from state is None is the transition that directly connects the income
+                start_transition = self.get_transition_for_origin(None, None)
+                if start_transition is not None:
+                    self.final_outcome = self.outcomes[start_transition.to_outcome]
             return self
 
         return self.states[self.start_state_id]
@@ -1158,11 +1194,9 @@ class ContainerState(State):
         :raises exceptions.AttributeError: if the outcome of the state with the state_id==from_state_id
                                             is already connected
         """
-        for trans_key, transition in self.transitions.iteritems():
-            if transition.from_state == from_state_id:
-                if transition.from_outcome == from_outcome:
-                    raise AttributeError("Outcome %s of state %s is already connected" %
-                                         (str(from_outcome), str(from_state_id)))
+        if self.get_transition_for_origin(from_state_id, from_outcome) is not None:
+            raise AttributeError("Outcome %s of state %s is already connected" %
+                                 (str(from_outcome), str(from_state_id)))
 
     @lock_state_machine
     def create_transition(self, from_state_id, from_outcome, to_state_id, to_outcome, transition_id):
@@ -1203,6 +1237,7 @@ class ContainerState(State):
         else:
             self.transitions[transition_id] = \
                 Transition(None, None, to_state_id, to_outcome, transition_id, self)
+        self.invalidate_transition_index()
 
         # notify all states waiting for transition to be connected
         self._transitions_cv.acquire()
@@ -1234,6 +1269,8 @@ class ContainerState(State):
 
         new_transition = Transition(from_state_id, from_outcome, to_state_id, to_outcome, transition_id, self)
         self.transitions[transition_id] = new_transition
+        if self._transitions_by_origin is not None:
+            self._transitions_by_origin[(new_transition.from_state, new_transition.from_outcome)] = new_transition
 
         # notify all states waiting for transition to be connected
         self._transitions_cv.acquire()
@@ -1254,11 +1291,34 @@ class ContainerState(State):
             raise TypeError("state must be of type State")
         if not isinstance(outcome, Outcome):
             raise TypeError("outcome must be of type Outcome")
-        result_transition = None
-        for key, transition in self.transitions.iteritems():
-            if transition.from_state == state.state_id and transition.from_outcome == outcome.outcome_id:
-                result_transition = transition
-        return result_transition
+        return self.get_transition_for_origin(state.state_id, outcome.outcome_id)
+
+    def get_transition_for_origin(self, from_state_id, from_outcome):
+        """Returns the transition starting at the given origin
+
+        The lookup uses an index of all transitions by their origin, which is built on demand and kept up to date
+        by all methods modifying transitions.
+
+        :param str from_state_id: The id of the origin state, None for the start transition
+        :param int from_outcome: The id of the origin outcome, None for the start transition
+        :return: the transition connected to the origin or None, if the origin is not connected
+        :rtype: rafcon.core.state_elements.transition.Transition
+        """
+        transitions_by_origin = self._transitions_by_origin
+        if transitions_by_origin is None:
+            transitions_by_origin = {}
+            for transition in self._transitions.itervalues():
+                transitions_by_origin[(transition.from_state, transition.from_outcome)] = transition
+            self._transitions_by_origin = transitions_by_origin
+        return transitions_by_origin.get((from_state_id, from_outcome))
+
+    def invalidate_transition_index(self):
+        """Marks the index of transitions by their origin as outdated
+
+        Must be called whenever the origin of a transition is changed without using the transition methods of the
+        container state. The index is rebuilt with the next lookup.
+        """
+        self._transitions_by_origin = None
 
     @lock_state_machine
     @Observable.observed
@@ -1274,7 +1334,12 @@ class ContainerState(State):
             raise AttributeError("The transition_id %s does not exist" % str(transition_id))
 
         self.transitions[transition_id].parent = None
-        return self.transitions.pop(transition_id)
+        transition = self.transitions.pop(transition_id)
+        if self._transitions_by_origin is not None:
+            origin = (transition.from_state, transition.from_outcome)
+            if self._transitions_by_origin.get(origin) is transition:
+                del self._transitions_by_origin[origin]
+        return transition
 
     @lock_state_machine
     def remove_outcome_hook(self, outcome_id):
@@ -1325,6 +1390,7 @@ class ContainerState(State):
 
         self.data_flows[data_flow_id] = DataFlow(from_state_id, from_data_port_id, to_state_id, to_data_port_id,
                                                  data_flow_id, self)
+        self.invalidate_data_flow_routing()
         return data_flow_id
 
     @lock_state_machine
@@ -1339,7 +1405,51 @@ class ContainerState(State):
             raise AttributeError("The data_flow_id %s does not exist" % str(data_flow_id))
 
         self._data_flows[data_flow_id].parent = None
-        return self._data_flows.pop(data_flow_id)
+        data_flow = self._data_flows.pop(data_flow_id)
+        self.invalidate_data_flow_routing()
+        return data_flow
+
+    def get_data_flow_routing(self):
+        """Returns the routing tables of the data flows of the container state
+
+        The tables are built on demand and invalidated whenever a data flow is added, removed or modified. They
+        allow to collect the data of a port without scanning all data flows. The first table maps each target port
+        `(to_state, to_key)` onto a list of `(scoped_data_key, from_state)` tuples of its sources. The second table
+        maps each source port `(from_state, from_key)` onto the list of port ids of the container state (output
+        ports and scoped variables) it is connected to.
+
+        :return: the tables of sources by target port and of own target ports by source port
+        :rtype: tuple(dict, dict)
+        """
+        routing = self._data_flow_routing
+        if routing is None:
+            # the tables are built under the lock of the state machine, thus no data flow can be changed meanwhile
+            state_machine = self.get_state_machine()
+            if state_machine:
+                state_machine.acquire_modification_lock()
+            try:
+                sources_by_target = {}
+                own_targets_by_source = {}
+                for data_flow in self._data_flows.itervalues():
+                    sources_by_target.setdefault((data_flow.to_state, data_flow.to_key), []).append(
+                        (str(data_flow.from_key) + data_flow.from_state, data_flow.from_state))
+                    if data_flow.to_state == self.state_id:
+                        own_targets_by_source.setdefault((data_flow.from_state, data_flow.from_key), []).append(
+                            data_flow.to_key)
+                routing = sources_by_target, own_targets_by_source
+                self._data_flow_routing = routing
+            finally:
+                if state_machine:
+                    state_machine.release_modification_lock()
+        return routing
+
+    def invalidate_data_flow_routing(self):
+        """Marks the routing tables of the data flows as outdated
+
+        Must be called whenever a data flow is changed without using the data flow methods of the container state.
+        The tables are rebuilt with the next data lookup.
+        """
+        self._data_flow_routing = None
 
     @lock_state_machine
     def remove_data_flows_with_data_port_id(self, data_port_id):
@@ -1493,6 +1603,8 @@ class ContainerState(State):
         """Retrieves all input data of a state. If several data flows are connected to an input port the
         most current data is used for the specific input port.
 
+        Mutable values are copied, unless the input port of the state is set to be passed by reference.
+
         :param state: the state of which the input data is determined
         :return: the input data of the target state
         """
@@ -1501,31 +1613,30 @@ class ContainerState(State):
         tmp_dict = self.get_default_input_values_for_state(state)
         result_dict.update(tmp_dict)
 
+        sources_by_target = self.get_data_flow_routing()[0]
+        scoped_data = self.scoped_data
         for input_port_key, value in state.input_data_ports.iteritems():
             # for all input keys fetch the correct data_flow connection and read data into the result_dict
             actual_value = None
             actual_value_time = 0
-            for data_flow_key, data_flow in self.data_flows.iteritems():
-
-                if data_flow.to_key == input_port_key:
-                    if data_flow.to_state == state.state_id:
-                        # fetch data from the scoped_data list: the key is the data_port_key + the state_id
-                        key = str(data_flow.from_key) + data_flow.from_state
-                        if key in self.scoped_data:
-                            if actual_value is None or actual_value_time < self.scoped_data[key].timestamp:
-                                actual_value = deepcopy(self.scoped_data[key].value)
-                                actual_value_time = self.scoped_data[key].timestamp
+            for key, _ in sources_by_target.get((state.state_id, input_port_key), ()):
+                # fetch data from the scoped_data list: the key is the data_port_key + the state_id
+                if key in scoped_data:
+                    if actual_value is None or actual_value_time < scoped_data[key].timestamp:
+                        actual_value = scoped_data[key].value
+                        actual_value_time = scoped_data[key].timestamp
 
             if actual_value is not None:
-                result_dict[value.name] = actual_value
+                result_dict[value.name] = type_helpers.copy_value(actual_value, value.pass_by_reference)
 
         return result_dict
 
     # ---------------------------------------------------------------------------------------------
     # ---------------------------- functions to modify the scoped data ----------------------------
     # ---------------------------------------------------------------------------------------------
+    # The scoped data is only protected by the scoped data lock of the state, as it is written for each executed child
+    # state. The ports and scoped variables are read from snapshots (items/values), which are atomic in CPython.
 
-    @lock_state_machine
     def add_input_data_to_scoped_data(self, dictionary):
         """Add a dictionary to the scoped data
 
@@ -1535,80 +1646,102 @@ class ContainerState(State):
         :param dictionary: The dictionary that is added to the scoped data
         :param state: The state to which the input_data was passed (should be self in most cases)
         """
-        for dict_key, value in dictionary.iteritems():
-            for input_data_port_key, data_port in self.input_data_ports.iteritems():
-                if dict_key == data_port.name:
-                    self.scoped_data[str(input_data_port_key) + self.state_id] = \
-                        ScopedData(data_port.name, value, type(value), self.state_id, ScopedVariable, parent=self)
-                    # forward the data to scoped variables
-                    for data_flow_key, data_flow in self.data_flows.iteritems():
-                        if data_flow.from_key == input_data_port_key and data_flow.from_state == self.state_id:
-                            if data_flow.to_state == self.state_id and data_flow.to_key in self.scoped_variables:
-                                current_scoped_variable = self.scoped_variables[data_flow.to_key]
-                                self.scoped_data[str(data_flow.to_key) + self.state_id] = \
-                                    ScopedData(current_scoped_variable.name, value, type(value), self.state_id,
-                                               ScopedVariable, parent=self)
+        own_targets_by_source = self.get_data_flow_routing()[1]
+        input_data_ports_by_name = {data_port.name: (input_data_port_key, data_port)
+                                    for input_data_port_key, data_port in self.input_data_ports.items()}
+        scoped_variables = dict(self.scoped_variables)
+        with self._scoped_data_lock:
+            for dict_key, value in dictionary.iteritems():
+                if dict_key not in input_data_ports_by_name:
+                    continue
+                input_data_port_key, data_port = input_data_ports_by_name[dict_key]
+                self.scoped_data[str(input_data_port_key) + self.state_id] = \
+                    ScopedData(data_port.name, value, type(value), self.state_id, ScopedVariable, parent=self,
+                               pass_by_reference=data_port.pass_by_reference)
+                # forward the data to scoped variables
+                for to_key in own_targets_by_source.get((self.state_id, input_data_port_key), ()):
+                    if to_key in scoped_variables:
+                        current_scoped_variable = scoped_variables[to_key]
+                        self.scoped_data[str(to_key) + self.state_id] = \
+                            ScopedData(current_scoped_variable.name, value, type(value), self.state_id,
+                                       ScopedVariable, parent=self,
+                                       pass_by_reference=data_port.pass_by_reference or
+                                       current_scoped_variable.pass_by_reference)
 
-    @lock_state_machine
     def add_state_execution_output_to_scoped_data(self, dictionary, state):
         """Add a state execution output to the scoped data
 
         :param dictionary: The dictionary that is added to the scoped data
         :param state: The state that finished execution and provide the dictionary
         """
-        for output_name, value in dictionary.iteritems():
-            for output_data_port_key, data_port in state.output_data_ports.iteritems():
-                if output_name == data_port.name:
-                    if not isinstance(value, data_port.data_type):
-                        if (not ((type(value) is float or type(value) is int) and
-                                     (data_port.data_type is float or data_port.data_type is int)) and
-                                not (isinstance(value, type(None)))):
-                            logger.error("The data type of output port {0} should be of type {1}, but is of type {2}".
-                                         format(output_name, data_port.data_type, type(value)))
-                    self.scoped_data[str(output_data_port_key) + state.state_id] = \
-                        ScopedData(data_port.name, value, type(value), state.state_id, OutputDataPort, parent=self)
+        output_data_ports = state.output_data_ports.items()
+        with self._scoped_data_lock:
+            for output_name, value in dictionary.iteritems():
+                for output_data_port_key, data_port in output_data_ports:
+                    if output_name == data_port.name:
+                        if not isinstance(value, data_port.data_type):
+                            if (not ((type(value) is float or type(value) is int) and
+                                         (data_port.data_type is float or data_port.data_type is int)) and
+                                    not (isinstance(value, type(None)))):
+                                logger.error("The data type of output port {0} should be of type {1}, but is of type "
+                                             "{2}".format(output_name, data_port.data_type, type(value)))
+                        self.scoped_data[str(output_data_port_key) + state.state_id] = \
+                            ScopedData(data_port.name, value, type(value), state.state_id, OutputDataPort, parent=self,
+                                       pass_by_reference=data_port.pass_by_reference)
 
-    @lock_state_machine
     def add_default_values_of_scoped_variables_to_scoped_data(self):
         """Add the scoped variables default values to the scoped_data dictionary
 
         """
-        for key, scoped_var in self.scoped_variables.iteritems():
-            self.scoped_data[str(scoped_var.data_port_id) + self.state_id] = \
-                ScopedData(scoped_var.name, scoped_var.default_value, scoped_var.data_type, self.state_id,
-                           ScopedVariable, parent=self)
+        scoped_variables = self.scoped_variables.values()
+        with self._scoped_data_lock:
+            for scoped_var in scoped_variables:
+                self.scoped_data[str(scoped_var.data_port_id) + self.state_id] = \
+                    ScopedData(scoped_var.name, scoped_var.default_value, scoped_var.data_type, self.state_id,
+                               ScopedVariable, parent=self, pass_by_reference=scoped_var.pass_by_reference)
 
-    @lock_state_machine
     def update_scoped_variables_with_output_dictionary(self, dictionary, state):
         """Update the values of the scoped variables with the output dictionary of a specific state.
 
         :param: the dictionary to update the scoped variables with
         :param: the state the output dictionary belongs to
         """
-        for key, value in dictionary.iteritems():
-            output_data_port_key = None
-            # search for the correct output data port key of the source state
-            for o_key, o_port in state.output_data_ports.iteritems():
-                if o_port.name == key:
-                    output_data_port_key = o_key
-                    break
-            if output_data_port_key is None:
-                if not key == "error":
-                    logger.warning("Output variable %s was written during state execution, "
-                                   "that has no data port connected to it.", str(key))
-            for data_flow_key, data_flow in self.data_flows.iteritems():
-                if data_flow.from_key == output_data_port_key and data_flow.from_state == state.state_id:
-                    if data_flow.to_state == self.state_id:  # is target of data flow own state id?
-                        if data_flow.to_key in self.scoped_variables.iterkeys():  # is target data port scoped?
-                            current_scoped_variable = self.scoped_variables[data_flow.to_key]
-                            self.scoped_data[str(data_flow.to_key) + self.state_id] = \
-                                ScopedData(current_scoped_variable.name, value, type(value), state.state_id,
-                                           ScopedVariable, parent=self)
+        own_targets_by_source = self.get_data_flow_routing()[1]
+        output_data_ports_by_name = {o_port.name: o_port for o_port in state.output_data_ports.values()}
+        scoped_variables = dict(self.scoped_variables)
+        with self._scoped_data_lock:
+            for key, value in dictionary.iteritems():
+                # search for the correct output data port of the source state
+                output_data_port = output_data_ports_by_name.get(key)
+                if output_data_port is None:
+                    if not key == "error":
+                        logger.warning("Output variable %s was written during state execution, "
+                                       "that has no data port connected to it.", str(key))
+                    continue
+                # all targets are ports of the own state
+                for to_key in own_targets_by_source.get((state.state_id, output_data_port.data_port_id), ()):
+                    if to_key in scoped_variables:  # is target data port scoped?
+                        current_scoped_variable = scoped_variables[to_key]
+                        self.scoped_data[str(to_key) + self.state_id] = \
+                            ScopedData(current_scoped_variable.name, value, type(value), state.state_id,
+                                       ScopedVariable, parent=self,
+                                       pass_by_reference=output_data_port.pass_by_reference or
+                                       current_scoped_variable.pass_by_reference)
 
     # ---------------------------------------------------------------------------------------------
     # ------------------------ functions to modify the scoped data end ----------------------------
     # ---------------------------------------------------------------------------------------------
 
+    def invalidate_path(self):
+        """Invalidates the cached paths of the state and of all its descendants
+
+        See :meth:`rafcon.core.states.state.State.invalidate_path`.
+        """
+        if self._path_cache is not None:
+            super(ContainerState, self).invalidate_path()
+            for child_state in self.states.itervalues():
+                child_state.invalidate_path()
+
     @lock_state_machine
     def change_state_id(self, state_id=None):
         """
@@ -1626,6 +1759,7 @@ class ContainerState(State):
                 transition._from_state = self.state_id
             if transition.to_state == old_state_id:
                 transition._to_state = self.state_id
+        self.invalidate_transition_index()
 
         # change id in all data_flows
         for data_flow in self.data_flows.itervalues():
@@ -1633,6 +1767,7 @@ class ContainerState(State):
                 data_flow._from_state = self.state_id
             if data_flow.to_state == old_state_id:
                 data_flow._to_state = self.state_id
+        self.invalidate_data_flow_routing()
 
     def get_state_for_transition(self, transition):
         """Calculate the target state of a transition
@@ -1652,6 +1787,8 @@ class ContainerState(State):
     def write_output_data(self, specific_output_dictionary=None):
         """ Write the scoped data to output of the state. Called before exiting the container state.
 
+        Mutable values are copied, unless the output port is set to be passed by reference.
+
         :param specific_output_dictionary: an optional dictionary to write the output data in
         :return:
         """
@@ -1660,32 +1797,32 @@ class ContainerState(State):
         else:
             output_dict = self.output_data
 
+        sources_by_target = self.get_data_flow_routing()[0]
+        scoped_data = self.scoped_data
         for output_name, value in self.output_data.iteritems():
             output_port_id = self.get_io_data_port_id_from_name_and_type(output_name, OutputDataPort)
             actual_value = None
             actual_value_was_written = False
             actual_value_time = 0
-            for data_flow_id, data_flow in self.data_flows.iteritems():
-                if data_flow.to_state == self.state_id:
-                    if data_flow.to_key == output_port_id:
-                        scoped_data_key = str(data_flow.from_key) + data_flow.from_state
-                        if scoped_data_key in self.scoped_data:
-                            # if self.scoped_data[scoped_data_key].timestamp > actual_value_time is True
-                            # the data of a previous execution of the same state is overwritten
-                            if actual_value is None or self.scoped_data[scoped_data_key].timestamp > actual_value_time:
-                                actual_value = deepcopy(self.scoped_data[scoped_data_key].value)
-                                actual_value_time = self.scoped_data[scoped_data_key].timestamp
-                                actual_value_was_written = True
-                        else:
-                            if not self.backward_execution:
-                                logger.debug(
-                                    "Output data with name {0} of state {1} was not found in the scoped data "
-                                    "of state {2}. Thus the state did not write onto this output. "
-                                    "This can mean a state machine design error.".format(
-                                        str(output_name), str(self.states[data_flow.from_state].get_path()),
-                                        self.get_path()))
+            for scoped_data_key, from_state_id in sources_by_target.get((self.state_id, output_port_id), ()):
+                if scoped_data_key in scoped_data:
+                    # if self.scoped_data[scoped_data_key].timestamp > actual_value_time is True
+                    # the data of a previous execution of the same state is overwritten
+                    if actual_value is None or scoped_data[scoped_data_key].timestamp > actual_value_time:
+                        actual_value = scoped_data[scoped_data_key].value
+                        actual_value_time = scoped_data[scoped_data_key].timestamp
+                        actual_value_was_written = True
+                else:
+                    if not self.backward_execution:
+                        logger.debug(
+                            "Output data with name {0} of state {1} was not found in the scoped data "
+                            "of state {2}. Thus the state did not write onto this output. "
+                            "This can mean a state machine design error.".format(
+                                str(output_name), str(self.states[from_state_id].get_path()),
+                                self.get_path()))
             if actual_value_was_written:
-                output_dict[output_name] = actual_value
+                output_dict[output_name] = type_helpers.copy_value(
+                    actual_value, self.output_data_ports[output_port_id].pass_by_reference)
 
     # ---------------------------------------------------------------------------------------------
     # -------------------------------------- check methods ---------------------------------------
@@ -2019,11 +2156,9 @@ class ContainerState(State):
         to_outcome_id = check_transition.to_outcome
 
         # check for connected origin
-        for transition in self.transitions.itervalues():
-            if transition.from_state == from_state_id:
-                if transition.from_outcome == from_outcome_id:
-                    if check_transition is not transition:
-                        return False, "transition origin already connected to another transition"
+        connected_transition = self.get_transition_for_origin(from_state_id, from_outcome_id)
+        if connected_transition is not None and connected_transition is not check_transition:
+            return False, "transition origin already connected to another transition"
 
         if from_state_id in self.states and to_state_id in self.states and to_outcome_id is not None:
             return False, "no transition from one outcome to another one on the same hierarchy allowed"
@@ -2144,6 +2279,7 @@ class ContainerState(State):
 
         old_transitions = self._transitions
         self._transitions = transitions
+        self.invalidate_transition_index()
         transition_ids_to_delete = []
         for transition_id, transition in transitions.iteritems():
             try:
@@ -2155,10 +2291,12 @@ class ContainerState(State):
                         transition_ids_to_delete.append(transition.transition_id)
                 else:
                     self._transitions = old_transitions
+                    self.invalidate_transition_index()
                     raise
 
         self._transitions = dict((transition_id, t) for (transition_id, t) in self._transitions.iteritems()
                                  if transition_id not in transition_ids_to_delete)
+        self.invalidate_transition_index()
 
         # check that all old_transitions are no more referencing self as there parent
         for old_transition in old_transitions.itervalues():
@@ -2201,6 +2339,7 @@ class ContainerState(State):
 
         old_data_flows = self._data_flows
         self._data_flows = data_flows
+        self.invalidate_data_flow_routing()
         data_flow_ids_to_delete = []
         for data_flow_id, data_flow in data_flows.iteritems():
             try:
@@ -2212,10 +2351,12 @@ class ContainerState(State):
                         data_flow_ids_to_delete.append(data_flow.data_flow_id)
                 else:
                     self._data_flows = old_data_flows
+                    self.invalidate_data_flow_routing()
                     raise
 
         self._data_flows = dict((data_flow_id, d) for (data_flow_id, d) in self._data_flows.iteritems()
                                 if data_flow_id not in data_flow_ids_to_delete)
+        self.invalidate_data_flow_routing()
 
         # check that all old_data_flows are no more referencing self as there parent
         for old_data_flow in old_data_flows.itervalues():
@@ -2231,14 +2372,12 @@ class ContainerState(State):
 
         :return: The id of the start state
         """
-        for transition_id in self.transitions:
-            if self.transitions[transition_id].from_state is None:
-                to_state = self.transitions[transition_id].to_state
-                if to_state is not None:
-                    return to_state
-                else:
-                    return self.state_id
-        return None
+        start_transition = self.get_transition_for_origin(None, None)
+        if start_transition is None:
+            return None
+        if start_transition.to_state is not None:
+            return start_transition.to_state
+        return self.state_id
 
     @start_state_id.setter
     @lock_state_machine
@@ -2329,7 +2468,6 @@ class ContainerState(State):
         return self._scoped_data
 
     @scoped_data.setter
-    @lock_state_machine
     # @Observable.observed
     def scoped_data(self, scoped_data):
         if not isinstance(scoped_data, dict):
@@ -2337,7 +2475,8 @@ class ContainerState(State):
         for key, s in scoped_data.iteritems():
             if not isinstance(s, ScopedData):
                 raise TypeError("element of scoped_data must be of type ScopedData")
-        self._scoped_data = scoped_data
+        with self._scoped_data_lock:
+            self._scoped_data = scoped_data
 
     @property
     def child_execution(self):
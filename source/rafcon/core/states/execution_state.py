@@ -28,6 +28,7 @@ from gtkmvc import Observable
 from rafcon.core.states.state import State
 from rafcon.core.decorators import lock_state_machine
 from rafcon.core.state_elements.outcome import Outcome
+from rafcon.core.config import global_config
 from rafcon.core.script import Script
 from rafcon.core.states.state import StateExecutionStatus
 from rafcon.core.execution.execution_history import CallType
@@ -74,9 +75,8 @@ class ExecutionState(State):
     def __deepcopy__(self, memo=None, _nil=[]):
         return self.__copy__()
 
-    @lock_state_machine
-    def update_hash(self, obj_hash):
-        super(ExecutionState, self).update_hash(obj_hash)
+    def update_content_hash(self, obj_hash):
+        super(ExecutionState, self).update_content_hash(obj_hash)
         obj_hash.update(self.script.script)
 
     @classmethod
@@ -99,7 +99,9 @@ class ExecutionState(State):
         """Calls the custom execute function of the script.py of the state
 
         """
-        self._script.build_module()
+        # the module is only built with fresh globals for each execution, if explicitly requested
+        reuse_module = not global_config.get_config_value("EXECUTION_SCRIPT_FRESH_MODULE", False)
+        self._script.build_module(reuse_module=reuse_module)
 
         outcome_item = self._script.execute(self, execute_inputs, execute_outputs, backward_execution)
 
@@ -131,7 +133,7 @@ class ExecutionState(State):
         if self.is_root_state:
             self.execution_history.push_call_history_item(self, CallType.EXECUTE, None, self.input_data)
 
-        logger.debug("Running {0}{1}".format(self, " (backwards)" if self.backward_execution else ""))
+        logger.debug("Running %s%s", self, " (backwards)" if self.backward_execution else "")
         if self.backward_execution:
             self.setup_backward_run()
         else:
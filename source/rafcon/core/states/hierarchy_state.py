@@ -57,7 +57,7 @@ class HierarchyState(ContainerState):
         """ This function covers the whole initialization routine before executing a hierarchy state.
         :return:
         """
-        logger.debug("Starting execution of {0}{1}".format(self, " (backwards)" if self.backward_execution else ""))
+        logger.debug("Starting execution of %s%s", self, " (backwards)" if self.backward_execution else "")
 
         # reset variables
         self.child_state = None
@@ -105,7 +105,7 @@ class HierarchyState(ContainerState):
                 self.backward_execution = False
                 if self.preempted:
                     if self.last_transition and self.last_transition.from_outcome == -2:
-                        logger.debug("Execute preemption handling for '{0}'".format(self.child_state))
+                        logger.debug("Execute preemption handling for '%s'", self.child_state)
                     else:
                         break
                 elif execution_mode == StateMachineExecutionStatus.BACKWARD:
@@ -180,10 +180,8 @@ class HierarchyState(ContainerState):
         if not self.backward_execution:  # only add history item if it is not a backward execution
             self.execution_history.push_call_history_item(
                 self.child_state, CallType.EXECUTE, self, self.child_state.input_data)
-        self.child_state.start(self.execution_history, backward_execution=self.backward_execution,
-                               generate_run_id=False)
-
-        self.child_state.join()
+        self.execute_child_state(self.child_state, self.execution_history, backward_execution=self.backward_execution,
+                                 generate_run_id=False)
 
         # this line is important to indicate the parent the current execution status
         # it may also change during the execution of an hierarchy state
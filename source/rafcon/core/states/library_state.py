@@ -18,6 +18,7 @@
 
 """
 from copy import copy, deepcopy
+from threading import RLock
 
 from gtkmvc import Observable
 from rafcon.core.states.state import StateExecutionStatus
@@ -30,6 +31,9 @@ from rafcon.utils.hashable import Hashable
 
 logger = log.get_logger(__name__)
 
+# guards the materialization of state copies, which can be triggered from the execution and the GUI thread
+_state_copy_lock = RLock()
+
 
 class LibraryState(State):
     """A class to represent a library state for the state machine
@@ -39,6 +43,11 @@ class LibraryState(State):
     The constructor uses an exceptions.AttributeError if the passed version of the library and the version found in
     the library paths do not match.
 
+    The root state of a library is loaded once by the library manager and shared as template by all library states
+    of that library. The state copy of a library state is only created from the template, when it is accessed the
+    first time, e.g. when the library state is executed, its content is shown or edited. Until then, the library
+    state only holds its own copies of the outcomes and data ports of the template.
+
     :ivar str library_path: the path of the library relative to a certain library path (e.g. lwr/gripper/)
     :ivar str library_name: the name of the library between all child states: (e.g. open, or close)
     :ivar str State.name: the name of the library state
@@ -57,6 +66,7 @@ class LibraryState(State):
     _library_name = None
     _version = None
     _state_copy = None
+    _library_template = None
 
     _input_data_port_runtime_values = {}
     _use_runtime_value_input_data_ports = {}
@@ -91,22 +101,22 @@ class LibraryState(State):
             logger.info("Old library name '{0}' was located at {1}".format(library_name, library_path))
             logger.info("New library name '{0}' is located at {1}".format(new_library_name, new_library_path))
 
-        # key = load_library_root_state_timer.start()
-        lib_version, state_copy = library_manager.get_library_state_copy_instance(self.lib_os_path)
-        self.state_copy = state_copy
-        # load_library_root_state_timer.stop(key)
-        self.state_copy.parent = self
+        # the template is shared by all library states of the library and must never be modified
+        lib_version, library_template = library_manager.get_library_root_state(self.lib_os_path)
         if not str(lib_version) == version and not str(lib_version) == "None":
             raise AttributeError("Library does not have the correct version!")
+        self._library_template = library_template
 
         if name is None:
-            self.name = self.state_copy.name
+            self.name = library_template.name
 
-        # copy all ports and outcomes of self.state_copy to let the library state appear like the container state
+        # copy all ports and outcomes of the template to let the library state appear like the container state
         # this will also set the parent of all outcomes and data ports to self
-        self.outcomes = self.state_copy.outcomes
-        self.input_data_ports = self.state_copy.input_data_ports
-        self.output_data_ports = self.state_copy.output_data_ports
+        self.outcomes = {outcome_id: copy(outcome) for outcome_id, outcome in library_template.outcomes.iteritems()}
+        self.input_data_ports = {data_port_id: copy(data_port)
+                                 for data_port_id, data_port in library_template.input_data_ports.iteritems()}
+        self.output_data_ports = {data_port_id: copy(data_port)
+                                  for data_port_id, data_port in library_template.output_data_ports.iteritems()}
 
         # handle input runtime values
         self.input_data_port_runtime_values = input_data_port_runtime_values
@@ -171,7 +181,7 @@ class LibraryState(State):
         # logger.info("compare method \n\t\t\t{0} \n\t\t\t{1}".format(self, other))
         if not isinstance(other, self.__class__):
             return False
-        return str(self) == str(other) and self._state_copy == other.state_copy
+        return str(self) == str(other) and self._library_root_state == other._library_root_state
 
     def __copy__(self):
         outcomes = {elem_id: copy(elem) for elem_id, elem in self.outcomes.iteritems()}
@@ -195,11 +205,12 @@ class LibraryState(State):
     def destroy(self, recursive=True):
         super(LibraryState, self).destroy(recursive)
         if recursive:
-            if self.state_copy:
-                self.state_copy.destroy(recursive)
-            else:
+            if self._state_copy:
+                self._state_copy.destroy(recursive)
+            elif self._library_template is None:
                 logger.verbose("Multiple calls of destroy {0}".format(self))
             self._state_copy = None
+            self._library_template = None
 
     def run(self):
         """ This defines the sequence of actions that are taken when the library state is executed
@@ -208,7 +219,7 @@ class LibraryState(State):
         :return:
         """
         self.state_execution_status = StateExecutionStatus.ACTIVE
-        logger.debug("Entering library state '{0}' with name '{1}'".format(self.library_name, self.name))
+        logger.debug("Entering library state '%s' with name '%s'", self.library_name, self.name)
         # self.state_copy.parent = self.parent
         self.state_copy._run_id = self._run_id
         self.state_copy.input_data = self.input_data
@@ -216,7 +227,7 @@ class LibraryState(State):
         self.state_copy.execution_history = self.execution_history
         self.state_copy.backward_execution = self.backward_execution
         self.state_copy.run()
-        logger.debug("Exiting library state '{0}' with name '{1}'".format(self.library_name, self.name))
+        logger.debug("Exiting library state '%s' with name '%s'", self.library_name, self.name)
         self.state_execution_status = StateExecutionStatus.WAIT_FOR_NEXT_STATE
         self.finalize(self.state_copy.final_outcome)
 
@@ -224,19 +235,25 @@ class LibraryState(State):
         """Preempt the state and all of it child states.
         """
         super(LibraryState, self).recursively_preempt_states()
-        self.state_copy.recursively_preempt_states()
+        # a library state without state copy has never been executed
+        if self._state_copy:
+            self._state_copy.recursively_preempt_states()
 
     def recursively_pause_states(self):
         """Pause the state and all of it child states.
         """
         super(LibraryState, self).recursively_pause_states()
-        self.state_copy.recursively_pause_states()
+        # a library state without state copy has never been executed
+        if self._state_copy:
+            self._state_copy.recursively_pause_states()
 
     def recursively_resume_states(self):
         """Resume the state and all of it child states.
         """
         super(LibraryState, self).recursively_resume_states()
-        self.state_copy.recursively_resume_states()
+        # a library state without state copy has never been executed
+        if self._state_copy:
+            self._state_copy.recursively_resume_states()
 
     @lock_state_machine
     def add_outcome(self, name, outcome_id=None):
@@ -316,7 +333,7 @@ class LibraryState(State):
     @lock_state_machine
     @Observable.observed
     def set_input_runtime_value(self, input_data_port_id, value):
-        checked_value = self.state_copy.input_data_ports[input_data_port_id].check_default_value(value)
+        checked_value = self.input_data_ports[input_data_port_id].check_default_value(value)
         self._input_data_port_runtime_values[input_data_port_id] = checked_value
 
     @lock_state_machine
@@ -327,7 +344,7 @@ class LibraryState(State):
     @lock_state_machine
     @Observable.observed
     def set_output_runtime_value(self, output_data_port_id, value):
-        checked_value = self.state_copy.output_data_ports[output_data_port_id].check_default_value(value)
+        checked_value = self.output_data_ports[output_data_port_id].check_default_value(value)
         self._output_data_port_runtime_values[output_data_port_id] = checked_value
 
     @lock_state_machine
@@ -367,9 +384,19 @@ class LibraryState(State):
                    input_data_port_runtime_values, use_runtime_value_input_data_ports,
                    output_data_port_runtime_values, use_runtime_value_output_data_ports)
 
-    def update_hash(self, obj_hash):
-        super(LibraryState, self).update_hash(obj_hash)
-        self.state_copy.update_hash(obj_hash)
+    def update_content_hash(self, obj_hash):
+        super(LibraryState, self).update_content_hash(obj_hash)
+        self._library_root_state.update_hash(obj_hash)
+
+    def invalidate_path(self):
+        """Invalidates the cached paths of the library state and of its state copy
+
+        See :meth:`rafcon.core.states.state.State.invalidate_path`.
+        """
+        if self._path_cache is not None:
+            super(LibraryState, self).invalidate_path()
+            if self._state_copy is not None:
+                self._state_copy.invalidate_path()
 
     @staticmethod
     def state_to_dict(state):
@@ -392,14 +419,14 @@ class LibraryState(State):
         Returns the numer of child states. As per default states do not have child states return 1.
         :return:
         """
-        return self.state_copy.get_states_statistics(hierarchy_level)
+        return self._library_root_state.get_states_statistics(hierarchy_level)
 
     def get_number_of_transitions(self):
         """
         Return the number of transitions for a state. Per default states do not have transitions.
         :return:
         """
-        return self.state_copy.get_number_of_transitions()
+        return self._library_root_state.get_number_of_transitions()
 
     #########################################################################
     # Properties for all class fields that must be observed by gtkmvc
@@ -457,7 +484,10 @@ class LibraryState(State):
     def state_copy(self):
         """Property for the _state_copy field
 
+        The state copy is created from the library template on first access.
         """
+        if self._state_copy is None and self._library_template is not None:
+            self._materialize_state_copy()
         return self._state_copy
 
     @state_copy.setter
@@ -469,6 +499,38 @@ class LibraryState(State):
 
         self._state_copy = state_copy
 
+    @property
+    def state_copy_materialized(self):
+        """Whether the state copy of the library state has already been created
+
+        :rtype: bool
+        """
+        return self._state_copy is not None
+
+    @property
+    def _library_root_state(self):
+        """The state copy if already created, otherwise the library template
+
+        Only to be used for read access, as the template is shared by all library states of the library.
+        """
+        return self._state_copy if self._state_copy is not None else self._library_template
+
+    def _materialize_state_copy(self):
+        """Creates the state copy from the library template
+
+        The outcomes and data ports of the state copy are replaced by those of the library state, thus they are shared
+        like before the lazy creation of the state copy.
+        """
+        with _state_copy_lock:
+            if self._state_copy is not None:
+                return
+            state_copy = deepcopy(self._library_template)
+            state_copy._outcomes = self._outcomes
+            state_copy._input_data_ports = self._input_data_ports
+            state_copy._output_data_ports = self._output_data_ports
+            state_copy.parent = self
+            self._state_copy = state_copy
+
     @property
     def input_data_port_runtime_values(self):
         """Property for the _input_data_port_runtime_values field
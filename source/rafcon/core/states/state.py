@@ -24,6 +24,7 @@
 import Queue
 import copy
 import os
+import hashlib
 import threading
 from __builtin__ import staticmethod
 from weakref import ref
@@ -35,6 +36,7 @@ from jsonconversion.jsonobject import JSONObject
 from yaml import YAMLObject
 
 from rafcon.core.id_generator import *
+from rafcon.core.execution.execution_status_bus import execution_status_bus
 from rafcon.core.state_elements.state_element import StateElement
 from rafcon.core.state_elements.data_port import DataPort, InputDataPort, OutputDataPort
 from rafcon.core.state_elements.outcome import Outcome
@@ -70,6 +72,8 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
     """
 
     _parent = None
+    _hash_digest = None
+    _path_cache = None
     _state_element_attrs = ['outcomes', 'input_data_ports', 'output_data_ports']
 
     def __init__(self, name=None, state_id=None, input_data_ports=None, output_data_ports=None, outcomes=None,
@@ -181,9 +185,64 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self.state_to_dict(self)
 
     def update_hash(self, obj_hash):
+        obj_hash.update(self.hash_digest)
+        return obj_hash
+
+    def update_content_hash(self, obj_hash):
+        """Updates a hash with the data of the state, which is stored in the file system
+
+        Derived classes extend this method with their additional data, container states with the digests of their
+        child states.
+
+        :param obj_hash: The hash object (see Python hashlib)
+        """
+        obj_hash.update(self.__class__.__name__)
         Hashable.update_hash_from_dict(obj_hash, self.to_dict())
         Hashable.update_hash_from_dict(obj_hash, self.semantic_data)
-        return obj_hash
+
+    @property
+    def hash_digest(self):
+        """The SHA-256 digest of the state including all its descendants
+
+        The digest is cached and only computed again after a modification of the state or one of its descendants, see
+        :meth:`invalidate_hash`. Thus, the digest of a root state can be computed in O(depth) after a local change.
+
+        :rtype: str
+        """
+        hash_digest = self._hash_digest
+        if hash_digest is None:
+            state_machine = self.get_state_machine()
+            if state_machine:
+                state_machine.acquire_modification_lock()
+            try:
+                obj_hash = hashlib.sha256()
+                self.update_content_hash(obj_hash)
+                hash_digest = self._hash_digest = obj_hash.digest()
+            finally:
+                if state_machine:
+                    state_machine.release_modification_lock()
+        return hash_digest
+
+    def invalidate_hash(self):
+        """Invalidates the cached digest of the state and of all its ancestors
+
+        The method is called for each modification of a state or of its state elements by the
+        :func:`rafcon.core.decorators.lock_state_machine` decorator. As the digest of a state is only computed together
+        with the digests of its descendants, an ancestor of a state without digest has no digest either.
+        """
+        state = self
+        while isinstance(state, State) and state._hash_digest is not None:
+            state._hash_digest = None
+            state = state.parent
+
+    def invalidate_path(self):
+        """Invalidates the cached paths of the state and of all its descendants
+
+        The method is called whenever the state is renamed, re-parented or gets a new id. As the path of a state is only
+        computed together with the paths of its ancestors, a descendant of a state without cached path has no cached path
+        either.
+        """
+        self._path_cache = None
 
     @classmethod
     def from_dict(cls, dictionary):
@@ -233,17 +292,42 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
     # ---------------------------------------------------------------------------------------------
 
     # give the state the appearance of a thread that can be started several times
-    def start(self, execution_history, backward_execution=False, generate_run_id=True):
+    def start(self, execution_history, backward_execution=False, generate_run_id=True, thread_pool=None):
         """ Starts the execution of the state in a new thread.
 
+        :param execution_history: the execution history the state pushes its history items to
+        :param bool backward_execution: whether the state is executed backwards
+        :param bool generate_run_id: whether a new run id is generated for this run
+        :param rafcon.utils.thread_pool.ThreadPool thread_pool: if given, the state is executed by a (reused) worker of
+            the pool instead of a new thread
         :return:
         """
+        self._prepare_execution(execution_history, backward_execution, generate_run_id)
+        if thread_pool is not None:
+            self.thread = thread_pool.submit(self.run)
+        else:
+            self.thread = threading.Thread(target=self.run)
+            self.thread.start()
+
+    def run_inline(self, execution_history, backward_execution=False, generate_run_id=True):
+        """ Executes the state in the thread of the caller
+
+        This is the counterpart of calling :meth:`start` directly followed by :meth:`join`, without the overhead of
+        creating a new thread. The method returns after the state finished its execution.
+
+        :param execution_history: the execution history the state pushes its history items to
+        :param bool backward_execution: whether the state is executed backwards
+        :param bool generate_run_id: whether a new run id is generated for this run
+        """
+        self._prepare_execution(execution_history, backward_execution, generate_run_id)
+        self.thread = None
+        self.run()
+
+    def _prepare_execution(self, execution_history, backward_execution, generate_run_id):
         self.execution_history = execution_history
         if generate_run_id:
             self._run_id = run_id_generator()
         self.backward_execution = copy.copy(backward_execution)
-        self.thread = threading.Thread(target=self.run)
-        self.thread.start()
 
     def generate_run_id(self):
         self._run_id = run_id_generator()
@@ -256,7 +340,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
             self.thread.join()
             self.thread = None
         else:
-            logger.debug("Cannot join {0}, as the state hasn't been started, yet or is already finished!".format(self))
+            logger.debug("Cannot join %s, as the state hasn't been started, yet or is already finished!", self)
 
     def setup_run(self):
         """ Executes a generic set of actions that has to be called in the run methods of each derived state class.
@@ -341,7 +425,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
                 result_dict[value.name] = global_value
             else:
                 # set input to its default value
-                result_dict[value.name] = copy.copy(default)
+                result_dict[value.name] = default if value.pass_by_reference else copy.copy(default)
         return result_dict
 
     @staticmethod
@@ -520,26 +604,30 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         concatenates either State.state_id (always unique) or State.name (maybe not unique but human readable) as
         state identifier for the path.
 
+        The paths are cached and only created again after the state or one of its ancestors was renamed, re-parented
+        or got a new id, see :meth:`invalidate_path`.
+
         :param str appendix: the part of the path that was already calculated by previous function calls
         :param bool by_name: The boolean enables name usage to generate the path
         :rtype: str
         :return: the full path to the root state
         """
-        if by_name:
-            state_identifier = self.name
-        else:
-            state_identifier = self.state_id
-
-        if not self.is_root_state:
-            if appendix is None:
-                return self.parent.get_path(state_identifier, by_name)
+        path_cache = self._path_cache
+        if path_cache is None or by_name not in path_cache:
+            state_identifier = self.name if by_name else self.state_id
+            if self.is_root_state:
+                path = state_identifier
             else:
-                return self.parent.get_path(state_identifier + PATH_SEPARATOR + appendix, by_name)
+                path = self.parent.get_path(by_name=by_name) + PATH_SEPARATOR + state_identifier
+            if path_cache is None:
+                path_cache = self._path_cache = {}
+            path_cache[by_name] = path
         else:
-            if appendix is None:
-                return state_identifier
-            else:
-                return state_identifier + PATH_SEPARATOR + appendix
+            path = path_cache[by_name]
+
+        if appendix is None:
+            return path
+        return path + PATH_SEPARATOR + appendix
 
     def get_storage_path(self, appendix=None):
         """ Recursively create the storage path of the state.
@@ -590,7 +678,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._file_system_path
 
     @file_system_path.setter
-    @lock_state_machine
+    @lock_state_machine(invalidate_hash=False)
     def file_system_path(self, file_system_path):
         """Setter for file_system_path attribute of state
 
@@ -856,6 +944,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
                 state_id = state_id_generator(used_state_ids=used_ids)
 
         self._state_id = state_id
+        self.invalidate_path()
 
     def get_states_statistics(self, hierarchy_level):
         """Get states statistic tuple
@@ -889,6 +978,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
 
         return target_dict
 
+    @lock_state_machine
     @Observable.observed
     def add_semantic_data(self, path_as_list, value, key):
         """ Adds a semantic data entry.
@@ -903,6 +993,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         target_dict[key] = value
         return path_as_list + [key]
 
+    @lock_state_machine
     @Observable.observed
     def remove_semantic_data(self, path_as_list):
         """ Removes a entry from the semantic data vividict.
@@ -968,6 +1059,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
                 raise ValueError("Name must have at least one character")
 
         self._name = name
+        self.invalidate_path()
 
     @property
     def parent(self):
@@ -993,6 +1085,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
                 raise TypeError("parent must be of type State or StateMachine or None")
 
             self._parent = ref(parent)
+        self.invalidate_path()
 
     @property
     def input_data_ports(self):
@@ -1164,6 +1257,10 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
             if old_outcome not in self._outcomes.itervalues() and old_outcome.parent is self:
                 old_outcome.parent = None
 
+    # The following execution time properties (input_data, output_data, preempted, started, paused,
+    # concurrency_queue, final_outcome and state_execution_status) are no part of the state machine definition. Their
+    # setters only assign a single reference, thus they do not lock the state machine.
+
     @property
     def input_data(self):
         """Property for the _input_data field
@@ -1172,7 +1269,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._input_data
 
     @input_data.setter
-    @lock_state_machine
     #@Observable.observed
     def input_data(self, input_data):
         if not isinstance(input_data, dict):
@@ -1187,7 +1283,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._output_data
 
     @output_data.setter
-    @lock_state_machine
     #@Observable.observed
     def output_data(self, output_data):
         if not isinstance(output_data, dict):
@@ -1201,7 +1296,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._preempted.is_set()
 
     @preempted.setter
-    @lock_state_machine
     def preempted(self, preempted):
         if not isinstance(preempted, bool):
             raise TypeError("preempted must be of type bool")
@@ -1217,7 +1311,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._started.is_set()
 
     @started.setter
-    @lock_state_machine
     def started(self, started):
         if not isinstance(started, bool):
             raise TypeError("started must be of type bool")
@@ -1233,7 +1326,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._paused.is_set()
 
     @paused.setter
-    @lock_state_machine
     def paused(self, paused):
         if not isinstance(paused, bool):
             raise TypeError("paused must be of type bool")
@@ -1268,7 +1360,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._concurrency_queue
 
     @concurrency_queue.setter
-    @lock_state_machine
     #@Observable.observed
     def concurrency_queue(self, concurrency_queue):
         if not isinstance(concurrency_queue, Queue.Queue):
@@ -1287,7 +1378,6 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._final_outcome
 
     @final_outcome.setter
-    @lock_state_machine
     #@Observable.observed
     def final_outcome(self, final_outcome):
         if not isinstance(final_outcome, Outcome):
@@ -1333,13 +1423,33 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         return self._state_execution_status
 
     @state_execution_status.setter
-    @lock_state_machine
-    @Observable.observed
     def state_execution_status(self, state_execution_status):
+        """Setter for the _state_execution_status field
+
+        If the execution status bus has subscribers, the observers of the state are not notified within the calling
+        thread, but later by the subscribers, see :mod:`rafcon.core.execution.execution_status_bus`.
+        """
         if not isinstance(state_execution_status, StateExecutionStatus):
             raise TypeError("state_execution_status must be of type StateExecutionStatus")
 
-        self._state_execution_status = state_execution_status
+        if execution_status_bus.active:
+            self._state_execution_status = state_execution_status
+            if not execution_status_bus.publish(self):  # the last subscriber is gone in the meantime
+                self.notify_state_execution_status()
+        else:
+            args = (self, state_execution_status)
+            self._notify_method_before(self, "state_execution_status", args, {})
+            self._state_execution_status = state_execution_status
+            self._notify_method_after(self, "state_execution_status", None, args, {})
+
+    def notify_state_execution_status(self):
+        """Notifies the observers of the state about its current execution status
+
+        The notification looks like the one of a change of the execution status.
+        """
+        args = (self, self._state_execution_status)
+        self._notify_method_before(self, "state_execution_status", args, {})
+        self._notify_method_after(self, "state_execution_status", None, args, {})
 
     @property
     def is_root_state(self):
@@ -1414,7 +1524,7 @@ class State(Observable, YAMLObject, JSONObject, Hashable):
         if self.concurrency_queue:
             self.concurrency_queue.put(self.state_id)
 
-        logger.debug("Finished execution of {0}: {1}".format(self, self.final_outcome))
+        logger.debug("Finished execution of %s: %s", self, self.final_outcome)
 
         return None
 
@@ -0,0 +1,197 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: packed_storage
+   :synopsis: A single file format for state machines
+
+A packed state machine file holds all files of a state machine directory (state machine file and for each state its
+core data, script, semantic data and meta data file). It consists of a magic string, the contents of all files, a
+table of contents and a trailer:
+
+* the table of contents is a JSON object mapping the relative path of each file to the offset and length of its
+  content
+* the trailer holds the offset and the length of the table of contents
+
+The file is memory-mapped when opened, thus only the table of contents is read and decoded upfront, the contents of
+all other files are only read, when they are accessed.
+"""
+
+import os
+import json
+import mmap
+import struct
+import shutil
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+MAGIC = "RAFCONSM\x01"
+PACKED_STATE_MACHINE_EXTENSION = ".rafconsm"
+
+_TRAILER = struct.Struct(">QQ")
+
+
+def is_packed_state_machine(path):
+    """Checks whether a path points to a packed state machine file
+
+    :param str path: the path to check
+    :rtype: bool
+    """
+    if not os.path.isfile(path):
+        return False
+    with open(path, 'rb') as packed_file:
+        return packed_file.read(len(MAGIC)) == MAGIC
+
+
+def split_packed_path(path):
+    """Splits a path into the path of a packed state machine file and the path within the packed file
+
+    States of packed state machines have virtual file system paths, consisting of the path of the packed file and the
+    path of the state directory within the packed file.
+
+    :param str path: the path to split
+    :return: the path of the packed file and the relative path within it or None, None if the path does not point into
+        a packed file
+    :rtype: str, str
+    """
+    packed_path, relative_path = path, ""
+    while packed_path and packed_path != os.path.dirname(packed_path):
+        if packed_path.endswith(PACKED_STATE_MACHINE_EXTENSION) and os.path.isfile(packed_path):
+            return packed_path, relative_path
+        packed_path, name = os.path.split(packed_path)
+        relative_path = os.path.join(name, relative_path) if relative_path else name
+    return None, None
+
+
+class PackedStateMachineFile(object):
+    """Read access to a packed state machine file
+
+    :ivar str filename: the path of the packed file
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as packed_file:
+            if packed_file.read(len(MAGIC)) != MAGIC:
+                raise ValueError("{0} is not a packed state machine".format(filename))
+            self._map = mmap.mmap(packed_file.fileno(), 0, access=mmap.ACCESS_READ)
+        toc_offset, toc_length = _TRAILER.unpack(self._map[-_TRAILER.size:])
+        # the paths were written as utf-8 encoded byte strings like those returned by os.walk
+        self._files = {path.encode('utf-8'): location for path, location in
+                       json.loads(self._map[toc_offset:toc_offset + toc_length]).iteritems()}
+        self._directories = None
+
+    def __contains__(self, relative_path):
+        return relative_path in self._files
+
+    def read(self, relative_path):
+        """Reads a file from the packed state machine
+
+        :param str relative_path: the path of the file within the packed state machine
+        :return: the content of the file or None, if the file does not exist
+        :rtype: str
+        """
+        if relative_path not in self._files:
+            return None
+        offset, length = self._files[relative_path]
+        return self._map[offset:offset + length]
+
+    def list_directory(self, relative_path):
+        """Lists the sub-directories of a directory within the packed state machine
+
+        :param str relative_path: the path of the directory within the packed state machine, "" for the top level
+        :return: the sorted names of the sub-directories
+        :rtype: list
+        """
+        if self._directories is None:
+            self._directories = {}
+            for file_path in self._files:
+                path = os.path.dirname(file_path)
+                while path:
+                    parent, name = os.path.split(path)
+                    self._directories.setdefault(parent, set()).add(name)
+                    path = parent
+        return sorted(self._directories.get(relative_path, ()))
+
+    @property
+    def file_paths(self):
+        return sorted(self._files)
+
+    def close(self):
+        self._map.close()
+
+
+def pack_state_machine(directory, filename):
+    """Packs a state machine directory into a single file
+
+    :param str directory: the path of the state machine directory
+    :param str filename: the path of the packed file to create
+    """
+    files = {}
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, 'wb') as packed_file:
+        packed_file.write(MAGIC)
+        for dir_path, dir_names, file_names in os.walk(directory):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                file_path = os.path.join(dir_path, file_name)
+                with open(file_path, 'rb') as source_file:
+                    content = source_file.read()
+                files[os.path.relpath(file_path, directory)] = [packed_file.tell(), len(content)]
+                packed_file.write(content)
+        toc_offset = packed_file.tell()
+        toc = json.dumps(files, sort_keys=True)
+        packed_file.write(toc)
+        packed_file.write(_TRAILER.pack(toc_offset, len(toc)))
+    os.rename(tmp_filename, filename)
+
+
+def unpack_state_machine(filename, directory):
+    """Unpacks a packed state machine file into a state machine directory
+
+    :param str filename: the path of the packed file
+    :param str directory: the path of the state machine directory to create; an existing directory is replaced
+    """
+    packed_file = PackedStateMachineFile(filename)
+    try:
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+        for relative_path in packed_file.file_paths:
+            file_path = os.path.join(directory, relative_path)
+            if not os.path.isdir(os.path.dirname(file_path)):
+                os.makedirs(os.path.dirname(file_path))
+            with open(file_path, 'wb') as target_file:
+                target_file.write(packed_file.read(relative_path))
+    finally:
+        packed_file.close()
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Converts a state machine directory into a packed state machine "
+                                                 "file and vice versa")
+    parser.add_argument("source", help="path to the state machine directory or packed state machine file")
+    parser.add_argument("target", help="path to the packed state machine file or state machine directory to create",
+                        default=None, nargs='?')
+    args = parser.parse_args()
+    source = os.path.abspath(args.source)
+    if is_packed_state_machine(source):
+        target = args.target or os.path.splitext(source)[0]
+        unpack_state_machine(source, target)
+    else:
+        target = args.target or source.rstrip(os.sep) + PACKED_STATE_MACHINE_EXTENSION
+        pack_state_machine(source, target)
+    logger.info("Converted {0} to {1}".format(source, target))
+
+
+if __name__ == '__main__':
+    main()
@@ -23,11 +23,16 @@ import shutil
 import glob
 import copy
 import yaml
+import hashlib
+import tempfile
+from collections import namedtuple
+from threading import Lock
+from multiprocessing.pool import ThreadPool
 from distutils.version import StrictVersion
 
 import rafcon
 
-from rafcon.utils.filesystem import read_file, write_file
+from rafcon.utils.filesystem import read_file
 from rafcon.utils import storage_utils
 from rafcon.utils import log
 from rafcon.utils.timer import measure_time
@@ -36,11 +41,20 @@ from rafcon.core.custom_exceptions import LibraryNotFoundException
 from rafcon.core.constants import DEFAULT_SCRIPT_PATH
 from rafcon.core.config import global_config
 from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage.packed_storage import PackedStateMachineFile, PACKED_STATE_MACHINE_EXTENSION, \
+    is_packed_state_machine, split_packed_path, pack_state_machine
 
 logger = log.get_logger(__name__)
 
 LIBRARY_NOT_FOUND_DUMMY_STATE_NAME = "LIBRARY NOT FOUND DUMMY STATE"
 
+# levels of a state machine with less state directories are read sequentially, as threads do not pay off for them
+MIN_STATE_DIRECTORIES_FOR_CONCURRENT_READING = 16
+
+_read_thread_pool = None
+_read_thread_pool_size = 0
+_read_thread_pool_lock = Lock()
+
 #: File names for various purposes
 FILE_NAME_META_DATA = 'meta_data.json'
 FILE_NAME_META_DATA_OLD = 'gui_gtk.json'
@@ -61,6 +75,78 @@ if os.path.exists(DEFAULT_SCRIPT_PATH):
     for f in files:
         shutil.rmtree(f)
 
+# digest, size and modification time of all files written by write_file_if_changed, indexed by the file path
+_written_files = {}
+# hash digest of the states, the JSON format they were saved with and the files of their sub-trees, indexed by the
+# path of the state folder
+_saved_state_digests = {}
+# guards _written_files and _saved_state_digests, as state machines are saved by the GUI and the auto backup thread
+_written_files_lock = Lock()
+
+
+def _is_written_file(file_path):
+    """Checks whether a file was written by write_file_if_changed and not forgotten since
+
+    :param str file_path: the path of the file
+    :rtype: bool
+    """
+    with _written_files_lock:
+        return file_path in _written_files
+
+
+def _is_written_file_unchanged(file_path, digest=None):
+    """Checks whether a file written by write_file_if_changed was not modified since
+
+    :param str file_path: the path of the file
+    :param str digest: if given, the digest of the content the file is expected to hold
+    :rtype: bool
+    """
+    with _written_files_lock:
+        written_file = _written_files.get(file_path)
+    if written_file is None or (digest is not None and written_file[0] != digest):
+        return False
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return False
+    return (file_stat.st_size, file_stat.st_mtime) == written_file[1:]
+
+
+def write_file_if_changed(file_path, content):
+    """Writes a file, unless it already holds the given content
+
+    The digest of the content of each written file is remembered. A file, which was not modified since it was written
+    by this function, is not written again, if its content did not change. Thus, saving a state machine again only
+    writes the files of the changed states.
+
+    :param str file_path: the path of the file
+    :param str content: the content of the file
+    :return: whether the file was written
+    :rtype: bool
+    """
+    digest = hashlib.sha1(content).digest()
+    if _is_written_file_unchanged(file_path, digest):
+        return False
+    with open(file_path, 'w') as file_pointer:
+        file_pointer.write(content)
+    file_stat = os.stat(file_path)
+    with _written_files_lock:
+        _written_files[file_path] = (digest, file_stat.st_size, file_stat.st_mtime)
+    return True
+
+
+def forget_written_files(path):
+    """Forgets the digests of all files written to a path, e.g. because the path was removed
+
+    :param str path: the path of a file or directory
+    """
+    prefix = os.path.join(path, '')
+    with _written_files_lock:
+        for cache in (_written_files, _saved_state_digests):
+            for cached_path in [cached_path for cached_path in cache if cached_path == path or
+                                cached_path.startswith(prefix)]:
+                del cache[cached_path]
+
 
 def remove_obsolete_folders(states, path):
     """Removes obsolete state machine folders
@@ -88,6 +174,7 @@ def remove_obsolete_folders(states, path):
     # remove the remaining state folders
     for folder_name in state_folders_in_file_system:
         shutil.rmtree(os.path.join(path, folder_name))
+        forget_written_files(os.path.join(path, folder_name))
 
 
 def clean_path_from_deprecated_naming(base_path):
@@ -142,17 +229,30 @@ def clean_path(base_path):
     return base_path
 
 
-def save_state_machine_to_path(state_machine, base_path, delete_old_state_machine=False, as_copy=False):
+def save_state_machine_to_path(state_machine, base_path, delete_old_state_machine=False, as_copy=False,
+                               compact_json=False):
     """Saves a state machine recursively to the file system
 
     The `as_copy` flag determines whether the state machine is saved as copy. If so (`as_copy=True`), some state
     machine attributes will be left untouched, such as the `file_system_path` or the `dirty_flag`.
 
+    Only the files of states, which changed since the last save to the same path, are written, see
+    :func:`write_file_if_changed`. Sub-trees of states with unchanged hash digest are skipped completely, unless one of
+    their files was modified or deleted in the meantime. The folders of removed states are deleted. `delete_old_state_machine` enforces writing all files.
+
+    If the base_path has the extension of packed state machines (see
+    :mod:`rafcon.core.storage.packed_storage`), the state machine is saved as single packed file.
+
     :param rafcon.core.state_machine.StateMachine state_machine: the state_machine to be saved
     :param str base_path: base_path to which all further relative paths refers to
     :param bool delete_old_state_machine: Whether to delete any state machine existing at the given path
     :param bool as_copy: Whether to use a copy storage for the state machine
+    :param bool compact_json: Whether to write the JSON files in the compact format, e.g. for backups
     """
+    if base_path.endswith(PACKED_STATE_MACHINE_EXTENSION):
+        save_packed_state_machine_to_path(state_machine, base_path, as_copy)
+        return
+
     # warns the user in the logger when using deprecated names
     clean_path_from_deprecated_naming(base_path)
 
@@ -164,6 +264,7 @@ def save_state_machine_to_path(state_machine, base_path, delete_old_state_machin
         if delete_old_state_machine:
             if os.path.exists(base_path):
                 shutil.rmtree(base_path)
+            forget_written_files(base_path)
 
         # Ensure that path is existing
         if not os.path.exists(base_path):
@@ -172,7 +273,8 @@ def save_state_machine_to_path(state_machine, base_path, delete_old_state_machin
         old_update_time = state_machine.last_update
         state_machine.last_update = storage_utils.get_current_time_string()
         state_machine_dict = state_machine.to_dict()
-        storage_utils.write_dict_to_json(state_machine_dict, os.path.join(base_path, STATEMACHINE_FILE))
+        write_file_if_changed(os.path.join(base_path, STATEMACHINE_FILE),
+                              storage_utils.dict_to_json_string(state_machine_dict, compact_json))
 
         # set the file_system_path of the state machine
         if not as_copy:
@@ -182,7 +284,7 @@ def save_state_machine_to_path(state_machine, base_path, delete_old_state_machin
 
         # add root state recursively
         remove_obsolete_folders([root_state], base_path)
-        save_state_recursively(root_state, base_path, "", as_copy)
+        save_state_recursively(root_state, base_path, "", as_copy, compact_json)
 
         if state_machine.marked_dirty and not as_copy:
             state_machine.marked_dirty = False
@@ -193,6 +295,50 @@ def save_state_machine_to_path(state_machine, base_path, delete_old_state_machin
         state_machine.release_modification_lock()
 
 
+def save_packed_state_machine_to_path(state_machine, filename, as_copy=False, store_meta_data=None):
+    """Saves a state machine as single packed file
+
+    The state machine is saved to a temporary directory, which is then packed.
+
+    :param rafcon.core.state_machine.StateMachine state_machine: the state_machine to be saved
+    :param str filename: the path of the packed file
+    :param bool as_copy: Whether to use a copy storage for the state machine
+    :param store_meta_data: Optional function storing the meta data of the state machine (e.g. of the GUI), it is
+        called with the path of the temporary directory before it is packed
+    """
+    tmp_path = tempfile.mkdtemp(dir=DEFAULT_SCRIPT_PATH)
+    state_machine.acquire_modification_lock()
+    try:
+        if not as_copy:
+            state_machine.last_update = storage_utils.get_current_time_string()
+        save_state_machine_to_path(state_machine, os.path.join(tmp_path, "state_machine"), as_copy=True)
+        if store_meta_data is not None:
+            store_meta_data(os.path.join(tmp_path, "state_machine"))
+        pack_state_machine(os.path.join(tmp_path, "state_machine"), filename)
+        if not as_copy:
+            state_machine.file_system_path = filename
+            _set_file_system_paths(state_machine.root_state, filename)
+            state_machine.marked_dirty = False
+        logger.debug("State machine with id {0} was saved at {1}".format(state_machine.state_machine_id, filename))
+    finally:
+        state_machine.release_modification_lock()
+        shutil.rmtree(tmp_path)
+        forget_written_files(tmp_path)
+
+
+def _set_file_system_paths(state, parent_path):
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.states.container_state import ContainerState
+    state_path = os.path.join(parent_path, get_storage_id_for_state(state))
+    state.file_system_path = state_path
+    if isinstance(state, ExecutionState):
+        state.script.filename = SCRIPT_FILE
+        state.script.path = state_path
+    if isinstance(state, ContainerState):
+        for child_state in state.states.itervalues():
+            _set_file_system_paths(child_state, state_path)
+
+
 def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=False):
     """Saves the script file for a state to the directory of the state.
 
@@ -208,7 +354,7 @@ def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=F
         destination_script_file = os.path.join(state_path_full, SCRIPT_FILE)
 
         try:
-            write_file(destination_script_file, state.script_text)
+            write_file_if_changed(destination_script_file, state.script_text)
         except Exception:
             logger.exception("Storing of script file failed: {0} -> {1}".format(state.get_path(),
                                                                                 destination_script_file))
@@ -219,24 +365,26 @@ def save_script_file_for_state_and_source_path(state, state_path_full, as_copy=F
             state.script.path = state_path_full
 
 
-def save_semantic_data_for_state(state, state_path_full):
+def save_semantic_data_for_state(state, state_path_full, compact_json=False):
     """Saves the semantic data in a separate json file.
 
     :param state: The state of which the script file should be saved
     :param str state_path_full: The path to the file system storage location of the state
+    :param bool compact_json: Whether to write the JSON file in the compact format
     """
 
     destination_script_file = os.path.join(state_path_full, SEMANTIC_DATA_FILE)
 
     try:
-        storage_utils.write_dict_to_json(state.semantic_data, destination_script_file)
+        write_file_if_changed(destination_script_file,
+                              storage_utils.dict_to_json_string(state.semantic_data, compact_json))
     except IOError:
         logger.exception("Storing of semantic data for state {0} failed! Destination path: {1}".
                          format(state.get_path(), destination_script_file))
         raise
 
 
-def save_state_recursively(state, base_path, parent_path, as_copy=False):
+def save_state_recursively(state, base_path, parent_path, as_copy=False, compact_json=False):
     """Recursively saves a state to a json file
 
     It calls this method on all its substates.
@@ -245,30 +393,55 @@ def save_state_recursively(state, base_path, parent_path, as_copy=False):
     :param base_path: Path to the state machine
     :param parent_path: Path to the parent state
     :param bool as_copy: Temporary storage flag to signal that the given path is not the new file_system_path
-    :return:
+    :param bool compact_json: Whether to write the JSON files in the compact format
+    :return: the paths of the files of the state and its descendants
+    :rtype: list
     """
     from rafcon.core.states.execution_state import ExecutionState
     from rafcon.core.states.container_state import ContainerState
 
     state_path = os.path.join(parent_path, get_storage_id_for_state(state))
     state_path_full = os.path.join(base_path, state_path)
+
+    # skip the whole sub-tree, if neither the state nor any of its descendants changed since the last save to this path
+    # and none of the files of the sub-tree was modified or deleted since
+    hash_digest = state.hash_digest
+    with _written_files_lock:
+        saved_state_digest = _saved_state_digests.get(state_path_full)
+    if saved_state_digest is not None and saved_state_digest[:2] == (hash_digest, compact_json) and \
+            all(_is_written_file_unchanged(file_path) for file_path in saved_state_digest[2]):
+        if not as_copy:
+            _set_file_system_paths(state, os.path.join(base_path, parent_path))
+        return saved_state_digest[2]
+
     if not os.path.exists(state_path_full):
         os.makedirs(state_path_full)
 
-    storage_utils.write_dict_to_json(state, os.path.join(state_path_full, FILE_NAME_CORE_DATA))
+    file_paths = [os.path.join(state_path_full, FILE_NAME_CORE_DATA)]
+    write_file_if_changed(file_paths[0], storage_utils.dict_to_json_string(state, compact_json))
     if not as_copy:
         state.file_system_path = state_path_full
 
     if isinstance(state, ExecutionState):
         save_script_file_for_state_and_source_path(state, state_path_full, as_copy)
+        file_paths.append(os.path.join(state_path_full, SCRIPT_FILE))
+    elif _is_written_file(os.path.join(state_path_full, SCRIPT_FILE)):
+        # the state was an execution state, when it was saved the last time
+        os.remove(os.path.join(state_path_full, SCRIPT_FILE))
+        forget_written_files(os.path.join(state_path_full, SCRIPT_FILE))
 
-    save_semantic_data_for_state(state, state_path_full)
+    save_semantic_data_for_state(state, state_path_full, compact_json)
+    file_paths.append(os.path.join(state_path_full, SEMANTIC_DATA_FILE))
 
     # create yaml files for all children
     if isinstance(state, ContainerState):
         remove_obsolete_folders(state.states.values(), os.path.join(base_path, state_path))
-        for state in state.states.itervalues():
-            save_state_recursively(state, base_path, state_path, as_copy)
+        for child_state in state.states.itervalues():
+            file_paths.extend(save_state_recursively(child_state, base_path, state_path, as_copy, compact_json))
+
+    with _written_files_lock:
+        _saved_state_digests[state_path_full] = (hash_digest, compact_json, tuple(file_paths))
+    return file_paths
 
 
 @measure_time
@@ -281,11 +454,22 @@ def load_state_machine_from_path(base_path, state_machine_id=None):
     """
     logger.debug("Loading state machine from path {0}...".format(base_path))
 
+    if is_packed_state_machine(base_path):
+        packed_file = PackedStateMachineFile(base_path)
+        try:
+            return _load_state_machine(base_path, state_machine_id, packed_file)
+        finally:
+            packed_file.close()
+    return _load_state_machine(base_path, state_machine_id)
+
+
+def _load_state_machine(base_path, state_machine_id=None, packed_file=None):
     state_machine_file_path = os.path.join(base_path, STATEMACHINE_FILE)
     state_machine_file_path_old = os.path.join(base_path, STATEMACHINE_FILE_OLD)
 
     # was the root state specified as state machine base_path to load from?
-    if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
+    if packed_file is None and \
+            not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
 
         # catch the case that a state machine root file is handed
         if os.path.exists(base_path) and os.path.isfile(base_path):
@@ -296,8 +480,11 @@ def load_state_machine_from_path(base_path, state_machine_id=None):
         if not os.path.exists(state_machine_file_path) and not os.path.exists(state_machine_file_path_old):
             raise ValueError("Provided path doesn't contain a valid state machine: {0}".format(base_path))
 
-    if os.path.exists(state_machine_file_path):
-        state_machine_dict = storage_utils.load_objects_from_json(state_machine_file_path)
+    if packed_file is not None or os.path.exists(state_machine_file_path):
+        if packed_file is not None:
+            state_machine_dict = storage_utils.load_objects_from_json_string(packed_file.read(STATEMACHINE_FILE))
+        else:
+            state_machine_dict = storage_utils.load_objects_from_json(state_machine_file_path)
         if 'used_rafcon_version' in state_machine_dict:
             previously_used_rafcon_version = StrictVersion(state_machine_dict['used_rafcon_version']).version
             active_rafcon_version = StrictVersion(rafcon.__version__).version
@@ -363,8 +550,15 @@ def load_state_machine_from_path(base_path, state_machine_id=None):
     root_state_path = os.path.join(base_path, root_state_storage_id)
     state_machine.file_system_path = base_path
     dirty_states = []
+    number_of_threads = global_config.get_config_value("STORAGE_LOAD_THREADS", 0)
+    if packed_file is not None:
+        state_directories = PackedStateDirectories(packed_file, base_path)
+    elif number_of_threads > 1:
+        state_directories = read_state_directories(root_state_path, number_of_threads)
+    else:
+        state_directories = None
     state_machine.root_state = load_state_recursively(parent=state_machine, state_path=root_state_path,
-                                                      dirty_states=dirty_states)
+                                                      dirty_states=dirty_states, state_directories=state_directories)
     if len(dirty_states) > 0:
         state_machine.marked_dirty = True
     else:
@@ -383,13 +577,121 @@ def load_state_machine_from_path(base_path, state_machine_id=None):
 def load_state_from_path(state_path):
     """Loads a state from a given path
 
+    The path can also point to a state within a packed state machine file, in this case only the files of the state
+    and its child states are read from the packed file.
+
     :param state_path: The path of the state on the file system.
     :return: the loaded state
     """
+    packed_path, _ = split_packed_path(state_path)
+    if packed_path is not None:
+        packed_file = PackedStateMachineFile(packed_path)
+        try:
+            return load_state_recursively(parent=None, state_path=state_path,
+                                          state_directories=PackedStateDirectories(packed_file, packed_path))
+        finally:
+            packed_file.close()
     return load_state_recursively(parent=None, state_path=state_path)
 
 
-def load_state_recursively(parent, state_path=None, dirty_states=[]):
+#: The content of the files of a state directory, read by :func:`read_state_directories`
+StateDirectory = namedtuple('StateDirectory', ['path_core_data', 'core_data', 'script', 'semantic_data',
+                                               'child_state_paths'])
+
+
+def read_state_directory(state_path):
+    """Reads the files of a state and lists its child state directories
+
+    :param str state_path: the path of the state directory
+    :return: the content of the core data, script and semantic data file (None for missing files) and the paths of the
+        child state directories
+    :rtype: StateDirectory
+    """
+    path_core_data = os.path.join(state_path, FILE_NAME_CORE_DATA)
+    # TODO: Should be removed with next minor release
+    if not os.path.exists(path_core_data):
+        path_core_data = os.path.join(state_path, FILE_NAME_CORE_DATA_OLD)
+    child_state_paths = [os.path.join(state_path, p) for p in os.listdir(state_path)] if os.path.isdir(state_path) \
+        else []
+    return StateDirectory(path_core_data, read_file(path_core_data), read_file(state_path, SCRIPT_FILE),
+                          read_file(state_path, SEMANTIC_DATA_FILE), filter(os.path.isdir, child_state_paths))
+
+
+def get_read_thread_pool(number_of_threads):
+    """Returns the pool of threads reading state directories
+
+    The pool is shared by all loads of state machines and libraries and only recreated, if the number of threads
+    changes.
+
+    :param int number_of_threads: the number of threads reading files
+    :return: the shared pool of threads
+    :rtype: multiprocessing.pool.ThreadPool
+    """
+    global _read_thread_pool, _read_thread_pool_size
+    with _read_thread_pool_lock:
+        if _read_thread_pool is None or _read_thread_pool_size != number_of_threads:
+            if _read_thread_pool is not None:
+                _read_thread_pool.close()
+            _read_thread_pool = ThreadPool(number_of_threads)
+            _read_thread_pool_size = number_of_threads
+        return _read_thread_pool
+
+
+def read_state_directories(root_state_path, number_of_threads):
+    """Reads the files of all states of a state machine concurrently
+
+    The state directories are read level by level. Levels with at least
+    MIN_STATE_DIRECTORIES_FOR_CONCURRENT_READING state directories are read by the shared pool of threads, smaller
+    levels are read sequentially. Only the reading is done concurrently, the decoding of the files and the creation of
+    the states is done by :func:`load_state_recursively`.
+
+    :param str root_state_path: the path of the root state directory
+    :param int number_of_threads: the number of threads reading files
+    :return: a dict mapping the path of each state directory to its :class:`StateDirectory`
+    :rtype: dict
+    """
+    state_directories = {}
+    state_paths = [root_state_path]
+    while state_paths:
+        if len(state_paths) >= MIN_STATE_DIRECTORIES_FOR_CONCURRENT_READING:
+            level_state_directories = get_read_thread_pool(number_of_threads).map(read_state_directory, state_paths)
+        else:
+            level_state_directories = map(read_state_directory, state_paths)
+        state_directories.update(zip(state_paths, level_state_directories))
+        state_paths = [child_state_path for state_directory in level_state_directories
+                       for child_state_path in state_directory.child_state_paths]
+    return state_directories
+
+
+class PackedStateDirectories(object):
+    """Provides the state directories of a packed state machine file
+
+    The state directories are read from the packed file on demand. The paths of the state directories are virtual, they
+    consist of the path of the packed file and the path of the state directory within the packed file.
+
+    :ivar rafcon.core.storage.packed_storage.PackedStateMachineFile packed_file: the opened packed file
+    :ivar str base_path: the path of the packed file
+    """
+
+    def __init__(self, packed_file, base_path):
+        self.packed_file = packed_file
+        self.base_path = base_path
+
+    def get(self, state_path, default=None):
+        relative_path = os.path.relpath(state_path, self.base_path)
+        path_core_data = os.path.join(relative_path, FILE_NAME_CORE_DATA)
+        # TODO: Should be removed with next minor release
+        if path_core_data not in self.packed_file:
+            path_core_data = os.path.join(relative_path, FILE_NAME_CORE_DATA_OLD)
+        if path_core_data not in self.packed_file:
+            return default
+        return StateDirectory(os.path.join(self.base_path, path_core_data), self.packed_file.read(path_core_data),
+                              self.packed_file.read(os.path.join(relative_path, SCRIPT_FILE)),
+                              self.packed_file.read(os.path.join(relative_path, SEMANTIC_DATA_FILE)),
+                              [os.path.join(state_path, name) for name in self.packed_file.list_directory(relative_path)])
+
+
+def load_state_recursively(parent, state_path=None, dirty_states=[], state_directories=None):
     """Recursively loads the state
 
     It calls this method on each sub-state of a container state.
@@ -397,29 +699,32 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
     :param parent:  the root state of the last load call to which the loaded state will be added
     :param state_path: the path on the filesystem where to find the meta file for the state
     :param dirty_states: a dict of states which changed during loading
+    :param dict state_directories: the already read state directories (see :func:`read_state_directories`), None if
+        the files are to be read by this method
     :return:
     """
     from rafcon.core.states.execution_state import ExecutionState
     from rafcon.core.states.container_state import ContainerState
     from rafcon.core.states.hierarchy_state import HierarchyState
 
-    path_core_data = os.path.join(state_path, FILE_NAME_CORE_DATA)
-
     logger.debug("Load state recursively: {0}".format(str(state_path)))
 
-    # TODO: Should be removed with next minor release
-    if not os.path.exists(path_core_data):
-        path_core_data = os.path.join(state_path, FILE_NAME_CORE_DATA_OLD)
+    state_directory = state_directories.get(state_path) if state_directories is not None else None
+    if state_directory is None:
+        state_directory = read_state_directory(state_path)
+    path_core_data = state_directory.path_core_data
 
     try:
-        state_info = load_data_file(path_core_data)
+        if state_directory.core_data is None:
+            raise ValueError("Data file not found: {0}".format(path_core_data))
+        state_info = storage_utils.load_objects_from_json_string(state_directory.core_data)
     except ValueError, e:
         logger.exception("Error while loading state data: {0}".format(e))
         return
     except LibraryNotFoundException, e:
         logger.error("Library could not be loaded: {0}\n"
                      "Skipping library and continuing loading the state machine".format(str(e.message)))
-        state_info = storage_utils.load_objects_from_json(path_core_data, as_dict=True)
+        state_info = storage_utils.load_objects_from_json_string(state_directory.core_data, as_dict=True)
         state_id = state_info["state_id"]
         dummy_state = HierarchyState(LIBRARY_NOT_FOUND_DUMMY_STATE_NAME, state_id=state_id)
         # set parent of dummy state
@@ -447,12 +752,15 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
 
     # read script file if an execution state
     if isinstance(state, ExecutionState):
-        script_text = read_file(state_path, state.script.filename)
+        if state.script.filename == SCRIPT_FILE:
+            script_text = state_directory.script
+        else:
+            script_text = read_file(state_path, state.script.filename)
         state.script_text = script_text
 
     # load semantic data
     try:
-        semantic_data = load_data_file(os.path.join(state_path, SEMANTIC_DATA_FILE))
+        semantic_data = storage_utils.load_objects_from_json_string(state_directory.semantic_data)
         state.semantic_data = semantic_data
     except Exception, e:
         # semantic data file does not have to be there
@@ -461,12 +769,10 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
     one_of_my_child_states_not_found = False
 
     # load child states
-    for p in os.listdir(state_path):
-        child_state_path = os.path.join(state_path, p)
-        if os.path.isdir(child_state_path):
-            child_state = load_state_recursively(state, child_state_path, dirty_states)
-            if child_state.name is LIBRARY_NOT_FOUND_DUMMY_STATE_NAME:
-                one_of_my_child_states_not_found = True
+    for child_state_path in state_directory.child_state_paths:
+        child_state = load_state_recursively(state, child_state_path, dirty_states, state_directories)
+        if child_state.name is LIBRARY_NOT_FOUND_DUMMY_STATE_NAME:
+            one_of_my_child_states_not_found = True
 
     if one_of_my_child_states_not_found:
         # omit adding transitions and data flows in this case
@@ -488,12 +794,24 @@ def load_state_recursively(parent, state_path=None, dirty_states=[]):
 def load_data_file(path_of_file):
     """ Loads the content of a file by using json.load.
 
+    The file can also be located within a packed state machine file (see :mod:`rafcon.core.storage.packed_storage`),
+    e.g. the meta data file of a state of a packed state machine.
+
     :param path_of_file: the path of the file to load
     :return: the file content as a string
     :raises exceptions.ValueError: if the file was not found
     """
     if os.path.exists(path_of_file):
         return storage_utils.load_objects_from_json(path_of_file)
+    packed_path, relative_path = split_packed_path(path_of_file)
+    if packed_path is not None:
+        packed_file = PackedStateMachineFile(packed_path)
+        try:
+            content = packed_file.read(relative_path)
+        finally:
+            packed_file.close()
+        if content is not None:
+            return storage_utils.load_objects_from_json_string(content)
     raise ValueError("Data file not found: {0}".format(path_of_file))
 
 
@@ -21,12 +21,9 @@ This general Action (one procedure for all possible edition) procedure is expans
 to define specific _-Action-Classes for simple/specific edit actions.
 """
 import copy
-import json
 import difflib
 
 from gtkmvc import ModelMT
-from jsonconversion.decoder import JSONObjectDecoder
-from jsonconversion.encoder import JSONObjectEncoder
 
 from rafcon.core.constants import UNIQUE_DECIDER_STATE_ID
 from rafcon.core.global_variable_manager import GlobalVariableManager
@@ -49,7 +46,7 @@ from rafcon.gui.models import ContainerStateModel, LibraryStateModel
 from rafcon.gui.models.signals import MetaSignalMsg, ActionSignalMsg
 from rafcon.gui.utils.notification_overview import NotificationOverview
 
-from rafcon.utils import log
+from rafcon.utils import log, json_codec
 from rafcon.utils.constants import RAFCON_TEMP_PATH_BASE, BY_EXECUTION_TRIGGERED_OBSERVABLE_STATE_METHODS
 from rafcon.utils.storage_utils import substitute_modules
 
@@ -87,8 +84,8 @@ def get_state_tuple(state, state_m=None):
     :param rafcon.core.states.state.State state: The state that should be stored
     :return: state_tuple tuple
     """
-    state_str = json.dumps(state, cls=JSONObjectEncoder,
-                           indent=4, check_circular=False, sort_keys=True)
+    # the compact format is sufficient for undo snapshots and much faster to create
+    state_str = json_codec.dumps(state, compact=True)
 
     state_tuples_dict = {}
     if isinstance(state, ContainerState):
@@ -111,8 +108,7 @@ def get_state_from_state_tuple(state_tuple):
     # Transitions and data flows are not added, as also states are not added
     # We have to wait until the child states are loaded, before adding transitions and data flows, as otherwise the
     # validity checks for transitions and data flows would fail
-    state_info = json.loads(state_tuple[STATE_TUPLE_JSON_STR_INDEX],
-                            cls=JSONObjectDecoder, substitute_modules=substitute_modules)
+    state_info = json_codec.loads(state_tuple[STATE_TUPLE_JSON_STR_INDEX], substitute_modules)
     if not isinstance(state_info, tuple):
         state = state_info
     else:
@@ -485,10 +481,9 @@ class MetaAction(AbstractAction):
         overview['instance'].append(overview['model'][-1])
         overview['info'][-1]['instance'] = overview['model'][-1]
 
-        meta_str = json.dumps(overview['model'][-1].meta, cls=JSONObjectEncoder,
-                              indent=4, check_circular=False, sort_keys=True)
+        meta_str = json_codec.dumps(overview['model'][-1].meta, compact=True)
         # print meta_str
-        self.meta = json.loads(meta_str, cls=JSONObjectDecoder, substitute_modules=substitute_modules)
+        self.meta = json_codec.loads(meta_str, substitute_modules)
 
     def get_storage(self):
         state_model = self.state_machine_model.get_state_model_by_path(self.parent_path)
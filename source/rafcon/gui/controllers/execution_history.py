@@ -32,7 +32,7 @@ from rafcon.core.state_machine_manager import StateMachineManager
 from rafcon.core.execution.execution_history import ConcurrencyItem, CallItem, ScopedDataItem, HistoryItem
 from rafcon.core.singleton import state_machine_execution_engine
 from rafcon.core.execution.execution_status import StateMachineExecutionStatus
-from rafcon.core.execution.execution_history import CallType, StateMachineStartItem
+from rafcon.core.execution.execution_history import CallType, StateMachineStartItem, ExecutionHistory
 
 from rafcon.gui.controllers.utils.extended_controller import ExtendedController
 from rafcon.gui.models.state_machine_manager import StateMachineManagerModel
@@ -45,6 +45,76 @@ from rafcon.utils import log
 logger = log.get_logger(__name__)
 
 
+class _HistoryTreeCursor(object):
+    """The position up to which the items of an execution history are shown in the history tree
+
+    :ivar ExecutionHistory execution_history: the shown execution history
+    :ivar int execution_number: the number of the run for the execution histories of a state machine, None for the
+        execution histories of concurrency branches
+    :ivar gtk.TreeIter root_iter: the tree item holding the items of the execution history
+    :ivar gtk.TreeIter current_iter: the tree item the next history item is added to
+    :ivar str last_history_item_id: the id of the last shown history item
+    :ivar int number_of_rows: the number of shown history items
+    :ivar int max_rows: the maximum number of shown history items, further items are only shown on request
+    :ivar bool populated: whether the history items are shown, False for branches that were not expanded, yet
+    :ivar int number_of_popped_items: the number of items removed from the execution history by backward steps, when
+        the history items were shown the last time
+    """
+
+    def __init__(self, execution_history, max_rows, execution_number=None):
+        self.execution_history = execution_history
+        self.execution_number = execution_number
+        self.root_iter = None
+        self.current_iter = None
+        self.last_history_item_id = None
+        self.number_of_rows = 0
+        self.max_rows = max_rows
+        self.populated = execution_number is not None
+        self.labeled = False
+        self.number_of_popped_items = execution_history.number_of_popped_items
+        # the last shown call item of type EXECUTE and its tree item
+        self.last_execute_call = None
+        self.evicted_items_key = (0, 0)
+        self.evicted_items_iter = None
+        self.more_items_iter = None
+
+    def get_first_history_item(self):
+        """Returns the first history item to be shown
+
+        The StateMachineStartItem is not intended to be displayed, but merely as convenient entry point in the saved
+        log file.
+
+        :rtype: HistoryItem
+        """
+        for history_item in self.execution_history[:2]:
+            if not isinstance(history_item, StateMachineStartItem):
+                return history_item
+        return None
+
+    def get_new_history_items(self):
+        """Returns the history items added after the last shown one
+
+        As the ids of history items are increasing, only the new items at the end of the history are looked at.
+
+        :rtype: list
+        """
+        history_items = self.execution_history
+        last_history_item_id = self.last_history_item_id
+        index = len(history_items)
+        while index > 0 and (last_history_item_id is None or
+                             history_items[index - 1].history_item_id > last_history_item_id):
+            index -= 1
+        return [history_item for history_item in history_items[index:]
+                if not isinstance(history_item, StateMachineStartItem)]
+
+    def is_outdated(self):
+        """Checks whether shown history items were removed from the execution history by backward steps
+
+        :rtype: bool
+        """
+        return self.populated and self.number_of_popped_items != self.execution_history.number_of_popped_items
+
+
 class ExecutionHistoryTreeController(ExtendedController):
     """Controller handling the execution history.
 
@@ -60,6 +130,10 @@ class ExecutionHistoryTreeController(ExtendedController):
     TOOL_TIP_TEXT = "Right click for more details\n" \
                     "Middle click for external more detailed viewer\n" \
                     "Double click to select corresponding state"
+    EVICTED_ITEMS_TOOL_TIP_TEXT = "Double click to load older history items from the execution log"
+    EVICTED_ITEMS_PAGE_SIZE = 100
+    MORE_ITEMS_TOOL_TIP_TEXT = "Double click to show more history items"
+    ROWS_PAGE_SIZE = 1000
 
     def __init__(self, model=None, view=None):
         assert isinstance(model, StateMachineManagerModel)
@@ -74,7 +148,13 @@ class ExecutionHistoryTreeController(ExtendedController):
 
         self.observe_model(state_machine_execution_model)
         self._expansion_state = {}
+        # records of history items evicted from memory, which were loaded from the execution log on demand
+        self._evicted_history_item_records = {}
         self._update_lock = RLock()
+        # the cursors of all shown execution histories, including those of concurrency branches
+        self._cursors = []
+        self._number_of_shown_histories = 0
+        self._shown_state_machine_id = None
 
         self.update()
 
@@ -85,6 +165,7 @@ class ExecutionHistoryTreeController(ExtendedController):
     def register_view(self, view):
         super(ExecutionHistoryTreeController, self).register_view(view)
         self.history_tree.connect('button_press_event', self.mouse_click)
+        self.history_tree.connect('test-expand-row', self._populate_branch)
         view['reload_button'].connect('clicked', self.reload_history)
         view['clean_button'].connect('clicked', self.clean_history)
         view['open_separately_button'].connect('clicked', self.open_selected_history_separately)
@@ -98,6 +179,8 @@ class ExecutionHistoryTreeController(ExtendedController):
         if selected_history_item is None and model.iter_has_child(row):
             child_iter = model.iter_nth_child(row, 0)
             selected_history_item = model.get_value(child_iter, self.HISTORY_ITEM_STORAGE_ID)
+            if isinstance(selected_history_item, _HistoryTreeCursor):  # concurrency branch that was not expanded, yet
+                selected_history_item = selected_history_item.get_first_history_item()
             if selected_history_item is None:
                 logger.info("The selected element could not be connected to a run-id. Therefore, no run-id is handed "\
                             "to the external execution log viewer.")
@@ -148,6 +231,13 @@ class ExecutionHistoryTreeController(ExtendedController):
 
             (model, row) = self.history_tree.get_selection().get_selected()
             if row is not None:
+                if isinstance(model[row][self.HISTORY_ITEM_STORAGE_ID], ExecutionHistory):
+                    self.load_evicted_history_items(model[row][self.HISTORY_ITEM_STORAGE_ID])
+                    return True
+                if isinstance(model[row][self.HISTORY_ITEM_STORAGE_ID], _HistoryTreeCursor):
+                    if model[row][self.HISTORY_ITEM_STORAGE_ID].populated:
+                        self.show_more_history_items(model[row][self.HISTORY_ITEM_STORAGE_ID])
+                    return True
                 histroy_item_path = self.history_tree_store.get_path(row)
                 histroy_item_iter = self.history_tree_store.get_iter(histroy_item_path)
                 # logger.info(history_item.state_reference)
@@ -157,6 +247,9 @@ class ExecutionHistoryTreeController(ExtendedController):
                         self.history_tree.collapse_row(histroy_item_path)
                     else:
                         self.history_tree.expand_to_path(histroy_item_path)
+                if not isinstance(self.get_history_item_for_tree_iter(histroy_item_iter), HistoryItem):
+                    # items loaded from the execution log have no state reference
+                    return True
                 sm = self.get_history_item_for_tree_iter(histroy_item_iter).state_reference.get_state_machine()
                 if sm:
                     if sm.state_machine_id != self.model.selected_state_machine_id:
@@ -349,7 +442,7 @@ class ExecutionHistoryTreeController(ExtendedController):
             if not self.model.selected_state_machine_id == self.model.state_machine_manager.active_state_machine_id:
                 self.model.selected_state_machine_id = self.model.state_machine_manager.active_state_machine_id
             else:
-                self.update()
+                self.update_incrementally()
 
     def clean_history(self, widget, event=None):
         """Triggered when the 'Clean History' button is clicked.
@@ -357,6 +450,7 @@ class ExecutionHistoryTreeController(ExtendedController):
         Empties the execution history tree by adjusting the start index and updates tree store and view.
         """
         self.history_tree_store.clear()
+        self._evicted_history_item_records.clear()
         selected_sm_m = self.model.get_selected_state_machine_model()
         if selected_sm_m:
             selected_sm_m.state_machine.clear_execution_histories()
@@ -367,44 +461,121 @@ class ExecutionHistoryTreeController(ExtendedController):
         self.update()
 
     def update(self):
+        """Rebuilds the history tree for the selected state machine"""
+        with self._update_lock:
+            self._store_expansion_state()
+            self.history_tree_store.clear()
+            self._cursors = []
+            self._number_of_shown_histories = 0
+            selected_sm_m = self.model.get_selected_state_machine_model()
+            self._shown_state_machine_id = selected_sm_m.state_machine.state_machine_id if selected_sm_m else None
+            self._append_new_history_items()
+            self._restore_expansion_state()
+
+    def update_incrementally(self):
+        """Appends the history items added since the last update to the history tree
+
+        The tree is only rebuilt, if another state machine was selected, the execution histories were cleared or
+        shown history items were removed by backward steps in the meantime.
         """
-        rebuild the tree view of the history item tree store
-        :return:
-        """
-        # with self._update_lock:
-        self._update_lock.acquire()
-        self._store_expansion_state()
-        self.history_tree_store.clear()
+        with self._update_lock:
+            selected_sm_m = self.model.get_selected_state_machine_model()
+            if selected_sm_m is None or selected_sm_m.state_machine.state_machine_id != self._shown_state_machine_id \
+                    or len(selected_sm_m.state_machine.execution_histories) < self._number_of_shown_histories \
+                    or any(cursor.is_outdated() for cursor in self._cursors):
+                self.update()
+                return
+            self._append_new_history_items()
+
+    def _append_new_history_items(self):
         selected_sm_m = self.model.get_selected_state_machine_model()
         if not selected_sm_m:
             return
+        execution_histories = selected_sm_m.state_machine.execution_histories
+        for execution_number in range(self._number_of_shown_histories, len(execution_histories)):
+            self._cursors.append(_HistoryTreeCursor(execution_histories[execution_number], self.ROWS_PAGE_SIZE,
+                                                    execution_number))
+        self._number_of_shown_histories = len(execution_histories)
+        # the list of cursors grows while iterating, as the branches of new concurrency items get own cursors
+        index = 0
+        while index < len(self._cursors):
+            self._update_cursor(self._cursors[index])
+            index += 1
+
+    def _update_cursor(self, cursor):
+        """Shows the new history items of an execution history
+
+        :param _HistoryTreeCursor cursor: the cursor of the execution history
+        """
+        execution_history = cursor.execution_history
+        if cursor.root_iter is None:
+            first_history_item = cursor.get_first_history_item()
+            if first_history_item is None:
+                return
+            cursor.root_iter = self.history_tree_store.insert_after(
+                None,
+                None,
+                (first_history_item.state_reference.name + " - Run " + str(cursor.execution_number + 1),
+                 first_history_item, self.TOOL_TIP_TEXT))
+            cursor.current_iter = cursor.root_iter
+        elif not cursor.populated:
+            # the branch is shown when it is expanded for the first time, only the label is updated
+            if not cursor.labeled:
+                first_history_item = cursor.get_first_history_item()
+                if first_history_item is not None:
+                    self.history_tree_store.set_value(cursor.root_iter, self.LABEL_NAME_STORAGE_ID,
+                                                      first_history_item.state_reference.name +
+                                                      " - Concurrency Branch")
+                    cursor.labeled = True
+            return
 
-        for execution_number, execution_history in enumerate(selected_sm_m.state_machine.execution_histories):
-            if len(execution_history) > 0:
-                first_history_item = execution_history[0]
-                # the next lines filter out the StateMachineStartItem, which is not intended to
-                # be displayed, but merely as convenient entry point in the saved log file
-                if isinstance(first_history_item, StateMachineStartItem):
-                    if len(execution_history) > 1:
-                        first_history_item = execution_history[1]
-                        tree_item = self.history_tree_store.insert_after(
-                            None,
-                            None,
-                            (first_history_item.state_reference.name + " - Run " + str(execution_number + 1),
-                             first_history_item, self.TOOL_TIP_TEXT))
-                        self.insert_execution_history(tree_item, execution_history[1:], is_root=True)
-                    else:
-                        pass  # there was only the Start item in the history
-                else:
-                    tree_item = self.history_tree_store.insert_after(
-                        None,
-                        None,
-                        (first_history_item.state_reference.name + " - Run " + str(execution_number + 1),
-                         first_history_item, self.TOOL_TIP_TEXT))
-                    self.insert_execution_history(tree_item, execution_history, is_root=True)
-
-        self._restore_expansion_state()
-        self._update_lock.release()
+        evicted_items_key = (execution_history.number_of_evicted_items,
+                             len(self._evicted_history_item_records.get(execution_history, ())))
+        if evicted_items_key != cursor.evicted_items_key:
+            if cursor.evicted_items_iter is not None:
+                self.history_tree_store.remove(cursor.evicted_items_iter)
+            cursor.evicted_items_iter = self.insert_evicted_history_items(cursor.root_iter, execution_history)
+            cursor.evicted_items_key = evicted_items_key
+
+        cursor.number_of_popped_items = execution_history.number_of_popped_items
+        new_history_items = cursor.get_new_history_items()
+        if cursor.more_items_iter is not None:
+            self.history_tree_store.remove(cursor.more_items_iter)
+            cursor.more_items_iter = None
+        for index, history_item in enumerate(new_history_items):
+            if cursor.number_of_rows >= cursor.max_rows:
+                cursor.more_items_iter = self.history_tree_store.insert_before(
+                    cursor.root_iter, None, ("{0} more items".format(len(new_history_items) - index), cursor,
+                                             self.MORE_ITEMS_TOOL_TIP_TEXT))
+                break
+            if not self.insert_history_item_at_cursor(cursor, history_item):
+                break
+            cursor.last_history_item_id = history_item.history_item_id
+
+    def _populate_branch(self, tree_view, tree_iter, path):
+        """Shows the items of a concurrency branch when its tree item is expanded for the first time"""
+        if not self.history_tree_store.iter_n_children(tree_iter):
+            return False
+        placeholder_iter = self.history_tree_store.iter_nth_child(tree_iter, 0)
+        cursor = self.history_tree_store[placeholder_iter][self.HISTORY_ITEM_STORAGE_ID]
+        if isinstance(cursor, _HistoryTreeCursor) and not cursor.populated:
+            with self._update_lock:
+                self.history_tree_store.remove(placeholder_iter)
+                cursor.populated = True
+                self._update_cursor(cursor)
+        return False  # allow the expansion
+
+    def show_more_history_items(self, cursor):
+        """Shows the next page of history items of an execution history
+
+        :param _HistoryTreeCursor cursor: the cursor of the execution history
+        """
+        with self._update_lock:
+            cursor.max_rows += self.ROWS_PAGE_SIZE
+            if cursor.is_outdated():
+                self.update()
+                return
+            self._update_cursor(cursor)
 
     def insert_history_item(self, parent, history_item, description, dummy=False):
         """Enters a single history item into the tree store
@@ -435,59 +606,96 @@ class ExecutionHistoryTreeController(ExtendedController):
             parent, None, content)
         return tree_item
 
-    def insert_execution_history(self, parent, execution_history, is_root=False):
-        """Insert a list of history items into a the tree store
+    def insert_history_item_at_cursor(self, cursor, history_item):
+        """Inserts the next history item of an execution history into the tree store
 
-        If there are concurrency history items, the method is called recursively.
+        Concurrency items get a collapsed tree item for each branch, whose items are inserted on the first expansion.
 
-        :param gtk.TreeItem parent: the parent to add the next history item to
-        :param ExecutionHistory execution_history: all history items of a certain state machine execution
-        :param bool is_root: Whether this is the root execution history
+        :param _HistoryTreeCursor cursor: the cursor of the execution history
+        :param HistoryItem history_item: the next history item of the execution history
+        :return: whether the history item could be inserted
+        :rtype: bool
         """
-        current_parent = parent
-        execution_history_iterator = iter(execution_history)
-        for history_item in execution_history_iterator:
-            if isinstance(history_item, ConcurrencyItem):
-                self.insert_concurrent_execution_histories(current_parent, history_item.execution_histories)
-
-            elif isinstance(history_item, CallItem):
-                tree_item = self.insert_history_item(current_parent, history_item, "Enter" if is_root else "Call")
+        last_execute_call = cursor.last_execute_call
+        cursor.last_execute_call = None
+        is_root = cursor.number_of_rows == 0 and cursor.execution_number is not None
+        cursor.number_of_rows += 1
+
+        if isinstance(history_item, ConcurrencyItem):
+            for execution_history in history_item.execution_histories:
+                # this is just a dummy item to have an extra parent for each branch
+                # gives better overview in case that one of the child state is a simple execution state
+                branch_cursor = _HistoryTreeCursor(execution_history, self.ROWS_PAGE_SIZE)
+                branch_cursor.root_iter = self.history_tree_store.insert_before(
+                    cursor.current_iter, None, ("Concurrency Branch", None, None))
+                branch_cursor.current_iter = branch_cursor.root_iter
+                self.history_tree_store.insert_before(branch_cursor.root_iter, None, ("...", branch_cursor, None))
+                self._cursors.append(branch_cursor)
+
+        elif isinstance(history_item, CallItem):
+            if history_item.call_type is CallType.CONTAINER and last_execute_call is not None and \
+                    history_item.prev is last_execute_call[0]:
+                # this is necessary that already the CallType.EXECUTE item opens a new hierarchy in the
+                # tree view and not the CallType.CONTAINER item
+                cursor.current_iter = last_execute_call[1]
+                self.insert_history_item(cursor.current_iter, history_item, "Enter")
+            else:
+                tree_item = self.insert_history_item(cursor.current_iter, history_item, "Enter" if is_root else "Call")
                 if not tree_item:
-                    return
-                if history_item.call_type is CallType.EXECUTE:
-                    # this is necessary that already the CallType.EXECUTE item opens a new hierarchy in the
-                    # tree view and not the CallType.CONTAINER item
-                    next_history_item = history_item.next
-                    if next_history_item and next_history_item.call_type is CallType.CONTAINER:
-                        current_parent = tree_item
-                        self.insert_history_item(current_parent, next_history_item, "Enter")
-                        next(execution_history_iterator)  # skips the next history item in the iterator
-
-            else:  # history_item is ReturnItem
-                if current_parent is None:
-                    # The reasons here can be: missing history items, items in the wrong order etc.
-                    # Does not happen when using RAFCON without plugins
-                    logger.error("Invalid execution history: current_parent is None")
-                    return
+                    return False
                 if history_item.call_type is CallType.EXECUTE:
-                    self.insert_history_item(current_parent, history_item, "Return")
-                else:  # CONTAINER
-                    self.insert_history_item(current_parent, history_item, "Exit")
-                    current_parent = self.history_tree_store.iter_parent(current_parent)
-
-            is_root = False
+                    cursor.last_execute_call = history_item, tree_item
+
+        else:  # history_item is ReturnItem
+            if cursor.current_iter is None:
+                # The reasons here can be: missing history items, items in the wrong order etc.
+                # Does not happen when using RAFCON without plugins
+                logger.error("Invalid execution history: current_parent is None")
+                return False
+            if history_item.call_type is CallType.EXECUTE:
+                self.insert_history_item(cursor.current_iter, history_item, "Return")
+            else:  # CONTAINER
+                self.insert_history_item(cursor.current_iter, history_item, "Exit")
+                cursor.current_iter = self.history_tree_store.iter_parent(cursor.current_iter)
+        return True
+
+    def insert_evicted_history_items(self, parent, execution_history):
+        """Inserts an entry for the history items that were evicted from the memory of an execution history
+
+        The entry is inserted as first child of the parent. It holds the records already loaded from the execution
+        log. Further records can be loaded by double clicking the entry.
+
+        :param gtk.TreeItem parent: the tree item of the execution history
+        :param ExecutionHistory execution_history: the execution history with evicted items
+        :return: the inserted tree item, if any
+        :rtype: gtk.TreeItem
+        """
+        if not execution_history.number_of_evicted_items:
+            return None
+        records = self._evicted_history_item_records.get(execution_history, [])
+        description = "{0} older items ({1} loaded)".format(execution_history.number_of_evicted_items, len(records))
+        tree_item = self.history_tree_store.insert_after(
+            parent, None, (description, execution_history, self.EVICTED_ITEMS_TOOL_TIP_TEXT))
+        for record in records:
+            call_type = {'CallItem': "Call", 'ReturnItem': "Return"}.get(record['item_type'], record['item_type'])
+            self.history_tree_store.insert_before(
+                tree_item, None, ("{0} - {1}".format(record['state_name'], call_type), record['history_item_id'],
+                                  None))
+        return tree_item
 
-    def insert_concurrent_execution_histories(self, parent, concurrent_execution_histories):
-        """Adds the child execution histories of a concurrency state.
+    def load_evicted_history_items(self, execution_history):
+        """Loads the next page of evicted history items of an execution history from the execution log
 
-        :param gtk.TreeItem parent: the parent to add the next history item to
-        :param list[ExecutionHistory] concurrent_execution_histories: a list of all child execution histories
-        :return:
+        :param ExecutionHistory execution_history: the execution history with evicted items
         """
-        for execution_history in concurrent_execution_histories:
-            if len(execution_history) >= 1:
-                first_history_item = execution_history[0]
-                # this is just a dummy item to have an extra parent for each branch
-                # gives better overview in case that one of the child state is a simple execution state
-                tree_item = self.insert_history_item(parent, first_history_item, "Concurrency Branch", dummy=True)
-                self.insert_execution_history(tree_item, execution_history)
+        if execution_history.execution_history_storage is None:
+            logger.info("Set EXECUTION_LOG_ENABLE to True in your config to load history items, which were removed "
+                        "from memory.")
+            return
+        records = self._evicted_history_item_records.setdefault(execution_history, [])
+        older_records = execution_history.get_evicted_history_item_records(self.EVICTED_ITEMS_PAGE_SIZE,
+                                                                           offset=len(records))
+        if not older_records:
+            return
+        records[0:0] = older_records
+        self.update_incrementally()
@@ -3,7 +3,6 @@
 # example basictreeview.py
 
 import gtk
-import shelve
 
 import rafcon.utils.execution_log as log_helper
 from rafcon.gui.controllers.utils.extended_controller import ExtendedController
@@ -14,8 +13,16 @@ logger = log.get_logger(__name__)
 
 
 class ExecutionLogTreeController(ExtendedController):
+    """Shows the collapsed items of an execution log in a tree
+
+    Only a lightweight index of the log is built on opening, without the data flow of the items. The tree items of a
+    state execution are created, when their parent is expanded for the first time, and the data flow of an item is
+    read from the log, when the item is selected.
+    """
 
     RUN_ID_STORAGE_ID = 1
+    # the run_id of the first item of a concurrency branch, for tree items of concurrency branches
+    BRANCH_RUN_ID_STORAGE_ID = 2
 
     def __init__(self, model, view, filename, run_id_to_select):
 
@@ -23,67 +30,138 @@ class ExecutionLogTreeController(ExtendedController):
         super(ExecutionLogTreeController, self).__init__(model, view)
 
         self.run_id_to_select = run_id_to_select
-        self.hist_items = shelve.open(filename, 'r')
+        self.hist_items = log_helper.open_execution_log(filename)
         self.start, self.next_, self.concurrent, self.hierarchy, self.items = \
             log_helper.log_to_collapsed_structure(self.hist_items,
                                                   throw_on_pickle_error=False,
-                                                  include_erroneous_data_ports=True)
+                                                  include_erroneous_data_ports=True,
+                                                  load_data=False)
         # create a TreeStore with one string column to use as the model
-        self.tree_store = gtk.TreeStore(str, str)
+        self.tree_store = gtk.TreeStore(str, str, str)
         self.item_iter = {}
         view.tree_view.set_model(self.tree_store)
 
     def register_view(self, view):
 
-        # we'll add some data now - 4 rows with 3 child rows each
+        # only the top level is shown, deeper levels are added on expansion
         if not self.start:
             logger.warning('WARNING: no start item found, just listing all items')
-            elements = [(None, run_id) for run_id in self.items.keys()]
+            for run_id in self.items.keys():
+                self.add_collapsed_key(None, run_id)
         else:
-            elements = [(None, self.start['run_id'])]
-
-        while True:
-            new_elements = []
-            for e in elements:
-                item_tuple = self.add_collapsed_key(e[0], e[1])
-                new_elements.extend(item_tuple)
-            if len(new_elements) == 0:
-                break
-            else:
-                elements = new_elements
+            self.add_collapsed_keys(None, self.start['run_id'])
 
         view.tree_view.get_selection().connect('changed', self.on_treeview_selection_changed)
         view.tree_view.connect('button_press_event', self.mouse_click)
+        view.tree_view.connect('test-expand-row', self.on_test_expand_row)
 
         # optional select a element of generated tree
-        if self.run_id_to_select in self.item_iter:
-            item_iter_to_select = self.item_iter[self.run_id_to_select]
+        item_iter_to_select = self.get_iter_for_run_id(self.run_id_to_select)
+        if item_iter_to_select is not None:
             path_to_select = self.tree_store.get_path(item_iter_to_select)
             self.view.tree_view.expand_to_path(path_to_select)
             self.view.tree_view.get_selection().select_iter(item_iter_to_select)
             self.run_id_to_select = None
 
+    def add_collapsed_keys(self, parent, key):
+        """Adds the tree items for a sequence of state executions on the same hierarchy level
+
+        :param gtk.TreeIter parent: the tree item to add the items to
+        :param str key: the run_id of the first state execution of the sequence
+        """
+        while key is not None and key not in self.item_iter:
+            self.add_collapsed_key(parent, key)
+            key = self.next_.get(key)
+
     def add_collapsed_key(self, parent, key):
-        parent_iter = self.tree_store.append(parent, ["%s (%s)" % (self.items[key]['state_name'], self.items[key]['state_type']), str(key)])
-        self.item_iter[key] = parent_iter
+        """Adds the tree item for a state execution
 
-        returns = []
-        if key in self.next_:
-            # self.add_collapsed_key(parent, self.next_[key])
-            returns.append((parent, self.next_[key]))
+        The tree items of child executions are only added, when the tree item is expanded.
 
+        :param gtk.TreeIter parent: the tree item to add the item to
+        :param str key: the run_id of the state execution
+        :return: the added tree item
+        :rtype: gtk.TreeIter
+        """
+        parent_iter = self.tree_store.append(parent, ["%s (%s)" % (self.items[key]['state_name'],
+                                                                   self.items[key]['state_type']), str(key), None])
+        self.item_iter[key] = parent_iter
+        if key in self.hierarchy or key in self.concurrent:
+            self.add_placeholder(parent_iter)
+        return parent_iter
+
+    def add_placeholder(self, parent_iter):
+        """Adds a dummy child to a tree item, which makes the item expandable"""
+        self.tree_store.append(parent_iter, ["...", None, None])
+
+    def populate(self, item_iter):
+        """Replaces the dummy child of a tree item by the tree items of the child executions
+
+        :param gtk.TreeIter item_iter: the expanded tree item
+        """
+        child_iter = self.tree_store.iter_children(item_iter)
+        if child_iter is None or self.tree_store.get_value(child_iter, 0) != "..." or \
+                self.tree_store.get_value(child_iter, self.RUN_ID_STORAGE_ID) is not None:
+            return  # already populated
+        self.tree_store.remove(child_iter)
+
+        branch_key = self.tree_store.get_value(item_iter, self.BRANCH_RUN_ID_STORAGE_ID)
+        if branch_key is not None:
+            self.add_collapsed_keys(item_iter, branch_key)
+            return
+
+        key = self.tree_store.get_value(item_iter, self.RUN_ID_STORAGE_ID)
         if key in self.hierarchy:
-            # self.add_collapsed_key(piter, self.hierarchy[key])
-            returns.append((parent_iter, self.hierarchy[key]))
-
+            self.add_collapsed_keys(item_iter, self.hierarchy[key])
         if key in self.concurrent:
             for i, next_key in enumerate(self.concurrent[key]):
-                child_iter = self.tree_store.append(parent_iter, [str(i), None])
-                # self.add_collapsed_key(child_iter, next_key)
-                returns.append((child_iter, next_key))
-                self.item_iter[key] = child_iter
-
-        return returns
+                child_iter = self.tree_store.append(item_iter, [str(i), None, next_key])
+                self.add_placeholder(child_iter)
+
+    def get_iter_for_run_id(self, run_id):
+        """Returns the tree item of a state execution and adds the tree items of its ancestors, if necessary
+
+        :param str run_id: the run_id of the state execution
+        :return: the tree item or None, if the run_id is not part of the tree
+        :rtype: gtk.TreeIter
+        """
+        if run_id in self.item_iter or run_id not in self.items:
+            return self.item_iter.get(run_id)
+
+        previous = {next_key: key for key, next_key in self.next_.iteritems()}
+        hierarchy_parents = {child_key: key for key, child_key in self.hierarchy.iteritems()}
+        concurrency_parents = {}
+        for key, branch_keys in self.concurrent.iteritems():
+            for branch_key in branch_keys:
+                concurrency_parents[branch_key] = key
+
+        def find_iter(run_id, visited):
+            if run_id in self.item_iter:
+                return self.item_iter[run_id]
+            key = run_id
+            # go back to the first state execution on the same hierarchy level
+            while key in previous and key not in visited:
+                visited.add(key)
+                key = previous[key]
+            if key in hierarchy_parents:
+                parent_iter = find_iter(hierarchy_parents[key], visited)
+                if parent_iter is None:
+                    return None
+                self.populate(parent_iter)
+            elif key in concurrency_parents:
+                parent_iter = find_iter(concurrency_parents[key], visited)
+                if parent_iter is None:
+                    return None
+                self.populate(parent_iter)
+                branch_iter = self.tree_store.iter_children(parent_iter)
+                while branch_iter is not None:
+                    if self.tree_store.get_value(branch_iter, self.BRANCH_RUN_ID_STORAGE_ID) == key:
+                        self.populate(branch_iter)
+                    branch_iter = self.tree_store.iter_next(branch_iter)
+            return self.item_iter.get(run_id)
+
+        find_iter(run_id, set())
+        return self.item_iter.get(run_id)
 
     def add_key(self, parent, key):
         parent_iter = self.tree_store.append(parent, [str(key)])
@@ -104,10 +182,20 @@ class ExecutionLogTreeController(ExtendedController):
                 child_iter = self.tree_store.append(parent_iter, [str(i)])
                 self.add_key(child_iter, next_key)
 
+    def on_test_expand_row(self, tree_view, item_iter, path):
+        self.populate(item_iter)
+        return False  # allow the expansion
+
     def on_treeview_selection_changed(self, tree_selection):
         m, selected_tree_item_iter = tree_selection.get_selected()
+        if selected_tree_item_iter is None:
+            return
         hist_item_id = m.get_value(selected_tree_item_iter, self.RUN_ID_STORAGE_ID)
         item = self.items.get(hist_item_id)
+        # the data flow is only read from the log for the selected item
+        if item is not None and 'call_history_item_id' in item:
+            item = log_helper.load_collapsed_item_data(self.hist_items, item, throw_on_pickle_error=False,
+                                                       include_erroneous_data_ports=True)
         import pprint as pp
         self.view.text_view.get_buffer().set_text(pp.pformat(item))
 
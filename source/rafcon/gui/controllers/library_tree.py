@@ -23,6 +23,7 @@
 import gobject
 import gtk
 import os
+import threading
 from functools import partial
 
 from rafcon.core.states.library_state import LibraryState
@@ -152,7 +153,11 @@ class LibraryTreeController(ExtendedController):
 
     @ExtendedController.observe("library_manager", after=True)
     def model_changed(self, model, prop_name, info):
-        self.update()
+        # the libraries are also updated by the library watcher thread
+        if isinstance(threading.current_thread(), threading._MainThread):
+            self.update()
+        else:
+            gobject.idle_add(self.update)
 
     def store_expansion_state(self):
         # print "\n\n store of state machine {0} \n\n".format(self.__my_selected_sm_id)
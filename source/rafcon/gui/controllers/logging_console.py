@@ -11,6 +11,7 @@
 
 import gtk
 import threading
+from collections import deque
 
 from rafcon.gui.utils import wait_for_gui
 from rafcon.gui.models.config_model import ConfigModel
@@ -33,7 +34,8 @@ class LoggingConsoleController(ExtendedController):
         super(LoggingConsoleController, self).__init__(model, view)
 
         self._lock = threading.Lock()
-        self._log_entries = []
+        # only the latest entries are kept, as the view does not show more lines
+        self._log_entries = deque(maxlen=view.max_lines if view.max_lines and view.max_lines > 0 else None)
         self._enables = self._get_config_enables()
         log_helpers.LoggingViewHandler.add_logging_view('main', self)
 
@@ -53,22 +55,22 @@ class LoggingConsoleController(ExtendedController):
             return
         # Store all new log entries
         if new:
-            self._lock.acquire()
-            self._log_entries.append((log_level, message))
-            self._lock.release()
-        self.view.print_message(message, log_level)
+            with self._lock:
+                self._log_entries.append((log_level, message))
+                self.view.print_message(message, log_level)
+        else:
+            self.view.print_messages([(message, log_level)])
 
     def print_filtered_buffer(self):
         # remember cursor position
         self.view.store_cursor_position()
 
-        # update text buffer
+        # update text buffer, all entries are printed at once including those queued in the view
+        with self._lock:
+            self.view.clear_pending_messages()
+            log_entries = list(self._log_entries)
         self.view.clean_buffer()
-
-        for entry in self._log_entries:
-            level = entry[0]
-            message = entry[1]
-            self.print_message(message, level, new=False)
+        self.view.print_messages([(message, level) for level, message in log_entries])
 
         # restore cursor position
         wait_for_gui()
@@ -82,7 +84,8 @@ class LoggingConsoleController(ExtendedController):
         self.print_filtered_buffer()
 
     def _clear_buffer(self, widget, data=None):
-        self._log_entries = []
+        with self._lock:
+            self._log_entries.clear()
         self.print_filtered_buffer()
 
     def add_clear_menu_item(self, widget, menu):
@@ -23,6 +23,7 @@
 
 import os
 import logging
+import glib
 import gtk
 from functools import partial
 
@@ -30,6 +31,7 @@ import rafcon.core.config
 import rafcon.core.singleton
 import rafcon.gui.singleton as gui_singletons
 from rafcon.core.execution.execution_status import StateMachineExecutionStatus
+from rafcon.core.execution.execution_status_bus import execution_status_bus
 from rafcon.gui.config import global_gui_config as gui_config
 from rafcon.gui.controllers.execution_history import ExecutionHistoryTreeController
 from rafcon.gui.controllers.global_variable_manager import GlobalVariableManagerController
@@ -76,6 +78,7 @@ class MainWindowController(ExtendedController):
 
         self.shortcut_manager = None
         self.handler_ids = {}
+        self._execution_status_timer_id = None
         self.currently_pressed_keys = set()
 
         self.state_machine_execution_model = gui_singletons.state_machine_execution_model
@@ -313,6 +316,8 @@ class MainWindowController(ExtendedController):
             import rafcon.gui.models.auto_backup as auto_backup
             auto_backup.check_for_crashed_rafcon_instances()
 
+        self._subscribe_to_execution_status_changes()
+
         plugins.run_hook("main_window_setup", self)
 
         wait_for_gui()
@@ -322,6 +327,30 @@ class MainWindowController(ExtendedController):
         logger.info("Ready")
         logger.setLevel(level)
 
+    def _subscribe_to_execution_status_changes(self):
+        """Notifies the changes of the execution status of states with a fixed frame rate in the GUI thread
+
+        The executing threads are thus not blocked by the observers of the GUI, see
+        :mod:`rafcon.core.execution.execution_status_bus`.
+        """
+        frame_rate = gui_config.get_config_value("EXECUTION_STATUS_FRAME_RATE", 25)
+        if not frame_rate or frame_rate <= 0:
+            return
+        execution_status_bus.subscribe()
+        self._execution_status_timer_id = glib.timeout_add(int(1000. / frame_rate),
+                                                           self._notify_execution_status_changes)
+
+    @staticmethod
+    def _notify_execution_status_changes():
+        execution_status_bus.notify_changes()
+        return True  # keep the timer running
+
+    def _unsubscribe_from_execution_status_changes(self):
+        if self._execution_status_timer_id is not None:
+            glib.source_remove(self._execution_status_timer_id)
+            self._execution_status_timer_id = None
+            execution_status_bus.unsubscribe()
+
     def connect_button_to_function(self, view_index, button_state, function, *args):
         handler_id = self.view[view_index].connect(button_state, function, *args)
         self.handler_ids[view_index] = handler_id
@@ -632,7 +661,9 @@ class MainWindowController(ExtendedController):
             global_runtime_config.set_config_value(window_key + '_HIDDEN', hidden)
 
         global_runtime_config.save_configuration()
-        
+
+        self._unsubscribe_from_execution_status_changes()
+
         # close all tabs
         self.get_controller('states_editor_ctrl').prepare_destruction()  # avoid new state editor TODO tbd (deleted)
         rafcon.core.singleton.state_machine_manager.delete_all_state_machines()
@@ -32,6 +32,7 @@ from rafcon.core.states.hierarchy_state import HierarchyState
 from rafcon.core.states.library_state import LibraryState
 from rafcon.core.states.state import State, StateType
 from rafcon.core.storage import storage
+from rafcon.core.storage.packed_storage import PACKED_STATE_MACHINE_EXTENSION
 import rafcon.core.config
 
 from rafcon.gui.helpers.text_formatting import format_default_folder_name
@@ -212,11 +213,17 @@ def save_state_machine(delete_old_state_machine=False, recent_opened_notificatio
     state_machine_m = state_machine_manager_model.get_selected_state_machine_model()
     sm_path = state_machine_m.state_machine.file_system_path
 
-    storage.save_state_machine_to_path(state_machine_m.state_machine, copy_path if as_copy else sm_path,
-                                       delete_old_state_machine=delete_old_state_machine, as_copy=as_copy)
+    target_path = copy_path if as_copy else sm_path
+    if target_path.endswith(PACKED_STATE_MACHINE_EXTENSION):
+        # the meta data has to be stored in the state machine directory, before it is packed
+        storage.save_packed_state_machine_to_path(state_machine_m.state_machine, target_path, as_copy=as_copy,
+                                                  store_meta_data=state_machine_m.store_meta_data)
+    else:
+        storage.save_state_machine_to_path(state_machine_m.state_machine, target_path,
+                                           delete_old_state_machine=delete_old_state_machine, as_copy=as_copy)
+        state_machine_m.store_meta_data(copy_path=copy_path if as_copy else None)
     if recent_opened_notification:
         global_runtime_config.update_recently_opened_state_machines_with(state_machine_m.state_machine)
-    state_machine_m.store_meta_data(copy_path=copy_path if as_copy else None)
     logger.debug("Saved state machine and its meta data.")
     library_manager_model.state_machine_was_stored(state_machine_m, previous_path)
     return True
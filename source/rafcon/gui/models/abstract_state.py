@@ -22,6 +22,7 @@ from rafcon.core.states.container_state import ContainerState
 from rafcon.core.states.library_state import LibraryState
 from rafcon.core.states.state import State
 from rafcon.core.storage import storage
+from rafcon.core.storage.packed_storage import split_packed_path
 
 from rafcon.utils import storage_utils, constants
 from rafcon.utils.hashable import Hashable
@@ -454,7 +455,8 @@ class AbstractStateModel(MetaModel, Hashable):
         path_meta_data = os.path.join(path, storage.FILE_NAME_META_DATA)
 
         # TODO: Should be removed with next minor release
-        if not os.path.exists(path_meta_data):
+        # packed state machines (with virtual state paths) never contain the old meta data file
+        if not os.path.exists(path_meta_data) and split_packed_path(path)[0] is None:
             logger.debug("Because meta data was not found in {0} use backup option {1}"
                          "".format(path_meta_data, os.path.join(path, storage.FILE_NAME_META_DATA_OLD)))
             path_meta_data = os.path.join(path, storage.FILE_NAME_META_DATA_OLD)
@@ -510,7 +512,7 @@ class AbstractStateModel(MetaModel, Hashable):
             meta_file_path_json = os.path.join(self.state.file_system_path, storage.FILE_NAME_META_DATA)
         meta_data = deepcopy(self.meta)
         self._generate_element_meta_data(meta_data)
-        storage_utils.write_dict_to_json(meta_data, meta_file_path_json)
+        storage.write_file_if_changed(meta_file_path_json, storage_utils.dict_to_json_string(meta_data))
 
     def copy_meta_data_from_state_m(self, source_state_m):
         """Dismiss current meta data and copy meta data from given state model
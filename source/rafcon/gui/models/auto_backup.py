@@ -477,7 +477,8 @@ class AutoBackupModel(ModelMT):
         sm = self.state_machine_model.state_machine
         logger.debug('Performing auto backup of state machine {} to temp folder'.format(sm.state_machine_id))
         self.update_tmp_storage_path()
-        storage.save_state_machine_to_path(sm, self._tmp_storage_path, delete_old_state_machine=True, as_copy=True)
+        # only the changed states are written, the folders of removed states are deleted
+        storage.save_state_machine_to_path(sm, self._tmp_storage_path, as_copy=True, compact_json=True)
         self.update_last_backup_meta_data()
         self.write_backup_meta_data()
         self.state_machine_model.store_meta_data(copy_path=self._tmp_storage_path)
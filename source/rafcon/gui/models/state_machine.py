@@ -367,6 +367,6 @@ class StateMachineModel(MetaModel, Hashable):
         else:
             meta_file_json = os.path.join(self.state_machine.file_system_path, storage.FILE_NAME_META_DATA)
 
-        storage_utils.write_dict_to_json(self.meta, meta_file_json)
+        storage.write_file_if_changed(meta_file_json, storage_utils.dict_to_json_string(self.meta))
 
         self.root_state.store_meta_data(copy_path)
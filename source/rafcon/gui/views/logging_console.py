@@ -14,6 +14,7 @@
 
 import gtk
 import threading
+from collections import deque
 from gtkmvc import View
 import glib
 from rafcon.utils import log
@@ -51,6 +52,15 @@ class LoggingConsoleView(View):
 
         from rafcon.gui.config import global_gui_config
         self.logging_priority = global_gui_config.get_config_value("LOGGING_CONSOLE_GTK_PRIORITY", glib.PRIORITY_LOW)
+        self.frame_rate = global_gui_config.get_config_value("LOGGING_CONSOLE_FRAME_RATE", 10)
+        self.max_lines = global_gui_config.get_config_value("LOGGING_CONSOLE_MAX_LINES", 10000)
+
+        # new messages are collected in a ring buffer and printed in batches, the oldest messages are dropped if
+        # more messages arrive between two batches than lines are shown (if the number of lines is limited)
+        self._pending_messages = deque(maxlen=self.max_lines if self.max_lines > 0 else None)
+        self._flush_scheduled = False
+        self.number_of_dropped_messages = 0
+        self._number_of_reported_dropped_messages = 0
 
         self._stored_line_number = None
         self._stored_line_offset = None
@@ -63,26 +73,100 @@ class LoggingConsoleView(View):
         start, end = self.filtered_buffer.get_bounds()
         self.filtered_buffer.delete(start, end)
 
+    def clear_pending_messages(self):
+        """Removes the messages, which were not printed, yet"""
+        with self._lock:
+            self._pending_messages.clear()
+
     def print_message(self, message, log_level):
-        self._lock.acquire()
+        """Queues a message for printing
+
+        The method can be called from any thread. The queued messages are printed in one batch by the GUI thread at
+        most LOGGING_CONSOLE_FRAME_RATE times per second.
+
+        :param str message: the formatted log message
+        :param int log_level: the level of the message
+        """
+        with self._lock:
+            if len(self._pending_messages) == self._pending_messages.maxlen:
+                self.number_of_dropped_messages += 1
+            self._pending_messages.append((message, log_level))
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        if self.frame_rate and self.frame_rate > 0:
+            glib.timeout_add(int(1000. / self.frame_rate), self._flush_pending_messages,
+                             priority=self.logging_priority)
+        else:
+            glib.idle_add(self._flush_pending_messages, priority=self.logging_priority)
+
+    def _flush_pending_messages(self):
+        with self._lock:
+            messages = list(self._pending_messages)
+            self._pending_messages.clear()
+            self._flush_scheduled = False
+            number_of_dropped_messages = self.number_of_dropped_messages
+        if self.quit_flag:
+            return False
+        if number_of_dropped_messages > self._number_of_reported_dropped_messages:
+            self.filtered_buffer.insert_with_tags_by_name(
+                self.filtered_buffer.get_end_iter(),
+                "... {0} messages dropped ...\n".format(
+                    number_of_dropped_messages - self._number_of_reported_dropped_messages), "set_gray_text")
+            self._number_of_reported_dropped_messages = number_of_dropped_messages
+        self.print_messages(messages)
+        return False
+
+    def get_tag_for_log_level(self, log_level):
+        """Returns the tag of the text of a message with the given level
+
+        :param int log_level: the level of the message
+        :return: the name of the tag or None, if messages of that level are not shown
+        :rtype: str
+        """
         if log_level <= log.logging.VERBOSE and self._enables.get('VERBOSE', False):
-            glib.idle_add(self.print_to_text_view, message, self.filtered_buffer, "set_debug_color",
-                          priority=glib.PRIORITY_LOW)
+            return "set_debug_color"
         if log.logging.VERBOSE < log_level <= log.logging.DEBUG and self._enables.get('DEBUG', True):
-            glib.idle_add(self.print_to_text_view, message, self.filtered_buffer, "set_debug_color",
-                          priority=self.logging_priority)
+            return "set_debug_color"
         elif log.logging.DEBUG < log_level <= log.logging.INFO and self._enables.get('INFO', True):
-            glib.idle_add(self.print_to_text_view, message, self.filtered_buffer, "set_info_color",
-                          priority=self.logging_priority)
+            return "set_info_color"
         elif log.logging.INFO < log_level <= log.logging.WARNING and self._enables.get('WARNING', True):
-            glib.idle_add(self.print_to_text_view, message, self.filtered_buffer, "set_warning_color",
-                          priority=self.logging_priority)
+            return "set_warning_color"
         elif log.logging.WARNING < log_level and self._enables.get('ERROR', True):
-            glib.idle_add(self.print_to_text_view, message, self.filtered_buffer, "set_error_color",
-                          priority=self.logging_priority)
-        self._lock.release()
+            return "set_error_color"
+        return None
 
-    def print_to_text_view(self, text, text_buf, use_tag=None):
+    def print_messages(self, messages):
+        """Prints messages to the text view
+
+        Messages of levels, which are not shown, are skipped. The oldest lines are removed if more than
+        LOGGING_CONSOLE_MAX_LINES lines are shown. Must be called from the GUI thread.
+
+        :param list messages: a list of (message, log_level) tuples
+        """
+        printed = False
+        for message, log_level in messages:
+            use_tag = self.get_tag_for_log_level(log_level)
+            if use_tag is not None:
+                self.print_to_text_view(message, self.filtered_buffer, use_tag, scroll=False)
+                printed = True
+        if not printed:
+            return
+        self.trim_buffer()
+        if not self.quit_flag and self._enables['CONSOLE_FOLLOW_LOGGING']:
+            self.scroll_to_cursor_onscreen()
+
+    def trim_buffer(self):
+        """Removes the oldest lines exceeding LOGGING_CONSOLE_MAX_LINES from the text buffer"""
+        if not self.max_lines or self.max_lines <= 0:
+            return
+        # the last line is always empty, as each message ends with a newline
+        surplus_lines = self.filtered_buffer.get_line_count() - 1 - self.max_lines
+        if surplus_lines > 0:
+            self.filtered_buffer.delete(self.filtered_buffer.get_start_iter(),
+                                        self.filtered_buffer.get_iter_at_line(surplus_lines))
+
+    def print_to_text_view(self, text, text_buf, use_tag=None, scroll=True):
         time, source, message = self.split_text(text)
         text_buf.insert_with_tags_by_name(text_buf.get_end_iter(), time + " ", "set_gray_text")
         text_buf.insert_with_tags_by_name(text_buf.get_end_iter(), source + ": ", "set_white_text")
@@ -94,7 +178,7 @@ class LoggingConsoleView(View):
         else:
             text_buf.insert(text_buf.get_end_iter(), message + "\n")
 
-        if not self.quit_flag and self._enables['CONSOLE_FOLLOW_LOGGING']:
+        if scroll and not self.quit_flag and self._enables['CONSOLE_FOLLOW_LOGGING']:
             self.scroll_to_cursor_onscreen()
 
     @staticmethod
@@ -10,46 +10,150 @@
 # Sebastian Brunner <sebastian.brunner@dlr.de>
 # Sebastian Riedel <sebastian.riedel@dlr.de>
 
+import os
 import shelve
 import json
 import pickle
+from contextlib import contextmanager
 
 from rafcon.utils import log
+from rafcon.utils.execution_log_stream import ExecutionLogStreamReader, is_stream_log
 logger = log.get_logger(__name__)
 
+START_DEFINITIONS_FOLDER = "state_machine_definitions"
+# the keys of the pickled data of a record, which makes up the bulk of the log
+PAYLOAD_KEYS = ('input_output_data', 'scoped_data')
 
-def log_to_raw_structure(execution_history_items):
+
+def open_execution_log(filename):
+    """Opens an execution log file for reading
+
+    Both the shelve format and the stream format (see :mod:`rafcon.utils.execution_log_stream`) are supported.
+
+    :param str filename: the path of the log file
+    :return: a mapping of history item ids to the records of the history items
     """
-    :param dict execution_history_items: history items, in the simplest case
-           directly the opened shelve log file
-    :return: start_item, the StateMachineStartItem of the log file
-             previous, a dict mapping history_item_id --> history_item_id of previous history item
-             next_, a dict mapping history_item_id --> history_item_id of the next history item (except if
-                    next item is a concurrent execution branch)
-             concurrent, a dict mapping history_item_id --> []list of concurrent next history_item_ids
-                         (if present)
-             grouped, a dict mapping run_id --> []list of history items with this run_id
+    if is_stream_log(filename):
+        return ExecutionLogStreamReader(filename)
+    return shelve.open(filename, 'r')
+
+
+@contextmanager
+def _get_execution_history_items(execution_history_items):
+    """Provides the records of a log, a log passed as path is opened and closed again
+
+    :param execution_history_items: history items, an opened log file or the path of a log file
+    """
+    if not isinstance(execution_history_items, basestring):
+        yield execution_history_items
+        return
+    execution_log = open_execution_log(execution_history_items)
+    try:
+        yield execution_log
+    finally:
+        execution_log.close()
+
+
+def get_start_definition_path(log_filename, definition_hash):
+    """Returns the path of the file holding the definition of a state machine start
+
+    The definitions are stored once per content hash in a folder next to the log files.
+
+    :param str log_filename: the path of the log file
+    :param str definition_hash: the content hash of the definition
+    :rtype: str
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(log_filename)), START_DEFINITIONS_FOLDER,
+                        definition_hash + ".json")
+
+
+def resolve_start_item(record, log_filename=None):
+    """Adds the referenced definition to the record of a StateMachineStartItem
+
+    The records of StateMachineStartItems only reference the definition of the started state machine (its meta data
+    and the environment variables), which is stored once per content hash in a separate file. The definition file is
+    searched next to the log file and at the path stored in the record. Records holding the definition themselves
+    are returned unchanged.
+
+    :param dict record: the record of a StateMachineStartItem
+    :param str log_filename: the path of the log file, if known
+    :return: the record including the definition
+    :rtype: dict
+    """
+    if 'definition_hash' not in record or 'os_environment' in record:
+        return record
+    definition_paths = []
+    if log_filename:
+        definition_paths.append(get_start_definition_path(log_filename, record['definition_hash']))
+    if record.get('definition_path'):
+        definition_paths.append(record['definition_path'])
+    for definition_path in definition_paths:
+        if os.path.isfile(definition_path):
+            with open(definition_path, 'r') as definition_file:
+                definition = json.load(definition_file)
+            resolved_record = dict(record)
+            resolved_record.update(definition['state_machine'])
+            resolved_record['os_environment'] = definition['os_environment']
+            return resolved_record
+    logger.warning("The definition {0} of the state machine start item could not be found".format(
+        record['definition_hash']))
+    return record
+
+
+def _read_records(execution_history_items, include_payload=True):
+    """Reads all records of a log
+
+    Each record is read (and thus un-pickled) exactly once. The definitions referenced by StateMachineStartItems are
+    resolved.
+
+    :param execution_history_items: history items, an opened log file or the path of a log file
+    :param bool include_payload: flag if the pickled data (see :data:`PAYLOAD_KEYS`) is kept in the records
+    :return: a list of (history_item_id, record) tuples in the order of the log and a dict mapping
+             history_item_id --> record
     :rtype: tuple
     """
+    if isinstance(execution_history_items, basestring):
+        log_filename = execution_history_items
+    else:
+        log_filename = getattr(execution_history_items, 'filename', None)
+    record_items = []
+    resolved = False
+    with _get_execution_history_items(execution_history_items) as opened_execution_history_items:
+        # the records are read one by one, thus only a single payload is kept in memory, if payloads are dropped
+        for key, record in opened_execution_history_items.iteritems():
+            if not include_payload:
+                record = {k: v for k, v in record.iteritems() if k not in PAYLOAD_KEYS}
+            if record.get('item_type') == 'StateMachineStartItem':
+                resolved_record = resolve_start_item(record, log_filename)
+                if resolved_record is not record:
+                    record = resolved_record
+                    resolved = True
+            record_items.append((key, record))
+    if isinstance(execution_history_items, dict) and include_payload and not resolved:
+        return record_items, execution_history_items
+    return record_items, dict(record_items)
+
+
+def _records_to_raw_structure(record_items, records):
     previous = {}
     next_ = {}
     concurrent = {}
     grouped_by_run_id = {}
     start_item = None
 
-    for k,v in execution_history_items.items():
+    for k, v in record_items:
         if v['item_type'] == 'StateMachineStartItem':
             start_item = v
         else:
             # connect the item to its predecessor
             prev_item_id = v['prev_history_item_id']
+            prev_item = records.get(prev_item_id)
 
-            if prev_item_id in execution_history_items:
+            if prev_item is not None:
                 ## should always be the case except if shelve is broken/missing data
 
                 previous[k] = prev_item_id
-                if execution_history_items[prev_item_id]['item_type'] == 'ConcurrencyItem' and \
-                   execution_history_items[k]['item_type'] != 'ReturnItem':
+                if prev_item['item_type'] == 'ConcurrencyItem' and v['item_type'] != 'ReturnItem':
                     # this is not a return  item, thus this 'previous' relationship of this
                     # item must be a call item of one of the concurrent branches of
                     # the concurrency state
@@ -61,7 +165,7 @@ def log_to_raw_structure(execution_history_items):
                     # this is a logical 'next' relationship
                     next_[prev_item_id] = k
             else:
-                logger.warn('HistoryItem is referring to a non-existing previous history item, HistoryItem was %s' % str(v))
+                logger.warning('HistoryItem is referring to a non-existing previous history item, HistoryItem was %s' % str(v))
 
         rid = v['run_id']
         if rid in grouped_by_run_id:
@@ -72,8 +176,71 @@ def log_to_raw_structure(execution_history_items):
     return start_item, previous, next_, concurrent, grouped_by_run_id
 
 
+def _collapse_start_item(item):
+    execution_item = {}
+    ## add base properties will throw if not existing
+    for l in ['description', 'path_by_name', 'state_name', 'run_id', 'state_type',
+              'path', 'timestamp', 'root_state_storage_id', 'state_machine_version',
+              'used_rafcon_version', 'creation_time', 'last_update', 'os_environment']:
+        try:
+            execution_item[l] = item[l]
+        except KeyError:
+            logger.warning("Key {} not in history start item".format(str(l)))
+
+    ## add extended properties (added in later rafcon versions),
+    ## will add default value if not existing instead
+    for l, default in [('semantic_data', {}),
+                         ('is_library', None),
+                         ('library_state_name', None),
+                         ('library_name', None),
+                         ('library_path', None)]:
+        execution_item[l] = item.get(l, default)
+    return execution_item
+
+
+def _unpickle_data(data_dict, throw_on_pickle_error, include_erroneous_data_ports):
+    r = dict()
+    # support backward compatibility
+    if isinstance(data_dict, basestring):  # formerly data dict was a json string
+        r = json.loads(data_dict)
+    else:
+        for k, v in data_dict.iteritems():
+            if not k.startswith('!'): # ! indicates storage error
+                try:
+                    r[k] = pickle.loads(v)
+                except Exception as e:
+                    if throw_on_pickle_error:
+                        raise
+                    elif include_erroneous_data_ports:
+                        r['!' + k] = (str(e), v)
+                    else:
+                        pass # ignore
+            elif include_erroneous_data_ports:
+                r[k] = v
+
+    return r
+
+
+def log_to_raw_structure(execution_history_items):
+    """
+    :param dict execution_history_items: history items, in the simplest case
+           directly the opened shelve log file; also the path of a log file can be passed
+    :return: start_item, the StateMachineStartItem of the log file
+             previous, a dict mapping history_item_id --> history_item_id of previous history item
+             next_, a dict mapping history_item_id --> history_item_id of the next history item (except if
+                    next item is a concurrent execution branch)
+             concurrent, a dict mapping history_item_id --> []list of concurrent next history_item_ids
+                         (if present)
+             grouped, a dict mapping run_id --> []list of history items with this run_id
+    :rtype: tuple
+    """
+    record_items, records = _read_records(execution_history_items)
+    start_item, previous, next_, concurrent, grouped_by_run_id = _records_to_raw_structure(record_items, records)
+    return start_item, previous, next_, concurrent, grouped_by_run_id
+
+
 def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=True,
-                               include_erroneous_data_ports=False, full_next=False):
+                               include_erroneous_data_ports=False, full_next=False, load_data=True):
     """
     Collapsed structure means that all history items belonging to the same state execution are
     merged together into one object (e.g. CallItem and ReturnItem of an ExecutionState). This
@@ -81,11 +248,14 @@ def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=Tr
     The collapsed items hold input as well as output data (direct and scoped), and the outcome
     the state execution.
     :param dict execution_history_items: history items, in the simplest case
-           directly the opened shelve log file
+           directly the opened shelve log file; also the path of a log file can be passed
     :param bool throw_on_pickle_error: flag if an error is thrown if an object cannot be un-pickled
     :param bool include_erroneous_data_ports: flag if to include erroneous data ports
     :param bool full_next: flag to indicate if the next relationship has also to be created at the end
            of container states
+    :param bool load_data: flag if the data flow is loaded; if not, the collapsed items only hold the ids of their
+           call and return history items (call_history_item_id, return_history_item_id) and the data can be
+           loaded on demand with :func:`load_collapsed_item_data`
     :return: start_item, the StateMachineStartItem of the log file
              next_, a dict mapping run_id --> run_id of the next executed state on the same
                     hierarchy level
@@ -98,12 +268,9 @@ def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=Tr
     :rtype: tuple
     """
 
-    # for debugging purposes
-    # execution_history_items_dict = dict()
-    # for k, v in execution_history_items.items():
-    #     execution_history_items_dict[k] = v
-
-    start_item, previous, next_, concurrent, grouped = log_to_raw_structure(execution_history_items)
+    record_items, records = _read_records(execution_history_items, include_payload=load_data)
+    start_item, previous, next_, concurrent, grouped = _records_to_raw_structure(record_items, records)
+    record_items = None
 
     start_item = None
     collapsed_next = {}
@@ -113,133 +280,79 @@ def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=Tr
 
     # single state executions are not supported
     if len(next_) == 0 or len(next_) == 1:
-        for rid, gitems in grouped.items():
+        for rid, gitems in grouped.iteritems():
             if gitems[0]['item_type'] == 'StateMachineStartItem':
-                item = gitems[0]
-                execution_item = {}
-                ## add base properties will throw if not existing
-                for l in ['description', 'path_by_name', 'state_name', 'run_id', 'state_type',
-                          'path', 'timestamp', 'root_state_storage_id', 'state_machine_version',
-                          'used_rafcon_version', 'creation_time', 'last_update', 'os_environment']:
-                    try:
-                        execution_item[l] = item[l]
-                    except KeyError:
-                        logger.warn("Key {} not in history start item".format(str(l)))
-
-                ## add extended properties (added in later rafcon versions),
-                ## will add default value if not existing instead
-                for l, default in [('semantic_data', {}),
-                                     ('is_library', None),
-                                     ('library_state_name', None),
-                                     ('library_name', None),
-                                     ('library_path', None)]:
-                    execution_item[l] = item.get(l, default)
-
-                start_item = execution_item
+                start_item = _collapse_start_item(gitems[0])
         return start_item, collapsed_next, collapsed_concurrent, collapsed_hierarchy, collapsed_items
 
     # build collapsed items
-    for rid, gitems in grouped.items():
+    for rid, gitems in grouped.iteritems():
         if gitems[0]['item_type'] == 'StateMachineStartItem':
-            item = gitems[0]
-            execution_item = {}
-            ## add base properties will throw if not existing
-            for l in ['description', 'path_by_name', 'state_name', 'run_id', 'state_type',
-                      'path', 'timestamp', 'root_state_storage_id', 'state_machine_version',
-                      'used_rafcon_version', 'creation_time', 'last_update', 'os_environment']:
-                try:
-                    execution_item[l] = item[l]
-                except KeyError:
-                    logger.warn("Key {} not in history start item".format(str(l)))
-
-            ## add extended properties (added in later rafcon versions),
-            ## will add default value if not existing instead
-            for l, default in [('semantic_data', {}),
-                                 ('is_library', None),
-                                 ('library_state_name', None),
-                                 ('library_name', None),
-                                 ('library_path', None)]:
-                execution_item[l] = item.get(l, default)
-
+            execution_item = _collapse_start_item(gitems[0])
             start_item = execution_item
 
-            collapsed_next[rid] = execution_history_items[next_[gitems[0]['history_item_id']]]['run_id']
+            collapsed_next[rid] = records[next_[gitems[0]['history_item_id']]]['run_id']
             collapsed_items[rid] = execution_item
         elif gitems[0]['state_type'] == 'ExecutionState' or \
              gitems[0]['state_type'] == 'HierarchyState' or \
              gitems[0]['state_type'] == 'LibraryState' or \
              'Concurrency' in gitems[0]['state_type']:
 
-            # for item in gitems:
-            #     if item["description"] is not None:
-            #         print item["item_type"], item["call_type"], item["state_type"], item["state_name"]
-            #     print item["description"]
-
-            # select call and return items for this state
-            try:
-                call_item = gitems[[gitems[i]['item_type'] == 'CallItem' and \
-                                    gitems[i]['call_type'] == 'EXECUTE' \
-                                    for i in range(len(gitems))].index(True)]
-            except ValueError:
-                # fall back to container call, should only happen for root state
-                try:
-                    call_item = gitems[[gitems[i]['item_type'] == 'CallItem' and \
-                                        gitems[i]['call_type'] == 'CONTAINER' \
-                                        for i in range(len(gitems))].index(True)]
-                except ValueError:
-                    logger.warn('Could not find a CallItem in run_id group %s\nThere will probably be log information missing on this execution branch!' % str(rid))
-                    ## create dummy returnitem with the properties referenced later in this code
-                    call_item = dict(description=None,
-                                     history_item_id=None,
-                                     path_by_name=None,
-                                     state_name=None,
-                                     run_id=None,
-                                     state_type=None,
-                                     path=None,
-                                     timestamp=None,
-                                     input_output_data={},
-                                     scoped_data={})
-
-            try:
-                return_item = gitems[[gitems[i]['item_type'] == 'ReturnItem' and \
-                                      gitems[i]['call_type'] == 'EXECUTE' \
-                                      for i in range(len(gitems))].index(True)]
-            except ValueError:
-                # fall back to container call, should only happen for root state
-                try:
-                    return_item = gitems[[gitems[i]['item_type'] == 'ReturnItem' and \
-                                          gitems[i]['call_type'] == 'CONTAINER' \
-                                          for i in range(len(gitems))].index(True)]
-                except ValueError:
-                    logger.warn('Could not find a ReturnItem in run_id group %s\nThere will probably be log information missing on this execution branch!' % str(rid))
-                    ## create dummy returnitem with the properties referenced later in this code
-                    return_item = dict(history_item_id=None,
-                                       outcome_name=None,
-                                       outcome_id=None,
-                                       timestamp=None,
-                                       input_output_data={},
-                                       scoped_data={})
+            # select call and return items for this state in a single pass over the group
+            # the first EXECUTE items are preferred, CONTAINER items are the fall back (root state)
+            first_items = {}
+            for item in gitems:
+                item_key = (item['item_type'], item.get('call_type'))
+                if item_key not in first_items:
+                    first_items[item_key] = item
+
+            call_item = first_items.get(('CallItem', 'EXECUTE'), first_items.get(('CallItem', 'CONTAINER')))
+            if call_item is None:
+                logger.warning('Could not find a CallItem in run_id group %s\nThere will probably be log information missing on this execution branch!' % str(rid))
+                ## create dummy returnitem with the properties referenced later in this code
+                call_item = dict(description=None,
+                                 history_item_id=None,
+                                 path_by_name=None,
+                                 state_name=None,
+                                 run_id=None,
+                                 state_type=None,
+                                 path=None,
+                                 timestamp=None,
+                                 input_output_data={},
+                                 scoped_data={})
+
+            return_item = first_items.get(('ReturnItem', 'EXECUTE'), first_items.get(('ReturnItem', 'CONTAINER')))
+            if return_item is None:
+                logger.warning('Could not find a ReturnItem in run_id group %s\nThere will probably be log information missing on this execution branch!' % str(rid))
+                ## create dummy returnitem with the properties referenced later in this code
+                return_item = dict(history_item_id=None,
+                                   outcome_name=None,
+                                   outcome_id=None,
+                                   timestamp=None,
+                                   input_output_data={},
+                                   scoped_data={})
 
             # next item (on same hierarchy level) is always after return item
             if return_item['history_item_id'] in next_:
+                next_item = records[next_[return_item['history_item_id']]]
                 # no next relationship at the end of containers
-                if execution_history_items[next_[return_item['history_item_id']]]['state_type'] == 'HierarchyState' and execution_history_items[next_[return_item['history_item_id']]]['item_type'] == 'ReturnItem' and execution_history_items[next_[return_item['history_item_id']]]['call_type'] == 'CONTAINER':
+                if next_item['state_type'] == 'HierarchyState' and next_item['item_type'] == 'ReturnItem' and \
+                        next_item['call_type'] == 'CONTAINER':
                     if full_next:
-                        collapsed_next[rid] = execution_history_items[next_[return_item['history_item_id']]]['run_id']
-                    else:
-                        pass
+                        collapsed_next[rid] = next_item['run_id']
                 else:
-                    collapsed_next[rid] = execution_history_items[next_[return_item['history_item_id']]]['run_id']
+                    collapsed_next[rid] = next_item['run_id']
 
             # treat hierarchy level
             if call_item['history_item_id'] in previous:
-                if execution_history_items[previous[call_item['history_item_id']]]['state_type'] == 'HierarchyState' and execution_history_items[previous[call_item['history_item_id']]]['item_type'] == 'CallItem':
-                    prev_rid = execution_history_items[previous[call_item['history_item_id']]]['run_id']
+                previous_item = records[previous[call_item['history_item_id']]]
+                if previous_item['state_type'] == 'HierarchyState' and previous_item['item_type'] == 'CallItem':
+                    prev_rid = previous_item['run_id']
                     collapsed_hierarchy[prev_rid] = rid
 
                 # treat concurrency level
-                if execution_history_items[previous[call_item['history_item_id']]]['item_type'] == 'ConcurrencyItem':
-                    prev_rid = execution_history_items[previous[call_item['history_item_id']]]['run_id']
+                if previous_item['item_type'] == 'ConcurrencyItem':
+                    prev_rid = previous_item['run_id']
                     if prev_rid in collapsed_concurrent:
                         collapsed_concurrent[prev_rid].append(rid)
                     else:
@@ -266,38 +379,54 @@ def log_to_collapsed_structure(execution_history_items, throw_on_pickle_error=Tr
                 execution_item[l+'_call'] = call_item[l]
                 execution_item[l+'_return'] = return_item[l]
 
-            def unpickle_data(data_dict):
-                r = dict()
-                # support backward compatibility
-                if isinstance(data_dict, basestring):  # formerly data dict was a json string
-                    r = json.loads(data_dict)
-                else:
-                    for k, v in data_dict.iteritems():
-                        if not k.startswith('!'): # ! indicates storage error
-                            try:
-                                r[k] = pickle.loads(v)
-                            except Exception as e:
-                                if throw_on_pickle_error:
-                                    raise
-                                elif include_erroneous_data_ports:
-                                    r['!' + k] = (str(e), v)
-                                else:
-                                    pass # ignore
-                        elif include_erroneous_data_ports:
-                            r[k] = v
-
-                return r
-
-            execution_item['data_ins'] = unpickle_data(call_item['input_output_data'])
-            execution_item['data_outs'] = unpickle_data(return_item['input_output_data'])
-            execution_item['scoped_data_ins'] = unpickle_data(call_item['scoped_data'])
-            execution_item['scoped_data_outs'] = unpickle_data(return_item['scoped_data'])
+            if load_data:
+                execution_item.update(_collapse_data(call_item, return_item, throw_on_pickle_error,
+                                                     include_erroneous_data_ports))
+            else:
+                execution_item['call_history_item_id'] = call_item['history_item_id']
+                execution_item['return_history_item_id'] = return_item['history_item_id']
 
             collapsed_items[rid] = execution_item
 
     return start_item, collapsed_next, collapsed_concurrent, collapsed_hierarchy, collapsed_items
 
 
+def _collapse_data(call_item, return_item, throw_on_pickle_error, include_erroneous_data_ports):
+    return {'data_ins': _unpickle_data(call_item.get('input_output_data', {}), throw_on_pickle_error,
+                                       include_erroneous_data_ports),
+            'data_outs': _unpickle_data(return_item.get('input_output_data', {}), throw_on_pickle_error,
+                                        include_erroneous_data_ports),
+            'scoped_data_ins': _unpickle_data(call_item.get('scoped_data', {}), throw_on_pickle_error,
+                                              include_erroneous_data_ports),
+            'scoped_data_outs': _unpickle_data(return_item.get('scoped_data', {}), throw_on_pickle_error,
+                                               include_erroneous_data_ports)}
+
+
+def load_collapsed_item_data(execution_history_items, collapsed_item, throw_on_pickle_error=True,
+                             include_erroneous_data_ports=False):
+    """Loads the data flow of a collapsed item created without data
+
+    Only the call and the return history item of the state execution are read from the log.
+
+    :param execution_history_items: history items, in the simplest case directly the opened log file
+    :param dict collapsed_item: a collapsed item from :func:`log_to_collapsed_structure` with load_data=False
+    :param bool throw_on_pickle_error: flag if an error is thrown if an object cannot be un-pickled
+    :param bool include_erroneous_data_ports: flag if to include erroneous data ports
+    :return: a copy of the collapsed item including data_ins, data_outs, scoped_data_ins and scoped_data_outs
+    :rtype: dict
+    """
+    def get_record(history_item_id):
+        if history_item_id is None:  # missing call or return item
+            return {}
+        return execution_history_items.get(history_item_id) or {}
+
+    execution_item = dict(collapsed_item)
+    call_item = get_record(execution_item.pop('call_history_item_id', None))
+    return_item = get_record(execution_item.pop('return_history_item_id', None))
+    execution_item.update(_collapse_data(call_item, return_item, throw_on_pickle_error, include_erroneous_data_ports))
+    return execution_item
+
+
 def log_to_DataFrame(execution_history_items, data_in_columns=[], data_out_columns=[], scoped_in_columns=[],
                      scoped_out_columns=[], semantic_data_columns=[], throw_on_pickle_error=True):
     """
@@ -0,0 +1,261 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: execution_log_analytics
+   :synopsis: Statistics about the state executions of an execution log, computed on numpy arrays
+
+All functions work on a columnar representation of the collapsed items of a log (see :func:`log_to_columns`), in
+which each column is a numpy array with one entry per state execution. Thus, all statistics are computed without
+Python loops over the state executions. The module can also be used as command line tool to summarize a log file.
+"""
+
+import sys
+
+from rafcon.utils import log
+from rafcon.utils.execution_log import log_to_collapsed_structure
+
+logger = log.get_logger(__name__)
+
+DEFAULT_PERCENTILES = (50, 95, 99)
+STRING_COLUMNS = ('run_id', 'state_name', 'state_type', 'path', 'path_by_name', 'outcome_name')
+
+
+def _import_numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("The Python package 'numpy' is required for the execution log analytics.")
+    return np
+
+
+def log_to_columns(execution_history_items):
+    """Converts the collapsed items of an execution log into columns
+
+    The StateMachineStartItem is not part of the columns. Missing timestamps are represented by NaN. The data flow of
+    the states is not read from the log.
+
+    :param execution_history_items: history items, in the simplest case directly the opened log file; also the path
+           of a log file can be passed
+    :return: a dict mapping column names to numpy arrays; the columns are run_id, state_name, state_type, path,
+             path_by_name, outcome_name (object arrays) and timestamp_call, timestamp_return, duration (float arrays)
+    :rtype: dict
+    """
+    np = _import_numpy()
+    start_item, next_, concurrent, hierarchy, collapsed_items = log_to_collapsed_structure(
+        execution_history_items, load_data=False)
+    if start_item is not None:
+        collapsed_items.pop(start_item['run_id'], None)
+    items = collapsed_items.values()
+
+    columns = {}
+    for key in STRING_COLUMNS:
+        column = np.empty(len(items), dtype=object)
+        column[:] = [item[key] for item in items]
+        columns[key] = column
+    for key in ('timestamp_call', 'timestamp_return'):
+        columns[key] = np.array([item[key] for item in items], dtype=float)
+    columns['duration'] = columns['timestamp_return'] - columns['timestamp_call']
+    return columns
+
+
+def _group_indices(np, keys):
+    """Returns the sorted unique keys and, for each element, the index of its key
+
+    The keys are grouped as objects, as names with non-ASCII characters cannot be converted to a numpy string array.
+    """
+    groups = sorted(set(keys))
+    index_of_group = {group: index for index, group in enumerate(groups)}
+    group_indices = np.fromiter((index_of_group[key] for key in keys), dtype=int, count=len(keys))
+    return groups, group_indices
+
+
+def duration_statistics(columns, group_by='path_by_name', percentiles=DEFAULT_PERCENTILES):
+    """Computes the duration statistics of the state executions per group
+
+    State executions without valid duration (e.g. missing return items) are ignored.
+
+    :param dict columns: the columns of a log, see :func:`log_to_columns`
+    :param str group_by: the name of the column to group the state executions by
+    :param tuple percentiles: the percentiles to compute, in the range [0, 100]
+    :return: a dict mapping each group to a dict with the keys count, total, mean, min, max and p<percentile>
+    :rtype: dict
+    """
+    np = _import_numpy()
+    durations = columns['duration']
+    valid = ~np.isnan(durations)
+    durations = durations[valid]
+    if not len(durations):
+        return {}
+    groups, group_indices = _group_indices(np, columns[group_by][valid])
+
+    counts = np.bincount(group_indices, minlength=len(groups))
+    totals = np.bincount(group_indices, weights=durations, minlength=len(groups))
+    # sort by group and then by duration, thus the durations of each group are a sorted slice
+    order = np.lexsort((durations, group_indices))
+    sorted_durations = durations[order]
+    group_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    statistics = {
+        'count': counts,
+        'total': totals,
+        'mean': totals / counts,
+        'min': sorted_durations[group_starts],
+        'max': sorted_durations[group_starts + counts - 1],
+    }
+    for percentile in percentiles:
+        # linear interpolation between the closest ranks, like numpy.percentile
+        positions = group_starts + (counts - 1) * (percentile / 100.)
+        lower = np.floor(positions).astype(int)
+        upper = np.ceil(positions).astype(int)
+        fraction = positions - lower
+        statistics['p{0}'.format(percentile)] = \
+            sorted_durations[lower] * (1. - fraction) + sorted_durations[upper] * fraction
+
+    return {group: {key: values[index].item() for key, values in statistics.iteritems()}
+            for index, group in enumerate(groups)}
+
+
+def total_time_per_path(columns, by_name=True):
+    """Sums up the execution time of the states per state path
+
+    :param dict columns: the columns of a log, see :func:`log_to_columns`
+    :param bool by_name: whether the path of state names or the path of state ids is used
+    :return: a dict mapping each path to the total execution time in seconds
+    :rtype: dict
+    """
+    np = _import_numpy()
+    durations = columns['duration']
+    valid = ~np.isnan(durations)
+    paths, path_indices = _group_indices(np, columns['path_by_name' if by_name else 'path'][valid])
+    totals = np.bincount(path_indices, weights=durations[valid], minlength=len(paths))
+    return dict(zip(paths, totals.tolist()))
+
+
+def outcome_frequencies(columns, group_by='path_by_name'):
+    """Counts how often the outcomes of the states were taken
+
+    :param dict columns: the columns of a log, see :func:`log_to_columns`
+    :param str group_by: the name of the column to group the state executions by
+    :return: a dict mapping each group to a dict mapping outcome names to the number of occurrences
+    :rtype: dict
+    """
+    np = _import_numpy()
+    groups, group_indices = _group_indices(np, columns[group_by])
+    outcomes, outcome_indices = _group_indices(np, columns['outcome_name'])
+    counts = np.bincount(group_indices * len(outcomes) + outcome_indices,
+                         minlength=len(groups) * len(outcomes)).reshape(len(groups), len(outcomes))
+    frequencies = {}
+    for group_index, outcome_index in zip(*np.nonzero(counts)):
+        frequencies.setdefault(groups[group_index], {})[outcomes[outcome_index]] = \
+            counts[group_index, outcome_index].item()
+    return frequencies
+
+
+def concurrency_overlap(columns, state_types=('ExecutionState',)):
+    """Determines how many states were executed at the same time
+
+    By default, only execution states are considered, as container states always overlap with their children.
+
+    :param dict columns: the columns of a log, see :func:`log_to_columns`
+    :param tuple state_types: the types of states to consider, None for all
+    :return: a dict with the maximum number of concurrently executed states (max_concurrency), the time weighted
+             mean number (mean_concurrency) and a dict mapping the number of concurrently executed states to the
+             time spent with this number (time_per_level)
+    :rtype: dict
+    """
+    np = _import_numpy()
+    valid = ~np.isnan(columns['duration'])
+    if state_types is not None:
+        valid &= np.in1d(columns['state_type'], list(state_types))
+    calls = columns['timestamp_call'][valid]
+    returns = columns['timestamp_return'][valid]
+    if not len(calls):
+        return {'max_concurrency': 0, 'mean_concurrency': 0., 'time_per_level': {}}
+
+    times = np.concatenate((calls, returns))
+    changes = np.concatenate((np.ones(len(calls), dtype=int), -np.ones(len(returns), dtype=int)))
+    # returns before calls at the same time, thus directly succeeding states do not overlap
+    order = np.lexsort((changes, times))
+    times = times[order]
+    # zero length executions can lead to a negative level for an interval of zero length
+    levels = np.maximum(np.cumsum(changes[order]), 0)
+    intervals = np.diff(times)
+    levels = levels[:-1]
+    time_per_level = np.bincount(levels, weights=intervals)
+    total_time = times[-1] - times[0]
+    return {
+        'max_concurrency': int(levels.max()) if len(levels) else 1,
+        'mean_concurrency': float(np.dot(levels, intervals) / total_time) if total_time > 0 else 1.,
+        'time_per_level': {level: time for level, time in enumerate(time_per_level.tolist()) if time > 0}
+    }
+
+
+def summarize(execution_history_items, group_by='path_by_name', percentiles=DEFAULT_PERCENTILES):
+    """Computes all statistics of an execution log
+
+    :param execution_history_items: history items, in the simplest case directly the opened log file; also the path
+           of a log file can be passed
+    :param str group_by: the name of the column to group the state executions by
+    :param tuple percentiles: the percentiles of the durations to compute
+    :return: a dict with the keys durations, outcomes and concurrency
+    :rtype: dict
+    """
+    columns = log_to_columns(execution_history_items)
+    return {
+        'durations': duration_statistics(columns, group_by, percentiles),
+        'outcomes': outcome_frequencies(columns, group_by),
+        'concurrency': concurrency_overlap(columns),
+    }
+
+
+def format_summary(summary, percentiles=DEFAULT_PERCENTILES):
+    """Formats the summary of an execution log as text table
+
+    :param dict summary: the summary, see :func:`summarize`
+    :param tuple percentiles: the percentiles contained in the summary
+    :return: the text
+    :rtype: unicode
+    """
+    percentile_keys = ['p{0}'.format(percentile) for percentile in percentiles]
+    header = ['state', 'count', 'total', 'mean'] + percentile_keys + ['outcomes']
+    rows = []
+    for group in sorted(summary['durations'], key=lambda group: -summary['durations'][group]['total']):
+        statistics = summary['durations'][group]
+        outcomes = u", ".join(u"{0}: {1}".format(outcome, count)
+                               for outcome, count in sorted(summary['outcomes'].get(group, {}).iteritems()))
+        rows.append([group, str(statistics['count'])] +
+                    ["{0:.6f}".format(statistics[key]) for key in ['total', 'mean'] + percentile_keys] +
+                    [outcomes])
+    widths = [max(len(row[column]) for row in [header] + rows) for column in range(len(header))]
+    lines = [u"  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+             for row in [header] + rows]
+    concurrency = summary['concurrency']
+    lines.append("")
+    lines.append("concurrently executed states: max {0}, mean {1:.3f}".format(concurrency['max_concurrency'],
+                                                                             concurrency['mean_concurrency']))
+    return u"\n".join(lines) + u"\n"
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Summarizes the state executions of an execution log")
+    parser.add_argument("file", help="path to the log file (shelve or stream format)")
+    parser.add_argument("--group-by", default="path_by_name", choices=STRING_COLUMNS[1:-1],
+                        help="the property to group the state executions by")
+    parser.add_argument("--percentiles", default=DEFAULT_PERCENTILES, type=float, nargs='+',
+                        help="the percentiles of the durations to compute")
+    args = parser.parse_args()
+    percentiles = tuple(int(p) if float(p).is_integer() else p for p in args.percentiles)
+    summary = summarize(args.file, args.group_by, percentiles)
+    sys.stdout.write(format_summary(summary, percentiles).encode('utf-8'))
+
+
+if __name__ == '__main__':
+    main()
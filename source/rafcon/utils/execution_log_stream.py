@@ -0,0 +1,307 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: execution_log_stream
+   :synopsis: An append-only file format for execution logs, which can be read while it is written
+
+The file starts with a magic string, followed by a sequence of frames. Each frame consists of a header (frame type,
+length of the key, length of the payload), the key and the payload:
+
+* record frames (``R``) hold the pickled record of one history item, the key is the history item id
+* index frames (``I``) are written periodically and hold the offset of the previous index frame as well as the keys
+  and offsets of all records since the previous index frame
+* the trailer frame (``T``) is written, when the log is closed, and holds the offset of the last index frame
+
+A reader of a closed log file only needs to read the chain of index frames, a reader of a log file, which is still
+written, scans the frame headers and can continue the scan at any time.
+"""
+
+import os
+import shelve
+import struct
+import cPickle as pickle
+from collections import Mapping
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+MAGIC = "RAFCONLOG\x01"
+STREAM_LOG_EXTENSION = ".rafconlog"
+DEFAULT_INDEX_INTERVAL = 1000
+
+_RECORD_FRAME = "R"
+_INDEX_FRAME = "I"
+_TRAILER_FRAME = "T"
+_HEADER = struct.Struct(">cHI")
+_OFFSET = struct.Struct(">Q")
+_TRAILER_SIZE = _HEADER.size + _OFFSET.size
+
+
+def is_stream_log(filename):
+    """Checks whether a file is an execution log in the stream format
+
+    :param str filename: the path of the file
+    :rtype: bool
+    """
+    if not os.path.isfile(filename):
+        return False
+    with open(filename, 'rb') as log_file:
+        return log_file.read(len(MAGIC)) == MAGIC
+
+
+class ExecutionLogStreamWriter(object):
+    """Writes history item records to an execution log file in the stream format
+
+    The writer offers the parts of the interface of a shelve, which are used by the
+    :class:`rafcon.core.execution.execution_history.ExecutionHistoryStorage`. The writer is not thread-safe.
+
+    :ivar str filename: the path of the log file
+    :ivar int index_interval: the number of records after which an index frame is written
+    """
+
+    def __init__(self, filename, index_interval=DEFAULT_INDEX_INTERVAL):
+        self.filename = filename
+        self.index_interval = index_interval
+        self._file = open(filename, 'w+b')
+        self._file.write(MAGIC)
+        self._offsets = {}
+        self._unindexed_records = []
+        self._last_index_offset = None
+
+    def _write_frame(self, frame_type, key, payload):
+        offset = self._file.tell()
+        self._file.write(_HEADER.pack(frame_type, len(key), len(payload)))
+        self._file.write(key)
+        self._file.write(payload)
+        return offset
+
+    def __setitem__(self, key, record):
+        key = str(key)
+        offset = self._write_frame(_RECORD_FRAME, key, pickle.dumps(record, 2))
+        self._offsets[key] = offset
+        self._unindexed_records.append((key, offset))
+        if len(self._unindexed_records) >= self.index_interval:
+            self._write_index()
+
+    def _write_index(self):
+        if not self._unindexed_records:
+            return
+        payload = pickle.dumps((self._last_index_offset, self._unindexed_records), 2)
+        self._last_index_offset = self._write_frame(_INDEX_FRAME, "", payload)
+        self._unindexed_records = []
+
+    def __contains__(self, key):
+        return key in self._offsets
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def get(self, key, default=None):
+        if key not in self._offsets:
+            return default
+        end_offset = self._file.tell()
+        try:
+            return _read_record(self._file, self._offsets[key])
+        finally:
+            self._file.seek(end_offset)
+
+    def sync(self):
+        """Writes all buffered data to the log file"""
+        self._file.flush()
+
+    def close(self):
+        """Writes the last index and the trailer and closes the log file"""
+        if self._file.closed:
+            return
+        self._write_index()
+        if self._last_index_offset is not None:
+            self._write_frame(_TRAILER_FRAME, "", _OFFSET.pack(self._last_index_offset))
+        self._file.close()
+
+
+def _read_header(log_file):
+    header = log_file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    return _HEADER.unpack(header)
+
+
+def _read_record(log_file, offset):
+    log_file.seek(offset)
+    frame_type, key_length, payload_length = _read_header(log_file)
+    log_file.seek(key_length, os.SEEK_CUR)
+    return pickle.loads(log_file.read(payload_length))
+
+
+class ExecutionLogStreamReader(Mapping):
+    """Reads an execution log file in the stream format
+
+    The reader is a read-only mapping of history item ids to records, like an opened shelve log file. Records are
+    read from disk on access. If the log file is still written, :meth:`refresh` makes newly written records
+    available.
+
+    :ivar str filename: the path of the log file
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError("{0} is not an execution log in the stream format".format(filename))
+        self._offsets = {}
+        self._keys = []
+        self._scan_offset = len(MAGIC)
+        self._complete = False
+        if not self._read_index_chain():
+            self.refresh()
+
+    def _read_index_chain(self):
+        """Reads the keys and offsets of all records from the index frames of a closed log file
+
+        :return: True, if the log file is closed and the index could be read
+        :rtype: bool
+        """
+        self._file.seek(0, os.SEEK_END)
+        file_size = self._file.tell()
+        if file_size < len(MAGIC) + _TRAILER_SIZE:
+            return False
+        self._file.seek(file_size - _TRAILER_SIZE)
+        frame_type, key_length, payload_length = _read_header(self._file)
+        if frame_type != _TRAILER_FRAME or key_length != 0 or payload_length != _OFFSET.size:
+            return False
+        index_offset = _OFFSET.unpack(self._file.read(_OFFSET.size))[0]
+        index_blocks = []
+        while index_offset is not None:
+            index_offset, entries = _read_record(self._file, index_offset)
+            index_blocks.append(entries)
+        for entries in reversed(index_blocks):
+            for key, offset in entries:
+                self._add_key(key, offset)
+        self._scan_offset = file_size
+        self._complete = True
+        return True
+
+    def _add_key(self, key, offset):
+        if key not in self._offsets:
+            self._keys.append(key)
+        self._offsets[key] = offset
+
+    def refresh(self):
+        """Scans the log file for records written since the last scan
+
+        Incomplete frames at the end of the file, which are currently written, are ignored until the next refresh.
+
+        :return: the number of new records
+        :rtype: int
+        """
+        if self._complete:
+            return 0
+        number_of_keys = len(self._keys)
+        file_size = os.fstat(self._file.fileno()).st_size
+        offset = self._scan_offset
+        while not self._complete and offset + _HEADER.size <= file_size:
+            self._file.seek(offset)
+            frame_type, key_length, payload_length = _read_header(self._file)
+            frame_end = offset + _HEADER.size + key_length + payload_length
+            if frame_end > file_size:
+                break
+            if frame_type == _RECORD_FRAME:
+                self._add_key(self._file.read(key_length), offset)
+            elif frame_type == _TRAILER_FRAME:
+                self._complete = True
+            offset = frame_end
+        self._scan_offset = offset
+        return len(self._keys) - number_of_keys
+
+    def __getitem__(self, key):
+        if key not in self._offsets:
+            raise KeyError(key)
+        return _read_record(self._file, self._offsets[key])
+
+    def __contains__(self, key):
+        return key in self._offsets
+
+    def __iter__(self):
+        return iter(list(self._keys))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def iteritems(self):
+        """Iterates over all records in the order they were written
+
+        The log file is read sequentially with a separate file handle.
+        """
+        offsets = self._offsets
+        end_offset = self._scan_offset
+        with open(self.filename, 'rb') as log_file:
+            read = log_file.read
+            offset = len(MAGIC)
+            log_file.seek(offset)
+            while offset < end_offset:
+                frame_type, key_length, payload_length = _HEADER.unpack(read(_HEADER.size))
+                key = read(key_length)
+                payload = read(payload_length)
+                # only the last record of a key is valid
+                if frame_type == _RECORD_FRAME and offsets.get(key) == offset:
+                    yield key, pickle.loads(payload)
+                offset += _HEADER.size + key_length + payload_length
+
+    def items(self):
+        return list(self.iteritems())
+
+    def close(self):
+        self._file.close()
+
+
+def convert_shelve_log(shelve_filename, stream_filename=None):
+    """Converts an execution log in the shelve format to the stream format
+
+    The records are written in the order of their timestamps.
+
+    :param str shelve_filename: the path of the shelve log file
+    :param str stream_filename: the path of the new log file, by default the path of the shelve log file with the
+        extension of the stream format
+    :return: the path of the new log file
+    :rtype: str
+    """
+    if stream_filename is None:
+        stream_filename = os.path.splitext(shelve_filename)[0] + STREAM_LOG_EXTENSION
+    shelve_log = shelve.open(shelve_filename, 'r')
+    try:
+        records = sorted(shelve_log.items(), key=lambda key_record: (
+            key_record[1]['item_type'] != 'StateMachineStartItem', key_record[1]['timestamp']))
+    finally:
+        shelve_log.close()
+    writer = ExecutionLogStreamWriter(stream_filename)
+    try:
+        for key, record in records:
+            writer[key] = record
+    finally:
+        writer.close()
+    return stream_filename
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Converts an execution log in the shelve format to the stream "
+                                                 "format")
+    parser.add_argument("shelve_file", help="path to the shelve log file")
+    parser.add_argument("stream_file", help="path to the new log file", default=None, nargs='?')
+    args = parser.parse_args()
+    stream_filename = convert_shelve_log(args.shelve_file, args.stream_file)
+    logger.info("Converted {0} to {1}".format(args.shelve_file, stream_filename))
+
+
+if __name__ == '__main__':
+    main()
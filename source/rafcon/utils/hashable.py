@@ -18,6 +18,9 @@ class Hashable(object):
     def update_hash_from_dict(obj_hash, object_):
         """Updates an existing hash object with another Hashable, list, set, tuple, dict or stringifyable object
 
+        Lists and dicts are delimited and values are prefixed by their length, thus different structures cannot result
+        in the same sequence of hash updates.
+
         :param obj_hash: The hash object (see Python hashlib documentation)
         :param object_: The value that should be added to the hash (can be another Hashable or a dictionary)
         """
@@ -26,14 +29,20 @@ class Hashable(object):
         elif isinstance(object_, (list, set, tuple)):
             if isinstance(object_, set):  # A set is not ordered
                 object_ = sorted(object_)
+            obj_hash.update("[")
             for element in object_:
                 Hashable.update_hash_from_dict(obj_hash, element)
+            obj_hash.update("]")
         elif isinstance(object_, dict):
+            obj_hash.update("{")
             for key in sorted(object_.keys()):  # A dict is not ordered
                 Hashable.update_hash_from_dict(obj_hash, key)
                 Hashable.update_hash_from_dict(obj_hash, object_[key])
+            obj_hash.update("}")
         else:
-            obj_hash.update(str(object_))
+            value = repr(object_) if isinstance(object_, float) else str(object_)  # str would round floats
+            obj_hash.update("{0}:".format(len(value)))
+            obj_hash.update(value)
 
     def update_hash(self, obj_hash):
         """Should be implemented by derived classes to update the hash with their data fields
@@ -0,0 +1,115 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: json_codec
+   :synopsis: Encoding and decoding of objects to and from JSON strings with exchangeable JSON backends
+
+Two formats are supported:
+
+* the readable format (indented, sorted keys) is used for all files saved by the user and is always created by the
+  :class:`JSONObjectEncoder` of the standard library json module, thus the files keep their exact layout
+* the compact format (no whitespace, unsorted keys) is meant for internal uses like backups and undo snapshots. The
+  objects are first converted into plain lists and dicts, which are then encoded by the C implementation of the
+  JSON backend.
+
+Decoding is always done by the JSON backend, which has to support the ``object_hook`` argument. By default, simplejson
+is used if it is installed, otherwise the standard library json module.
+"""
+
+import json
+
+from jsonconversion.decoder import JSONObjectDecoder
+from jsonconversion.encoder import JSONObjectEncoder
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+JSON_BACKENDS = ('simplejson', 'json')
+COMPACT_SEPARATORS = (',', ':')
+
+_backend = json
+_encoder = JSONObjectEncoder()
+_plain_types = (basestring, int, long, float, bool, type(None))
+
+
+def set_backend(backend=None):
+    """Sets the JSON backend used for the compact format and for decoding
+
+    :param backend: the name of a module or a module with the interface of the json module, None to use the first
+        available module of :data:`JSON_BACKENDS`
+    :raises ImportError: if the given backend is not available
+    """
+    global _backend
+    if backend is None:
+        for backend_name in JSON_BACKENDS:
+            try:
+                backend = __import__(backend_name)
+                break
+            except ImportError:
+                continue
+    elif isinstance(backend, basestring):
+        backend = __import__(backend)
+    _backend = backend
+
+
+def get_backend():
+    """Returns the module used as JSON backend"""
+    return _backend
+
+
+def to_plain_object(obj):
+    """Converts an object into plain lists, dicts and values
+
+    The conversion is the same as done by the :class:`JSONObjectEncoder`, e.g. JSONObjects are converted into dicts
+    holding their qualified class name.
+
+    :param obj: the object to convert
+    :return: the object consisting only of types natively supported by JSON
+    """
+    if isinstance(obj, _plain_types):
+        return obj
+    if isinstance(obj, list):
+        return [to_plain_object(item) for item in obj]
+    if isinstance(obj, dict):
+        return {key: to_plain_object(value) for key, value in obj.iteritems()}
+    return to_plain_object(_encoder.default(obj))
+
+
+def dumps(obj, compact=False, **kwargs):
+    """Encodes an object as JSON string
+
+    :param obj: the object to encode
+    :param bool compact: whether to use the compact instead of the readable format
+    :param kwargs: optional additional parameters for the encoder
+    :return: the JSON string
+    :rtype: str
+    """
+    if compact:
+        return _backend.dumps(to_plain_object(obj), separators=COMPACT_SEPARATORS, check_circular=False, **kwargs)
+    return json.dumps(obj, cls=JSONObjectEncoder, indent=4, check_circular=False, sort_keys=True, **kwargs)
+
+
+def loads(json_string, substitute_modules=None, as_dict=False):
+    """Decodes a JSON string of either format
+
+    :param str json_string: the JSON string
+    :param dict substitute_modules: a mapping of old to new qualified class names
+    :param bool as_dict: whether to return the plain lists and dicts instead of the decoded objects
+    :return: the decoded object
+    """
+    if as_dict:
+        return _backend.loads(json_string)
+    object_hook = JSONObjectDecoder(substitute_modules=substitute_modules or {}).object_hook
+    return _backend.loads(json_string, object_hook=object_hook)
+
+
+set_backend()
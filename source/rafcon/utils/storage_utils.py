@@ -16,12 +16,10 @@
 
 """
 
-import json
 import yaml
 from time import gmtime, strftime, strptime, mktime
 
-from jsonconversion.decoder import JSONObjectDecoder
-from jsonconversion.encoder import JSONObjectEncoder
+from rafcon.utils import json_codec
 
 substitute_modules = {
     # backward compatibiliy (remove in next minor release): state elements
@@ -97,15 +95,26 @@ def load_dict_from_yaml(path):
     return dictionary
 
 
-def write_dict_to_json(dictionary, path, **kwargs):
+def dict_to_json_string(dictionary, compact=False, **kwargs):
+    """
+    Convert a dictionary to the json string written by :func:`write_dict_to_json`.
+    :param dictionary: The dictionary to convert
+    :param bool compact: Whether to use the compact instead of the readable format, see :mod:`rafcon.utils.json_codec`
+    :param kwargs: optional additional parameters for dumper
+    :return: The json string
+    """
+    return json_codec.dumps(dictionary, compact, **kwargs)
+
+
+def write_dict_to_json(dictionary, path, compact=False, **kwargs):
     """
     Write a dictionary to a json file.
     :param path: The relative path to save the dictionary to
     :param dictionary: The dictionary to get saved
+    :param bool compact: Whether to use the compact instead of the readable format, see :mod:`rafcon.utils.json_codec`
     :param kwargs: optional additional parameters for dumper
     """
-    result_string = json.dumps(dictionary, cls=JSONObjectEncoder,
-                               indent=4, check_circular=False, sort_keys=True, **kwargs)
+    result_string = dict_to_json_string(dictionary, compact, **kwargs)
     with open(path, 'w') as f:
         # We cannot write directly to the file, as otherwise the 'encode' method wouldn't be called
         f.write(result_string)
@@ -117,10 +126,14 @@ def load_objects_from_json(path, as_dict=False):
     :param path: The relative path of the json file.
     :return: The dictionary specified in the json file
     """
-    f = file(path, 'r')
-    if as_dict:
-        result = json.load(f)
-    else:
-        result = json.load(f, cls=JSONObjectDecoder, substitute_modules=substitute_modules)
-    f.close()
-    return result
+    with open(path, 'r') as f:
+        return json_codec.loads(f.read(), substitute_modules, as_dict)
+
+
+def load_objects_from_json_string(json_string, as_dict=False):
+    """Loads a dictionary from the content of a json file.
+
+    :param str json_string: The content of the json file.
+    :return: The dictionary specified in the json string
+    """
+    return json_codec.loads(json_string, substitute_modules, as_dict)
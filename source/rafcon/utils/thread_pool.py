@@ -0,0 +1,150 @@
+# Copyright (C) 2018 DLR
+#
+# All rights reserved. This program and the accompanying materials are made
+# available under the terms of the Eclipse Public License v1.0 which
+# accompanies this distribution, and is available at
+# http://www.eclipse.org/legal/epl-v10.html
+#
+# Contributors:
+# Sebastian Brunner <sebastian.brunner@dlr.de>
+
+"""
+.. module:: thread_pool
+   :synopsis: A module providing a pool of reusable worker threads
+
+"""
+
+import Queue
+import threading
+
+from rafcon.utils import log
+
+logger = log.get_logger(__name__)
+
+
+class ThreadPoolTask(object):
+    """A handle for a function executed by a worker of a :class:`ThreadPool`
+
+    The handle mimics the parts of the :class:`threading.Thread` interface, which are needed to wait for a task.
+
+    :ivar target: the function to be executed
+    """
+
+    def __init__(self, target, args=(), kwargs=None):
+        self.target = target
+        self._args = args
+        self._kwargs = kwargs if kwargs is not None else {}
+        self._finished = threading.Event()
+
+    def run(self):
+        """Executes the target function and signals the finish of the task"""
+        try:
+            self.target(*self._args, **self._kwargs)
+        except Exception:
+            logger.exception("Exception in thread pool task {0}".format(self.target))
+        finally:
+            self._finished.set()
+
+    def join(self, timeout=None):
+        """Blocks until the task finished
+
+        :param float timeout: Maximum time to wait, None if infinitely
+        """
+        self._finished.wait(timeout)
+
+    def is_alive(self):
+        """Checks, whether the task is still running
+
+        :return: True if the task did not finish, yet
+        :rtype: bool
+        """
+        return not self._finished.is_set()
+
+    isAlive = is_alive
+
+
+class _Worker(threading.Thread):
+    """A worker thread executing tasks handed over by its :class:`ThreadPool`"""
+
+    def __init__(self, pool, name):
+        threading.Thread.__init__(self, name=name)
+        # idle workers must not prevent the interpreter from shutting down
+        self.daemon = True
+        self._pool = pool
+        self._tasks = Queue.Queue(maxsize=1)
+
+    def assign(self, task):
+        self._tasks.put(task)
+
+    def run(self):
+        task = self._tasks.get()
+        while task is not None:
+            task.run()
+            # explicitly drop the reference, as the task can hold large objects
+            task = None
+            if not self._pool.release_worker(self):
+                return
+            task = self._tasks.get()
+
+
+class ThreadPool(object):
+    """A pool of reusable worker threads
+
+    Submitted tasks are never queued: if no idle worker is available, a new worker is spawned. This is necessary as
+    the tasks of RAFCON are states, which can wait for other tasks (e.g. a concurrency state waiting for its child
+    states). Queuing tasks could thus lead to dead-locks. The size of the pool limits the number of idle workers,
+    which are kept alive for subsequent tasks. All further workers terminate after having finished their task.
+
+    :ivar int max_idle_workers: the maximum number of idle workers kept for reuse
+    """
+
+    def __init__(self, max_idle_workers=0, name="ThreadPool"):
+        self.max_idle_workers = max_idle_workers
+        self.name = name
+        self._idle_workers = []
+        self._lock = threading.Lock()
+        self._worker_counter = 0
+
+    def submit(self, target, *args, **kwargs):
+        """Executes the passed function in a worker thread
+
+        :param target: the function to be executed
+        :param args: positional arguments passed to the function
+        :param kwargs: keyword arguments passed to the function
+        :return: A handle to wait for the task
+        :rtype: ThreadPoolTask
+        """
+        task = ThreadPoolTask(target, args, kwargs)
+        with self._lock:
+            worker = self._idle_workers.pop() if self._idle_workers else None
+            if worker is None:
+                self._worker_counter += 1
+                worker = _Worker(self, "{0}-{1}".format(self.name, self._worker_counter))
+                worker.start()
+        worker.assign(task)
+        return task
+
+    def release_worker(self, worker):
+        """Called by a worker that finished its task
+
+        :param worker: the idle worker
+        :return: True, if the worker was taken back into the pool, False if it has to terminate
+        :rtype: bool
+        """
+        with self._lock:
+            if len(self._idle_workers) < self.max_idle_workers:
+                self._idle_workers.append(worker)
+                return True
+        return False
+
+    @property
+    def number_of_idle_workers(self):
+        return len(self._idle_workers)
+
+    def shutdown(self):
+        """Terminates all idle workers"""
+        with self._lock:
+            idle_workers = self._idle_workers
+            self._idle_workers = []
+        for worker in idle_workers:
+            worker.assign(None)
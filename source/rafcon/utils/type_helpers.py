@@ -22,9 +22,13 @@
 
 
 import __builtin__
+from copy import deepcopy
 from pydoc import locate, ErrorDuringImport
 from inspect import isclass
 
+# types whose instances cannot be modified and thus do not need to be copied
+IMMUTABLE_TYPES = (type(None), bool, int, long, float, complex, str, unicode, type)
+
 
 def convert_string_to_type(string_value):
     """Converts a string into a type or class
@@ -119,3 +123,36 @@ def type_inherits_of_type(inheriting_type, base_type):
         if len(inheriting_type.__bases__) != 1:
             return False
         return type_inherits_of_type(inheriting_type.__bases__[0], base_type)
+
+
+def is_immutable(value):
+    """Checks whether a value is known to be immutable
+
+    Only the exact built-in types are considered, as sub-classes can introduce mutable attributes. Tuples and
+    frozensets are immutable, if all their elements are.
+
+    :param value: the value to be checked
+    :return: True if the value is known to be immutable, False else
+    :rtype: bool
+    """
+    value_type = type(value)
+    if value_type in IMMUTABLE_TYPES:
+        return True
+    if value_type is tuple or value_type is frozenset:
+        return all(is_immutable(element) for element in value)
+    return False
+
+
+def copy_value(value, per_reference=False, memo=None):
+    """Copies a value to be passed to another owner
+
+    A deep copy is only created for mutable values, which are not passed per reference.
+
+    :param value: the value to be copied
+    :param bool per_reference: if True, the value is passed per reference and not copied
+    :param dict memo: the memo dictionary of an ongoing deepcopy
+    :return: the value itself or a deep copy of it
+    """
+    if per_reference or is_immutable(value):
+        return value
+    return deepcopy(value, memo)
@@ -0,0 +1,68 @@
+import time
+import threading
+import pytest
+
+# core elements
+import rafcon.core.singleton
+from rafcon.core.state_machine import StateMachine
+from rafcon.utils.thread_pool import ThreadPool
+
+# test environment elements
+import testing_utils
+from test_hierarchy_state_execution import create_hierarchy_state
+
+
+def execute_hierarchy_state(caplog, core_config):
+    testing_utils.initialize_environment_core(core_config=core_config)
+    hierarchy_state = create_hierarchy_state()
+    state_machine = StateMachine(hierarchy_state)
+
+    rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+    rafcon.core.singleton.state_machine_manager.active_state_machine_id = state_machine.state_machine_id
+    rafcon.core.singleton.state_machine_execution_engine.start()
+    rafcon.core.singleton.state_machine_execution_engine.join()
+    rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+    try:
+        assert hierarchy_state.output_data["output1"] == 52.0
+    finally:
+        # 2 type error -> one child output port data type error and root state scoped data type error
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_errors=2)
+
+
+def test_inline_child_execution(caplog):
+    execute_hierarchy_state(caplog, {'EXECUTION_SEQUENTIAL_CHILDREN_INLINE': True})
+
+
+def test_thread_pool_child_execution(caplog):
+    execute_hierarchy_state(caplog, {'EXECUTION_THREAD_POOL_SIZE': 2})
+    # the pool is configured by the execution engine and only read by the container states
+    assert rafcon.core.singleton.state_thread_pool.max_idle_workers == 2
+
+
+def test_thread_pool_reuses_workers():
+    pool = ThreadPool(max_idle_workers=1, name="TestPool")
+    thread_names = []
+
+    def store_thread_name():
+        thread_names.append(threading.current_thread().name)
+
+    for _ in range(3):
+        pool.submit(store_thread_name).join()
+        # the worker releases itself after the task signaled its end
+        while pool.number_of_idle_workers == 0:
+            time.sleep(0.01)
+    assert len(set(thread_names)) == 1
+
+    # blocking tasks must not block further tasks
+    event = threading.Event()
+    blocking_task = pool.submit(event.wait)
+    pool.submit(store_thread_name).join()
+    assert blocking_task.is_alive()
+    event.set()
+    blocking_task.join()
+    assert not blocking_task.is_alive()
+    pool.shutdown()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -51,6 +51,13 @@ def test_execution_log(caplog):
         start_item = collapsed_items[start_id]
         assert 'Starts the factory' in start_item['description']
 
+        # without data, the collapsed items only reference their call and return items
+        lazy_start, lazy_next, lazy_concurrent, lazy_hierarchy, lazy_items = \
+            log_helper.log_to_collapsed_structure(ss, load_data=False)
+        assert (lazy_next, lazy_concurrent, lazy_hierarchy) == (next, concurrent, hierarchy)
+        assert 'data_outs' not in lazy_items[prod2_id]
+        assert log_helper.load_collapsed_item_data(ss, lazy_items[prod2_id]) == prod2
+
         df = log_helper.log_to_DataFrame(ss)
         all_starts = df.groupby('state_name').get_group('Start')
         assert len(all_starts) == 3
@@ -60,5 +67,177 @@ def test_execution_log(caplog):
     finally:
         testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=0, expected_errors=0)
 
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_execution_log_storage(caplog, asynchronous):
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.execution.execution_history import ExecutionHistory, ExecutionHistoryStorage, CallType
+    import shelve
+    import pickle
+
+    testing_utils.initialize_environment_core()
+    shelve_name = os.path.join(testing_utils.get_unique_temp_path(), "test_execution_log_storage.shelve")
+    execution_history_storage = ExecutionHistoryStorage(shelve_name, asynchronous=asynchronous)
+    try:
+        assert execution_history_storage.asynchronous is asynchronous
+        execution_history = ExecutionHistory()
+        execution_history.set_execution_history_storage(execution_history_storage)
+        state = ExecutionState("state")
+        state.generate_run_id()
+        history_items = []
+        for _ in range(50):
+            history_items.append(execution_history.push_call_history_item(state, CallType.EXECUTE, None, {}))
+            history_items.append(execution_history.push_return_history_item(state, CallType.EXECUTE, None, {}))
+
+        # the records are readable while the storage is used
+        record = execution_history_storage.get_item(history_items[-1].history_item_id)
+        assert record['item_type'] == 'ReturnItem'
+        assert record['prev_history_item_id'] == history_items[-2].history_item_id
+
+        # the record holds the data at the time the history item was pushed, also for data passed per reference
+        data_port_id = state.add_input_data_port("data", "list", [])
+        state.input_data_ports[data_port_id].pass_by_reference = True
+        data = [1]
+        call_item = execution_history.push_call_history_item(state, CallType.EXECUTE, None, {"data": data})
+        data.append(2)
+        record = execution_history_storage.get_item(call_item.history_item_id)
+        assert pickle.loads(record['input_output_data']['data']) == [1]
+
+        execution_history_storage.wait_for_queued_items()
+        assert execution_history_storage.queue_depth == 0
+        assert pickle.loads(execution_history_storage.get_item(call_item.history_item_id)
+                            ['input_output_data']['data']) == [1]
+        assert execution_history_storage.number_of_dropped_items == 0
+    finally:
+        execution_history_storage.close()
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+    ss = shelve.open(shelve_name)
+    assert len(ss) == 101
+    ss.close()
+
+
+def test_state_machine_start_definition(caplog):
+    from rafcon.core.state_machine import StateMachine
+    from rafcon.core.states.hierarchy_state import HierarchyState
+    from rafcon.core.execution.execution_history import ExecutionHistory, ExecutionHistoryStorage
+    from rafcon.core.id_generator import run_id_generator
+
+    testing_utils.initialize_environment_core()
+    log_path = testing_utils.get_unique_temp_path()
+    try:
+        state_machine = StateMachine(HierarchyState("root"))
+        log_filenames = []
+        start_items = []
+        for index in range(3):
+            log_filenames.append(os.path.join(log_path, "start_{0}.shelve".format(index)))
+            execution_history_storage = ExecutionHistoryStorage(log_filenames[-1], asynchronous=False)
+            execution_history = ExecutionHistory()
+            execution_history.set_execution_history_storage(execution_history_storage)
+            start_items.append(execution_history.push_state_machine_start_history_item(state_machine,
+                                                                                       run_id_generator()))
+            execution_history_storage.close()
+
+        # the starts of the same state machine share the definition, which is stored only once
+        assert len(set(start_item.definition_hash for start_item in start_items)) == 1
+        assert all(start_item.definition is start_items[0].definition for start_item in start_items)
+        assert len(os.listdir(os.path.join(log_path, log_helper.START_DEFINITIONS_FOLDER))) == 1
+
+        # a new storage stores the definition again, if it was deleted along with the former logs
+        import shutil
+        shutil.rmtree(os.path.join(log_path, log_helper.START_DEFINITIONS_FOLDER))
+        execution_history_storage = ExecutionHistoryStorage(os.path.join(log_path, "start_3.shelve"),
+                                                            asynchronous=False)
+        execution_history = ExecutionHistory()
+        execution_history.set_execution_history_storage(execution_history_storage)
+        execution_history.push_state_machine_start_history_item(state_machine, run_id_generator())
+        execution_history_storage.close()
+        assert os.path.isfile(log_helper.get_start_definition_path(log_filenames[-1], start_items[0].definition_hash))
+
+        # the queued record of a start item references the definition before the writer thread stored it
+        execution_history_storage = ExecutionHistoryStorage(os.path.join(log_path, "start_4.shelve"),
+                                                            asynchronous=True)
+        execution_history = ExecutionHistory()
+        execution_history.set_execution_history_storage(execution_history_storage)
+        start_item = execution_history.push_state_machine_start_history_item(state_machine, run_id_generator())
+        record = execution_history_storage.get_item(start_item.history_item_id)
+        execution_history_storage.wait_for_queued_items()
+        assert record == execution_history_storage.get_item(start_item.history_item_id)
+        assert record['definition_path'] == log_helper.get_start_definition_path(log_filenames[-1],
+                                                                                 start_item.definition_hash)
+        execution_history_storage.close()
+
+        # the readers resolve the definition
+        start_item = log_helper.log_to_raw_structure(log_filenames[-1])[0]
+        assert start_item['os_environment'] == dict(os.environ)
+        assert start_item['root_state_storage_id'] == start_items[-1].sm_dict['root_state_storage_id']
+
+        # a modified state machine has a new definition
+        state_machine.root_state.name = "modified root"
+        execution_history = ExecutionHistory()
+        assert execution_history.push_state_machine_start_history_item(
+            state_machine, run_id_generator()).definition_hash != start_items[0].definition_hash
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_stream_execution_log(caplog):
+    from rafcon.utils.execution_log_stream import ExecutionLogStreamReader, convert_shelve_log
+    log_path = testing_utils.get_unique_temp_path() + '/test_execution_log'
+    try:
+        testing_utils.initialize_environment_core(
+            core_config={'EXECUTION_LOG_ENABLE': True,
+                         'EXECUTION_LOG_PATH': log_path,
+                         'EXECUTION_LOG_FORMAT': 'stream'})
+
+        state_machine = global_storage.load_state_machine_from_path(
+            testing_utils.get_test_sm_path(os.path.join("unit_test_state_machines",
+                                                        "execution_file_log_test")))
+
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = state_machine.state_machine_id
+        rafcon.core.singleton.state_machine_execution_engine.start()
+        rafcon.core.singleton.state_machine_execution_engine.join()
+        # the execution histories lose their storage, when the state machine is removed
+        stream_log_filename = state_machine.get_last_execution_log_filename()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+
+        stream_log = log_helper.open_execution_log(stream_log_filename)
+        try:
+            assert isinstance(stream_log, ExecutionLogStreamReader)
+            assert len(stream_log) == 36
+
+            # the log functions accept the opened log as well as the path of the log
+            for execution_history_items in [stream_log, stream_log_filename]:
+                start, next, concurrent, hierarchy, collapsed_items = \
+                    log_helper.log_to_collapsed_structure(execution_history_items)
+                prod2_id = [k for k, v in collapsed_items.items() if v['state_name'] == 'MakeProd2'][0]
+                assert collapsed_items[prod2_id]['data_outs']['output_1'] == 3
+        finally:
+            stream_log.close()
+
+        # the converted shelve log holds the same records
+        from rafcon.core.config import global_config
+        global_config.set_config_value('EXECUTION_LOG_FORMAT', 'shelve')
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = state_machine.state_machine_id
+        rafcon.core.singleton.state_machine_execution_engine.start()
+        rafcon.core.singleton.state_machine_execution_engine.join()
+        shelve_log_filename = state_machine.get_last_execution_log_filename()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+
+        import shelve
+        shelve_log = shelve.open(shelve_log_filename)
+        converted_log = ExecutionLogStreamReader(convert_shelve_log(shelve_log_filename))
+        try:
+            assert sorted(converted_log.keys()) == sorted(shelve_log.keys())
+            assert converted_log.values()[0]['item_type'] == 'StateMachineStartItem'
+        finally:
+            converted_log.close()
+            shelve_log.close()
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=0, expected_errors=0)
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
@@ -0,0 +1,116 @@
+import os
+import pytest
+
+# core elements
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.execution.execution_history import ExecutionHistory, ExecutionHistoryStorage, \
+    StateMachineStartItem, CallItem, ReturnItem, CallType
+
+# singleton elements
+import rafcon.core.singleton
+
+# test environment elements
+import testing_utils
+
+NUMBER_OF_LOOPS = 50
+MAX_ITEMS = 20
+
+LOOP_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    counter = gvm.get_variable("history_retention_counter") + 1
+    gvm.set_variable("history_retention_counter", counter)
+    return "success" if counter >= {0} else "loop"
+""".format(NUMBER_OF_LOOPS)
+
+
+def create_loop_state_machine():
+    loop_state = ExecutionState("loop_state")
+    loop_state.script_text = LOOP_SCRIPT
+    loop_outcome_id = loop_state.add_outcome("loop")
+    root_state = HierarchyState("root_state")
+    root_state.add_state(loop_state)
+    root_state.set_start_state(loop_state.state_id)
+    root_state.add_transition(loop_state.state_id, loop_outcome_id, loop_state.state_id, None)
+    root_state.add_transition(loop_state.state_id, 0, root_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+def test_bounded_execution_history(caplog):
+    testing_utils.initialize_environment_core(core_config={'EXECUTION_HISTORY_MAX_ITEMS': MAX_ITEMS})
+    state_machine = create_loop_state_machine()
+    rafcon.core.singleton.global_variable_manager.set_variable("history_retention_counter", 0)
+    rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+    rafcon.core.singleton.state_machine_manager.active_state_machine_id = state_machine.state_machine_id
+    try:
+        rafcon.core.singleton.state_machine_execution_engine.start()
+        rafcon.core.singleton.state_machine_execution_engine.join()
+        assert rafcon.core.singleton.global_variable_manager.get_variable("history_retention_counter") == \
+            NUMBER_OF_LOOPS
+
+        execution_history = state_machine.execution_histories[-1]
+        # start item, call and return of the root state and one call and return item per loop
+        number_of_history_items = 3 + 2 * NUMBER_OF_LOOPS
+        assert len(execution_history) + execution_history.number_of_evicted_items == number_of_history_items
+        # the start item and the call item of the root state are pinned, the evictions shrink the remaining items
+        # to 90 % of MAX_ITEMS and the pushes after the last eviction add the rest
+        assert len(execution_history) == 21
+        assert execution_history.number_of_evicted_items == number_of_history_items - 21 == 82
+        assert len(execution_history) <= MAX_ITEMS + 2
+        assert isinstance(execution_history[0], StateMachineStartItem)
+        root_call_item = execution_history[1]
+        assert isinstance(root_call_item, CallItem) and root_call_item.call_type is CallType.CONTAINER
+        root_return_item = execution_history[-1]
+        assert isinstance(root_return_item, ReturnItem) and root_return_item.call_item is root_call_item
+
+        # the retained items form a consistent list
+        for prev_item, history_item in zip(execution_history, execution_history[1:]):
+            assert history_item.prev is prev_item
+            assert prev_item.next is history_item
+        for history_item in execution_history:
+            if isinstance(history_item, ReturnItem):
+                assert history_item.call_item in execution_history
+    finally:
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_evicted_history_item_records(caplog):
+    testing_utils.initialize_environment_core()
+    execution_history_storage = ExecutionHistoryStorage(
+        os.path.join(testing_utils.get_unique_temp_path(), "test_history_retention.shelve"))
+    try:
+        execution_history = ExecutionHistory(max_items=10)
+        execution_history.set_execution_history_storage(execution_history_storage)
+        state = ExecutionState("state")
+        state.generate_run_id()
+        history_item_ids = []
+        for _ in range(20):
+            history_item_ids.append(execution_history.push_call_history_item(state, CallType.EXECUTE, None,
+                                                                            {}).history_item_id)
+            history_item_ids.append(execution_history.push_return_history_item(state, CallType.EXECUTE, None,
+                                                                              {}).history_item_id)
+
+        assert len(execution_history) <= 11
+        retained_item_ids = [history_item.history_item_id for history_item in execution_history]
+        assert retained_item_ids == history_item_ids[-len(execution_history):]
+
+        records = execution_history.get_evicted_history_item_records()
+        assert [record['history_item_id'] for record in records] == \
+            history_item_ids[:execution_history.number_of_evicted_items]
+        records = execution_history.get_evicted_history_item_records(number=3, offset=2)
+        assert [record['history_item_id'] for record in records] == \
+            history_item_ids[execution_history.number_of_evicted_items - 5:execution_history.number_of_evicted_items - 2]
+
+        # backward stepping within the retained window
+        last_item = execution_history.pop_last_item()
+        assert isinstance(last_item, ReturnItem)
+        assert execution_history.pop_last_item() is last_item.call_item
+    finally:
+        execution_history_storage.close()
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
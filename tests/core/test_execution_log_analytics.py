@@ -0,0 +1,91 @@
+import os
+import pytest
+
+# singleton elements
+import rafcon.core.singleton
+from rafcon.core.storage import storage as global_storage
+
+# test environment elements
+import testing_utils
+
+
+def test_execution_log_analytics(caplog):
+    np = pytest.importorskip("numpy")
+    import rafcon.utils.execution_log_analytics as analytics
+
+    try:
+        testing_utils.initialize_environment_core(
+            core_config={'EXECUTION_LOG_ENABLE': True,
+                         'EXECUTION_LOG_PATH': testing_utils.get_unique_temp_path()+'/test_execution_log'})
+
+        state_machine = global_storage.load_state_machine_from_path(
+            testing_utils.get_test_sm_path(os.path.join("unit_test_state_machines",
+                                                        "execution_file_log_test")))
+
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = state_machine.state_machine_id
+        rafcon.core.singleton.state_machine_execution_engine.start()
+        rafcon.core.singleton.state_machine_execution_engine.join()
+        # the execution histories lose their storage, when the state machine is removed
+        log_filename = state_machine.get_last_execution_log_filename()
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+
+        # the log is opened from its path and closed again after the analysis
+        columns = analytics.log_to_columns(log_filename)
+        start_state_executions = columns['state_name'] == 'Start'
+        assert np.count_nonzero(start_state_executions) == 3
+
+        statistics = analytics.duration_statistics(columns, group_by='state_name')
+        start_durations = columns['duration'][start_state_executions]
+        assert statistics['Start']['count'] == 3
+        assert np.isclose(statistics['Start']['mean'], start_durations.mean())
+        assert np.isclose(statistics['Start']['p95'], np.percentile(start_durations, 95))
+        assert np.isclose(statistics['Start']['max'], start_durations.max())
+
+        outcomes = analytics.outcome_frequencies(columns, group_by='state_name')
+        assert outcomes['Start'] == {'success': 2, 'done': 1}
+
+        concurrency = analytics.concurrency_overlap(columns)
+        assert concurrency['max_concurrency'] >= 1
+        assert sum(concurrency['time_per_level'].values()) > 0
+
+        summary = analytics.summarize(log_filename, group_by='state_name')
+        assert 'Start' in analytics.format_summary(summary)
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog, expected_warnings=0, expected_errors=0)
+
+
+
+def test_execution_log_analytics_with_non_ascii_names():
+    np = pytest.importorskip("numpy")
+    import rafcon.utils.execution_log_analytics as analytics
+
+    # the names of states loaded from JSON are unicode strings
+    state_names = [u"Zust\xe4nd", u"Zust\xe4nd", "State"]
+    columns = {}
+    for key, values in [('run_id', ["run_0", "run_1", "run_2"]),
+                        ('state_name', state_names),
+                        ('state_type', ["ExecutionState"] * 3),
+                        ('path', ["ROOT/A", "ROOT/A", "ROOT/B"]),
+                        ('path_by_name', [u"root/" + state_name for state_name in state_names]),
+                        ('outcome_name', [u"\xfcberlauf", "success", "success"])]:
+        columns[key] = np.empty(len(values), dtype=object)
+        columns[key][:] = values
+    columns['timestamp_call'] = np.array([0., 1., 2.])
+    columns['timestamp_return'] = np.array([1., 3., 3.])
+    columns['duration'] = columns['timestamp_return'] - columns['timestamp_call']
+
+    statistics = analytics.duration_statistics(columns, group_by='state_name')
+    assert statistics[u"Zust\xe4nd"]['count'] == 2
+    assert np.isclose(statistics[u"Zust\xe4nd"]['total'], 3.)
+    assert analytics.total_time_per_path(columns)[u"root/Zust\xe4nd"] == 3.
+    assert analytics.outcome_frequencies(columns, group_by='state_name')[u"Zust\xe4nd"] == \
+        {u"\xfcberlauf": 1, "success": 1}
+    summary = {'durations': statistics,
+               'outcomes': analytics.outcome_frequencies(columns, group_by='state_name'),
+               'concurrency': analytics.concurrency_overlap(columns)}
+    assert u"Zust\xe4nd" in analytics.format_summary(summary)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
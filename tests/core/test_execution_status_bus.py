@@ -0,0 +1,57 @@
+import threading
+import pytest
+
+# core elements
+from rafcon.core.execution.execution_status_bus import execution_status_bus
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.state import StateExecutionStatus
+
+
+def set_execution_status(states, repetitions):
+    for _ in range(repetitions):
+        for state in states:
+            state.state_execution_status = StateExecutionStatus.ACTIVE
+            state.state_execution_status = StateExecutionStatus.WAIT_FOR_NEXT_STATE
+
+
+def test_coalesced_execution_status_changes(monkeypatch):
+    states = [ExecutionState("state_{0}".format(index)) for index in range(3)]
+    notified_states = []
+
+    def notify_method_after(state, instance, name, res_val, args, kwargs):
+        if name == "state_execution_status":
+            notified_states.append((instance, instance.state_execution_status))
+    monkeypatch.setattr(ExecutionState, "_notify_method_after", notify_method_after)
+
+    # without subscriber, each change is notified synchronously
+    set_execution_status(states[:1], 1)
+    assert len(notified_states) == 2
+    assert not execution_status_bus.drain()
+
+    execution_status_bus.subscribe()
+    try:
+        del notified_states[:]
+        threads = [threading.Thread(target=set_execution_status, args=(states, 100)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not notified_states
+
+        # the subscriber is notified once per state about its latest status
+        assert execution_status_bus.notify_changes() == len(states)
+        assert len(notified_states) == len(states)
+        assert {id(state): status for state, status in notified_states} == \
+            {id(state): StateExecutionStatus.WAIT_FOR_NEXT_STATE for state in states}
+        assert execution_status_bus.notify_changes() == 0
+
+        states[0].state_execution_status = StateExecutionStatus.INACTIVE
+    finally:
+        execution_status_bus.unsubscribe()
+    # changes queued before the last subscriber is gone are not lost
+    assert notified_states[-1] == (states[0], StateExecutionStatus.INACTIVE)
+    assert not execution_status_bus.active
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
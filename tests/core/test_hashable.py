@@ -1,6 +1,7 @@
 import hashlib
 
 from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
 from rafcon.utils.hashable import Hashable
 
 
@@ -71,3 +72,37 @@ def test_state_hash():
     Hashable.update_hash_from_dict(hash2, state2)
 
     assert hash1.hexdigest() == hash2.hexdigest()
+
+
+def test_cached_state_hash():
+    root_state = HierarchyState('root', state_id="ROOT")
+    child_state = HierarchyState('child', state_id="CHILD")
+    grandchild_state = ExecutionState('grandchild', state_id="GRANDCHILD")
+    sibling_state = ExecutionState('sibling', state_id="SIBLING")
+    child_state.add_state(grandchild_state)
+    root_state.add_state(child_state)
+    root_state.add_state(sibling_state)
+
+    original_digest = root_state.mutable_hash().digest()
+    assert root_state.mutable_hash().digest() == original_digest
+
+    # a modification only invalidates the digests of the modified state and its ancestors
+    grandchild_state.name = 'renamed'
+    assert grandchild_state._hash_digest is None
+    assert child_state._hash_digest is None
+    assert root_state._hash_digest is None
+    assert sibling_state._hash_digest is not None
+    assert root_state.mutable_hash().digest() != original_digest
+
+    grandchild_state.name = 'grandchild'
+    assert root_state.mutable_hash().digest() == original_digest
+
+    # modifications of state elements and scripts are considered
+    grandchild_state.add_outcome("new_outcome", outcome_id=5)
+    assert root_state._hash_digest is None
+    outcome_digest = root_state.mutable_hash().digest()
+    grandchild_state.outcomes[5].name = "renamed_outcome"
+    assert root_state.mutable_hash().digest() != outcome_digest
+    script_digest = root_state.mutable_hash().digest()
+    grandchild_state.script_text += "\n# changed\n"
+    assert root_state.mutable_hash().digest() != script_digest
@@ -0,0 +1,85 @@
+import os
+import pytest
+
+# core elements
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.states.state import State
+from rafcon.core.storage import storage
+from rafcon.utils import storage_utils
+
+# test environment elements
+import testing_utils
+
+
+def create_state_machine():
+    root_state = HierarchyState("root", state_id="ROOT")
+    for index in range(3):
+        root_state.add_state(ExecutionState("state_{0}".format(index), state_id="STATE{0}".format(index)))
+    return StateMachine(root_state)
+
+
+def test_incremental_saving(caplog, monkeypatch):
+    testing_utils.initialize_environment_core()
+    base_path = testing_utils.get_unique_temp_path()
+    try:
+        state_machine = create_state_machine()
+        storage.save_state_machine_to_path(state_machine, base_path, as_copy=True)
+
+        written_files = []
+        original_write_file_if_changed = storage.write_file_if_changed
+
+        def write_file_if_changed(file_path, content):
+            written = original_write_file_if_changed(file_path, content)
+            if written:
+                written_files.append(os.path.relpath(file_path, base_path))
+            return written
+        monkeypatch.setattr(storage, "write_file_if_changed", write_file_if_changed)
+
+        # apart from the state machine file with the update time only the files of the changed state are written
+        root_state = state_machine.root_state
+        changed_state = root_state.states["STATE1"]
+        changed_state.script_text += "\n# changed\n"
+        removed_state_path = os.path.join(base_path, root_state.states["STATE2"].get_storage_path())
+        root_state.remove_state("STATE2")
+        storage.save_state_machine_to_path(state_machine, base_path, as_copy=True)
+        changed_state_path = changed_state.get_storage_path()
+        assert [file_path for file_path in written_files if file_path != storage.STATEMACHINE_FILE] == \
+            [os.path.join(changed_state_path, storage.SCRIPT_FILE)]
+        assert not os.path.exists(removed_state_path)
+
+        # externally modified files are written again
+        core_data_path = os.path.join(base_path, changed_state_path, storage.FILE_NAME_CORE_DATA)
+        with open(core_data_path, 'w') as core_data_file:
+            core_data_file.write("{}")
+        del written_files[:]
+        storage.save_state_machine_to_path(state_machine, base_path, as_copy=True)
+        assert os.path.join(changed_state_path, storage.FILE_NAME_CORE_DATA) in written_files
+
+        # externally deleted files of unchanged states are written again
+        script_path = os.path.join(root_state.states["STATE0"].get_storage_path(), storage.SCRIPT_FILE)
+        os.remove(os.path.join(base_path, script_path))
+        del written_files[:]
+        storage.save_state_machine_to_path(state_machine, base_path, as_copy=True)
+        assert [file_path for file_path in written_files if file_path != storage.STATEMACHINE_FILE] == [script_path]
+
+        # the states of unchanged sub-trees are not even serialized
+        serialized_objects = []
+        original_dict_to_json_string = storage_utils.dict_to_json_string
+
+        def dict_to_json_string(dictionary, *args, **kwargs):
+            serialized_objects.append(dictionary)
+            return original_dict_to_json_string(dictionary, *args, **kwargs)
+        monkeypatch.setattr(storage_utils, "dict_to_json_string", dict_to_json_string)
+        storage.save_state_machine_to_path(state_machine, base_path, as_copy=True)
+        assert not any(isinstance(serialized_object, State) for serialized_object in serialized_objects)
+        monkeypatch.undo()
+
+        assert storage.load_state_machine_from_path(base_path).root_state == root_state
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,38 @@
+import json
+import pytest
+
+# core elements
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.utils import json_codec
+from rafcon.utils.storage_utils import substitute_modules
+
+
+def create_state():
+    state = ExecutionState("state", state_id="STATE")
+    state.add_input_data_port("tuple_port", "tuple", (1, 2.5), data_port_id=1)
+    state.add_output_data_port("float_port", "float", 0.1, data_port_id=2)
+    return state
+
+
+@pytest.mark.parametrize("backend", ["json", None])
+def test_compact_format(backend):
+    json_codec.set_backend(backend)
+    try:
+        state = create_state()
+        readable_string = json_codec.dumps(state)
+        compact_string = json_codec.dumps(state, compact=True)
+        assert len(compact_string) < len(readable_string)
+        assert "\n" not in compact_string
+        # both formats contain the same data
+        assert json.loads(compact_string) == json.loads(readable_string)
+
+        for json_string in (readable_string, compact_string):
+            decoded_state = json_codec.loads(json_string, substitute_modules)
+            assert decoded_state == state
+            assert decoded_state.input_data_ports[1].default_value == (1, 2.5)
+    finally:
+        json_codec.set_backend()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
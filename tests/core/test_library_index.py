@@ -0,0 +1,90 @@
+import os
+import time
+import pytest
+
+# core elements
+from rafcon.core.library_index import LibraryIndex
+from rafcon.core.storage import storage
+
+# singleton elements
+import rafcon.core.singleton
+
+# test environment elements
+import testing_utils
+
+
+def create_library(path):
+    os.makedirs(path)
+    with open(os.path.join(path, storage.STATEMACHINE_FILE), 'w') as state_machine_file:
+        state_machine_file.write("{}")
+
+
+def set_modification_times_to_past(root_path):
+    past = time.time() - 100
+    for dir_path, _, _ in os.walk(root_path):
+        os.utime(dir_path, (past, past))
+
+
+def test_library_index(monkeypatch):
+    root_path = testing_utils.get_unique_temp_path()
+    create_library(os.path.join(root_path, "library_a"))
+    create_library(os.path.join(root_path, "folder", "library_b"))
+    os.makedirs(os.path.join(root_path, ".hidden"))
+    set_modification_times_to_past(root_path)
+    index_filename = os.path.join(testing_utils.get_unique_temp_path(), "library_index.json")
+
+    library_index = LibraryIndex(index_filename)
+    library_index.start_validation()
+    assert library_index.get_sub_directories(root_path) == ["folder", "library_a"]
+    assert library_index.is_library(os.path.join(root_path, "library_a"))
+    assert not library_index.is_library(os.path.join(root_path, "folder"))
+    assert library_index.get_sub_directories(os.path.join(root_path, "folder")) == ["library_b"]
+    library_index.finish_validation([root_path])
+    assert os.path.isfile(index_filename)
+
+    # unchanged directories are validated from the persistent index without listing them
+    listed_directories = []
+    original_listdir = os.listdir
+
+    def listdir(path):
+        listed_directories.append(path)
+        return original_listdir(path)
+    monkeypatch.setattr(os, "listdir", listdir)
+
+    library_index = LibraryIndex(index_filename)
+    library_index.start_validation()
+    assert library_index.get_sub_directories(root_path) == ["folder", "library_a"]
+    assert library_index.get_sub_directories(os.path.join(root_path, "folder")) == ["library_b"]
+    assert library_index.is_library(os.path.join(root_path, "folder", "library_b"))
+    library_index.finish_validation([root_path])
+    assert listed_directories == []
+    assert not library_index.modified
+
+    # only the changed directory is scanned again
+    create_library(os.path.join(root_path, "folder", "library_c"))
+    library_index.start_validation()
+    assert library_index.get_sub_directories(os.path.join(root_path, "folder")) == ["library_b", "library_c"]
+    assert library_index.get_sub_directories(root_path) == ["folder", "library_a"]
+    library_index.finish_validation([root_path])
+    assert listed_directories == [os.path.join(root_path, "folder")]
+
+
+def test_update_libraries(caplog):
+    root_path = testing_utils.get_unique_temp_path()
+    create_library(os.path.join(root_path, "library_a"))
+    testing_utils.initialize_environment_core(libraries={"index_test_libraries": root_path})
+    try:
+        library_manager = rafcon.core.singleton.library_manager
+        assert library_manager.libraries["index_test_libraries"].keys() == ["library_a"]
+        assert not library_manager.update_libraries()
+
+        create_library(os.path.join(root_path, "folder", "library_b"))
+        assert library_manager.update_libraries()
+        assert library_manager.libraries["index_test_libraries"]["folder"]["library_b"] == \
+            os.path.join(root_path, "folder", "library_b")
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
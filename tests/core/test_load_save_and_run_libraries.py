@@ -189,6 +189,40 @@ def test_nested_library_state_machine(caplog):
         testing_utils.test_multithreading_lock.release()
 
 
+def test_lazy_library_state_copy(caplog):
+    testing_utils.test_multithreading_lock.acquire()
+    try:
+        rafcon.core.singleton.library_manager.initialize()
+        library_container_state_sm = create_hierarchy_state_library_state_machine()
+        lib_state = library_container_state_sm.root_state.states["library_hierarchy_state"]
+        second_lib_state = LibraryState("temporary_libraries", "hierarchy_library", "0.1",
+                                        "second_library_hierarchy_state")
+
+        # the state copies are only created on demand and the library states share the library template
+        assert not lib_state.state_copy_materialized and not second_lib_state.state_copy_materialized
+        assert lib_state._library_template is second_lib_state._library_template
+        assert lib_state.get_states_statistics(0) == second_lib_state.get_states_statistics(0)
+        assert lib_state.input_data_ports is not second_lib_state.input_data_ports
+        assert not lib_state.state_copy_materialized
+
+        rafcon.core.singleton.state_machine_manager.add_state_machine(library_container_state_sm)
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = \
+            library_container_state_sm.state_machine_id
+        rafcon.core.singleton.state_machine_execution_engine.start()
+        rafcon.core.singleton.state_machine_execution_engine.join()
+
+        assert library_container_state_sm.root_state.output_data["data_output_port1"] == 42.0
+        assert lib_state.state_copy_materialized and not second_lib_state.state_copy_materialized
+        state_copy = lib_state.state_copy
+        assert state_copy is not lib_state._library_template
+        assert state_copy.parent is lib_state
+        assert state_copy.input_data_ports is lib_state.input_data_ports
+        rafcon.core.singleton.state_machine_manager.remove_state_machine(library_container_state_sm.state_machine_id)
+        testing_utils.assert_logger_warnings_and_errors(caplog)
+    finally:
+        testing_utils.test_multithreading_lock.release()
+
+
 def test_rafcon_library_path_variable(caplog):
     rafcon.core.config.global_config.set_config_value("LIBRARY_PATHS", {})
     os.environ['RAFCON_LIBRARY_PATH'] = os.path.join(testing_utils.LIBRARY_SM_PATH, 'generic')
@@ -210,4 +244,5 @@ if __name__ == '__main__':
     # test_hierarchy_state_library(None)
     # test_save_nested_library_state(None)
     # test_nested_library_state_machine(None)
+    # test_lazy_library_state_copy(None)
     pytest.main(['-s', __file__])
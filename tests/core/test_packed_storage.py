@@ -0,0 +1,64 @@
+import os
+import pytest
+
+# core elements
+from rafcon.core.storage import storage
+from rafcon.utils import storage_utils
+from rafcon.core.storage.packed_storage import PACKED_STATE_MACHINE_EXTENSION, is_packed_state_machine, \
+    pack_state_machine, unpack_state_machine
+
+# test environment elements
+import testing_utils
+
+
+def test_packed_state_machine(caplog):
+    testing_utils.initialize_environment_core()
+    state_machine_path = testing_utils.get_test_sm_path(os.path.join("unit_test_state_machines",
+                                                                     "backward_step_barrier_test"))
+    temp_path = testing_utils.get_unique_temp_path()
+    try:
+        state_machine = storage.load_state_machine_from_path(state_machine_path)
+
+        # save as packed file and load it again
+        packed_path = os.path.join(temp_path, "backward_step_barrier_test" + PACKED_STATE_MACHINE_EXTENSION)
+        storage.save_state_machine_to_path(state_machine, packed_path)
+        assert is_packed_state_machine(packed_path)
+        assert state_machine.file_system_path == packed_path
+        packed_state_machine = storage.load_state_machine_from_path(packed_path)
+        assert packed_state_machine.root_state == state_machine.root_state
+        assert packed_state_machine.file_system_path == packed_path
+
+        # load a single sub-state from the packed file
+        child_state = packed_state_machine.root_state.states.values()[0]
+        assert child_state.file_system_path.startswith(packed_path + os.sep)
+        assert storage.load_state_from_path(child_state.file_system_path) == child_state
+
+        # convert in both directions
+        unpacked_path = os.path.join(temp_path, "unpacked")
+        unpack_state_machine(packed_path, unpacked_path)
+        assert storage.load_state_machine_from_path(unpacked_path).root_state == state_machine.root_state
+        repacked_path = os.path.join(temp_path, "repacked" + PACKED_STATE_MACHINE_EXTENSION)
+        pack_state_machine(unpacked_path, repacked_path)
+        assert storage.load_state_machine_from_path(repacked_path).root_state == state_machine.root_state
+
+        # meta data stored before packing is read through the virtual paths of the packed state machine
+        meta_data = {'gui': {'editor_opengl': {'size': [100., 50.]}}}
+
+        def store_meta_data(state_machine_path):
+            for path in [state_machine_path,
+                         os.path.join(state_machine_path, state_machine.root_state.get_storage_path())]:
+                storage_utils.write_dict_to_json(meta_data, os.path.join(path, storage.FILE_NAME_META_DATA))
+        meta_data_path = os.path.join(temp_path, "meta_data" + PACKED_STATE_MACHINE_EXTENSION)
+        storage.save_packed_state_machine_to_path(state_machine, meta_data_path, as_copy=True,
+                                                  store_meta_data=store_meta_data)
+        packed_state_machine = storage.load_state_machine_from_path(meta_data_path)
+        assert storage.load_data_file(os.path.join(packed_state_machine.file_system_path,
+                                                   storage.FILE_NAME_META_DATA)) == meta_data
+        assert storage.load_data_file(os.path.join(packed_state_machine.root_state.file_system_path,
+                                                   storage.FILE_NAME_META_DATA)) == meta_data
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
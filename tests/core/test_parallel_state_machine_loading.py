@@ -0,0 +1,41 @@
+import os
+import pytest
+
+# core elements
+from rafcon.core.config import global_config
+from rafcon.core.storage import storage
+
+# test environment elements
+import testing_utils
+
+
+def test_parallel_state_machine_loading(caplog, monkeypatch):
+    testing_utils.initialize_environment_core()
+    state_machine_path = testing_utils.get_test_sm_path(os.path.join("unit_test_state_machines",
+                                                                     "backward_step_barrier_test"))
+    # also read the small levels of the test state machine by the pool of threads
+    monkeypatch.setattr(storage, "MIN_STATE_DIRECTORIES_FOR_CONCURRENT_READING", 1)
+    try:
+        global_config.set_config_value("STORAGE_LOAD_THREADS", 0)
+        sequentially_loaded_sm = storage.load_state_machine_from_path(state_machine_path)
+        global_config.set_config_value("STORAGE_LOAD_THREADS", 4)
+        parallel_loaded_sm = storage.load_state_machine_from_path(state_machine_path)
+
+        root_state = parallel_loaded_sm.root_state
+        assert root_state == sequentially_loaded_sm.root_state
+        assert root_state.get_states_statistics(0) == sequentially_loaded_sm.root_state.get_states_statistics(0)
+        assert not parallel_loaded_sm.marked_dirty
+
+        state_directories = storage.read_state_directories(root_state.file_system_path, 4)
+        number_of_states, _ = root_state.get_states_statistics(0)
+        assert len(state_directories) == number_of_states
+        assert all(state_directory.core_data is not None for state_directory in state_directories.itervalues())
+
+        # all loads share one pool of threads
+        assert storage.get_read_thread_pool(4) is storage.get_read_thread_pool(4)
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
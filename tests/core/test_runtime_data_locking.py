@@ -0,0 +1,61 @@
+import threading
+import pytest
+
+# core elements
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.states.state import StateExecutionStatus
+
+# test environment elements
+import testing_utils
+
+
+def create_state_machine():
+    root_state = HierarchyState("root", state_id="ROOT")
+    child_state = ExecutionState("child", state_id="CHILD")
+    child_state.add_output_data_port("out", "int", 0, data_port_id=1)
+    root_state.add_state(child_state)
+    root_state.add_scoped_variable("scoped", "int", 0, scoped_variable_id=2)
+    root_state.add_data_flow("CHILD", 1, "ROOT", 2)
+    return StateMachine(root_state)
+
+
+def write_runtime_data(root_state):
+    child_state = root_state.states["CHILD"]
+    child_state.input_data = {}
+    child_state.output_data = {"out": 5}
+    child_state.final_outcome = child_state.outcomes[0]
+    child_state.state_execution_status = StateExecutionStatus.ACTIVE
+    child_state.preempted = False
+    root_state.add_state_execution_output_to_scoped_data({"out": 5}, child_state)
+    root_state.update_scoped_variables_with_output_dictionary({"out": 5}, child_state)
+
+
+def test_runtime_data_without_state_machine_lock(caplog):
+    testing_utils.initialize_environment_core()
+    try:
+        state_machine = create_state_machine()
+        root_state = state_machine.root_state
+        # the routing tables are built under the lock of the state machine, but only once
+        root_state.get_data_flow_routing()
+
+        # another thread modifying the state machine does not block the writing of runtime data
+        state_machine.acquire_modification_lock()
+        try:
+            writer = threading.Thread(target=write_runtime_data, args=(root_state, ))
+            writer.daemon = True
+            writer.start()
+            writer.join(5.)
+            assert not writer.is_alive()
+        finally:
+            state_machine.release_modification_lock()
+
+        assert root_state.scoped_data["1CHILD"].value == 5
+        assert root_state.scoped_data["2ROOT"].value == 5
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
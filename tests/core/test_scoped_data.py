@@ -72,5 +72,104 @@ def test_scoped_data(caplog):
         testing_utils.test_multithreading_lock.release()
 
 
+def test_data_flow_routing():
+    root_state = create_state_machine().root_state
+    state1, state2 = sorted(root_state.states.values(), key=lambda state: state.name)
+    root_input_id = root_state.get_io_data_port_id_from_name_and_type("data_input_port1", InputDataPort)
+    state1_input_id = state1.get_io_data_port_id_from_name_and_type("data_input_port1", InputDataPort)
+    state2_output_id = state2.get_io_data_port_id_from_name_and_type("data_output_port1", OutputDataPort)
+
+    root_state.add_input_data_to_scoped_data({"data_input_port1": 1.0})
+    assert root_state.get_inputs_for_state(state1) == {"data_input_port1": 1.0}
+
+    # the routing has to follow modifications of the data flows
+    data_flow_id = [df_id for df_id, df in root_state.data_flows.iteritems() if df.to_state == state1.state_id][0]
+    root_state.remove_data_flow(data_flow_id)
+    assert root_state.get_inputs_for_state(state1) == {"data_input_port1": None}
+    data_flow_id = root_state.add_data_flow(root_state.state_id, root_input_id, state2.state_id,
+                                            state2.get_io_data_port_id_from_name_and_type("data_input_port1",
+                                                                                          InputDataPort))
+    root_state.data_flows[data_flow_id].modify_target(state1.state_id, state1_input_id)
+    assert root_state.get_inputs_for_state(state1) == {"data_input_port1": 1.0}
+
+    # forward data to scoped variables
+    scoped_variable_id = root_state.add_scoped_variable("scoped_variable", "float", 0.)
+    root_state.add_data_flow(root_state.state_id, root_input_id, root_state.state_id, scoped_variable_id)
+    root_state.add_input_data_to_scoped_data({"data_input_port1": 2.0})
+    assert root_state.scoped_data[str(scoped_variable_id) + root_state.state_id].value == 2.0
+
+    root_state.add_data_flow(state2.state_id, state2_output_id, root_state.state_id, scoped_variable_id)
+    root_state.update_scoped_variables_with_output_dictionary({"data_output_port1": 3.0}, state2)
+    assert root_state.scoped_data[str(scoped_variable_id) + root_state.state_id].value == 3.0
+
+    # write the output data of the container state
+    root_state.add_state_execution_output_to_scoped_data({"data_output_port1": 4.0}, state2)
+    output_dict = {}
+    root_state.output_data = {"data_output_port1": None}
+    root_state.write_output_data(output_dict)
+    assert output_dict == {"data_output_port1": 4.0}
+
+
+
+def test_pass_by_reference():
+    from rafcon.utils.type_helpers import copy_value
+    value = [1, 2]
+    assert copy_value(value) == value and copy_value(value) is not value
+    assert copy_value(value, per_reference=True) is value
+    immutable_value = (1, "a", (2., None))
+    assert copy_value(immutable_value) is immutable_value
+    mutable_tuple = (1, [])
+    copied_tuple = copy_value(mutable_tuple)
+    assert copied_tuple == mutable_tuple and copied_tuple is not mutable_tuple
+    assert copied_tuple[1] is not mutable_tuple[1]
+
+    sm = create_state_machine()
+    root_state = sm.root_state
+    state1, state2 = sorted(root_state.states.values(), key=lambda state: state.name)
+    root_input_id = root_state.add_input_data_port("list_input", "list", [])
+    state1_input_port = state1.input_data_ports[state1.add_input_data_port("list_input", "list", [])]
+    root_state.add_data_flow(root_state.state_id, root_input_id, state1.state_id, state1_input_port.data_port_id)
+
+    root_state.add_input_data_to_scoped_data({"list_input": value})
+    assert root_state.get_inputs_for_state(state1)["list_input"] is not value
+    state1_input_port.pass_by_reference = True
+    assert root_state.get_inputs_for_state(state1)["list_input"] is value
+
+    # the policy is stored with the state machine
+    storage_path = testing_utils.get_unique_temp_path()
+    storage.save_state_machine_to_path(sm, storage_path)
+    sm_loaded = storage.load_state_machine_from_path(storage_path)
+    loaded_state1 = sm_loaded.root_state.states[state1.state_id]
+    assert loaded_state1.input_data_ports[state1_input_port.data_port_id].pass_by_reference
+    assert not state2.input_data_ports.values()[0].pass_by_reference
+    assert "pass_by_reference" not in state2.input_data_ports.values()[0].to_dict()
+
+
+def test_scoped_variable_pass_by_reference():
+    import copy
+    sm = create_state_machine()
+    root_state = sm.root_state
+    default_value = [1, 2]
+    scoped_variable = root_state.scoped_variables[root_state.add_scoped_variable("list_variable", "list",
+                                                                                 default_value)]
+    scoped_variable.pass_by_reference = True
+    assert copy.copy(scoped_variable).pass_by_reference
+
+    # the scoped data of the scoped variable is not copied
+    root_state.add_default_values_of_scoped_variables_to_scoped_data()
+    scoped_data = root_state.scoped_data[str(scoped_variable.data_port_id) + root_state.state_id]
+    assert scoped_data.pass_by_reference
+    assert copy.copy(scoped_data).value is scoped_data.value
+
+    # the policy is stored with the state machine
+    storage_path = testing_utils.get_unique_temp_path()
+    storage.save_state_machine_to_path(sm, storage_path)
+    sm_loaded = storage.load_state_machine_from_path(storage_path)
+    assert sm_loaded.root_state.scoped_variables[scoped_variable.data_port_id].pass_by_reference
+    other_scoped_variable_id = root_state.add_scoped_variable("float_variable", "float", 0.)
+    assert "pass_by_reference" not in root_state.scoped_variables[other_scoped_variable_id].to_dict()
+
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
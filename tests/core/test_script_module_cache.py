@@ -0,0 +1,84 @@
+import pytest
+
+# core elements
+from rafcon.core.script import Script
+
+# test environment elements
+import testing_utils
+
+COUNTER_SCRIPT = """
+counter = 0
+
+def execute(self, inputs, outputs, gvm):
+    global counter
+    counter += 1
+    outputs["counter"] = counter
+    return 0
+"""
+
+
+def execute_script(script):
+    # the outputs must not be empty, as Script.execute replaces an empty dict by a new one
+    outputs = {"counter": None}
+    script.execute(None, {}, outputs)
+    return outputs["counter"]
+
+
+def test_module_reuse():
+    script = Script()
+    script.script = COUNTER_SCRIPT
+
+    script.build_module(reuse_module=True)
+    compiled_module = script.compiled_module
+    assert execute_script(script) == 1
+    script.build_module(reuse_module=True)
+    assert script.compiled_module is compiled_module
+    assert execute_script(script) == 2
+
+    # fresh module globals are requested
+    script.build_module()
+    assert script.compiled_module is not compiled_module
+    assert execute_script(script) == 1
+
+    # a changed script has to be compiled again
+    compiled_module = script.compiled_module
+    script.script = COUNTER_SCRIPT.replace("counter = 0", "counter = 10")
+    script.build_module(reuse_module=True)
+    assert script.compiled_module is not compiled_module
+    assert execute_script(script) == 11
+
+
+def test_fresh_module_config(caplog):
+    from rafcon.core.states.execution_state import ExecutionState
+    from rafcon.core.states.hierarchy_state import HierarchyState
+    from rafcon.core.state_machine import StateMachine
+    import rafcon.core.singleton
+
+    for fresh_module, expected_counter in [(False, 2), (True, 1)]:
+        testing_utils.initialize_environment_core(core_config={'EXECUTION_SCRIPT_FRESH_MODULE': fresh_module})
+        execution_state = ExecutionState("counter_state")
+        execution_state.script_text = COUNTER_SCRIPT
+        execution_state.add_output_data_port("counter", "int")
+        root_state = HierarchyState("root_state")
+        root_state.add_state(execution_state)
+        root_state.set_start_state(execution_state.state_id)
+        root_state.add_output_data_port("counter", "int")
+        root_state.add_data_flow(execution_state.state_id, execution_state.output_data_ports.keys()[0],
+                                 root_state.state_id, root_state.output_data_ports.keys()[0])
+        root_state.add_transition(execution_state.state_id, 0, root_state.state_id, 0)
+        state_machine = StateMachine(root_state)
+
+        rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+        rafcon.core.singleton.state_machine_manager.active_state_machine_id = state_machine.state_machine_id
+        try:
+            for _ in range(2):
+                rafcon.core.singleton.state_machine_execution_engine.start()
+                rafcon.core.singleton.state_machine_execution_engine.join()
+            assert root_state.output_data["counter"] == expected_counter
+        finally:
+            rafcon.core.singleton.state_machine_manager.remove_state_machine(state_machine.state_machine_id)
+            testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -3,6 +3,7 @@ from pytest import raises
 # state machine
 from rafcon.core.states.execution_state import ExecutionState
 from rafcon.core.states.container_state import ContainerState
+from rafcon.core.states.hierarchy_state import HierarchyState
 from rafcon.core.states.barrier_concurrency_state import BarrierConcurrencyState
 from rafcon.core.states.state import InputDataPort
 from testing_utils import assert_logger_warnings_and_errors
@@ -256,8 +257,36 @@ def test_port_and_outcome_removal(caplog):
     assert_logger_warnings_and_errors(caplog)
 
 
+def test_state_path_cache(caplog):
+    root_state = HierarchyState("root", state_id="ROOT")
+    child_state = HierarchyState("child", state_id="CHILD")
+    grandchild_state = ExecutionState("grandchild", state_id="GRANDCHILD")
+    child_state.add_state(grandchild_state)
+    root_state.add_state(child_state)
+
+    assert grandchild_state.get_path() == "ROOT/CHILD/GRANDCHILD"
+    assert grandchild_state.get_path(by_name=True) == "root/child/grandchild"
+    assert grandchild_state.get_path("APPENDIX") == "ROOT/CHILD/GRANDCHILD/APPENDIX"
+
+    # the cached paths of all descendants are updated
+    child_state.name = "renamed"
+    assert grandchild_state.get_path(by_name=True) == "root/renamed/grandchild"
+    assert grandchild_state.get_path() == "ROOT/CHILD/GRANDCHILD"
+    root_state.change_state_id("NEW_ROOT")
+    assert grandchild_state.get_path() == "NEW_ROOT/CHILD/GRANDCHILD"
+
+    child_state.remove_state("GRANDCHILD", recursive=False, destroy=False)
+    assert grandchild_state.get_path() == "GRANDCHILD"
+    root_state.add_state(grandchild_state)
+    assert grandchild_state.get_path() == "NEW_ROOT/GRANDCHILD"
+    assert grandchild_state.get_path(by_name=True) == "root/grandchild"
+
+    assert_logger_warnings_and_errors(caplog)
+
+
 if __name__ == '__main__':
     test_create_state(None)
     test_port_and_outcome_removal(None)
     test_create_container_state(None)
+    test_state_path_cache(None)
     # pytest.main([__file__])
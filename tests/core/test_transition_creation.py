@@ -85,5 +85,58 @@ def test_transition_creation(caplog):
     rafcon.core.singleton.state_machine_manager.delete_all_state_machines()
 
 
+def test_transition_index():
+    state1 = ExecutionState("DummyState1")
+    state1.add_outcome('dummy_outcome_1', 3)
+    state1.add_outcome('dummy_outcome_2', 4)
+    state2 = ExecutionState("DummyState2")
+    state2.add_outcome('dummy_outcome_1', 3)
+
+    root_state = HierarchyState("DummyHierarchyState")
+    root_state.add_state(state1)
+    root_state.add_state(state2)
+    root_state.add_outcome("final_outcome", 5)
+    root_state.set_start_state(state1.state_id)
+
+    t1_id = root_state.add_transition(state1.state_id, 3, state2.state_id, None)
+    t2_id = root_state.add_transition(state2.state_id, 3, root_state.state_id, 5)
+    outcome_3 = state1.outcomes[3]
+    outcome_4 = state1.outcomes[4]
+
+    assert root_state.get_transition_for_outcome(state1, outcome_3) is root_state.transitions[t1_id]
+    assert root_state.get_transition_for_outcome(state1, outcome_4) is None
+    assert root_state.start_state_id == state1.state_id
+    with raises(AttributeError):
+        root_state.check_if_outcome_already_connected(state1.state_id, 3)
+
+    # changing the origin of a transition
+    root_state.transitions[t1_id].from_outcome = 4
+    assert root_state.get_transition_for_outcome(state1, outcome_3) is None
+    assert root_state.get_transition_for_outcome(state1, outcome_4) is root_state.transitions[t1_id]
+    root_state.transitions[t1_id].modify_origin(state1.state_id, 3)
+    assert root_state.get_transition_for_outcome(state1, outcome_3) is root_state.transitions[t1_id]
+    # invalid origin changes must not corrupt the index
+    with raises(ValueError):
+        root_state.transitions[t2_id].modify_origin(state1.state_id, 3)
+    assert root_state.get_transition_for_outcome(state1, outcome_3) is root_state.transitions[t1_id]
+    assert root_state.get_transition_for_outcome(state2, state2.outcomes[3]) is root_state.transitions[t2_id]
+
+    # removing a transition
+    root_state.remove_transition(t1_id)
+    assert root_state.get_transition_for_outcome(state1, outcome_3) is None
+    root_state.check_if_outcome_already_connected(state1.state_id, 3)
+
+    # replacing all transitions
+    root_state.transitions = {}
+    assert root_state.get_transition_for_outcome(state2, state2.outcomes[3]) is None
+    assert root_state.start_state_id is None
+
+    # changing the id of the container state
+    root_state.add_transition(state2.state_id, 3, root_state.state_id, 5)
+    root_state.change_state_id()
+    assert root_state.get_transition_for_outcome(state2, state2.outcomes[3]).to_state == root_state.state_id
+
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
@@ -231,6 +231,64 @@ def test_backward_stepping_barrier_state(caplog):
         testing_utils.shutdown_environment(caplog=caplog)
 
 
+def get_tree_rows(tree_store, parent_iter=None):
+    rows = []
+    child_iter = tree_store.iter_children(parent_iter)
+    while child_iter is not None:
+        rows.append((tree_store.get_value(child_iter, 0), get_tree_rows(tree_store, child_iter)))
+        child_iter = tree_store.iter_next(child_iter)
+    return rows
+
+
+def execute_forwards_backwards_with_execution_history_tree():
+    from rafcon.core.singleton import state_machine_execution_engine
+    import rafcon.gui.singleton as gui_singleton
+
+    menubar_ctrl = gui_singleton.main_window_controller.get_controller('menu_bar_controller')
+    execution_history_ctrl = gui_singleton.main_window_controller.get_controller('execution_history_ctrl')
+    call_gui_callback(
+        menubar_ctrl.on_open_activate, None, None,
+        testing_utils.get_test_sm_path(os.path.join("unit_test_state_machines", "backward_step_library_execution_test"))
+    )
+    testing_utils.wait_for_gui()
+    state_machine_execution_engine.synchronization_lock.acquire()
+    state_machine_execution_engine.synchronization_counter = 0
+    state_machine_execution_engine.synchronization_lock.release()
+
+    call_gui_callback(menubar_ctrl.on_step_mode_activate, None, None)
+    wait_for_execution_engine_sync_counter(1, logger)
+
+    for step_activate, number_of_steps in [(menubar_ctrl.on_step_into_activate, 3),
+                                           (menubar_ctrl.on_backward_step_activate, 2),
+                                           (menubar_ctrl.on_step_into_activate, 2)]:
+        for i in range(number_of_steps):
+            call_gui_callback(step_activate, None, None)
+            wait_for_execution_engine_sync_counter(1, logger)
+        call_gui_callback(execution_history_ctrl.update_incrementally)
+
+    # the incrementally updated tree does not show the items removed by the backward steps
+    incrementally_updated_rows = get_tree_rows(execution_history_ctrl.history_tree_store)
+    call_gui_callback(execution_history_ctrl.update)
+    assert incrementally_updated_rows == get_tree_rows(execution_history_ctrl.history_tree_store)
+
+    call_gui_callback(menubar_ctrl.on_stop_activate, None)
+
+
+def test_execution_history_tree_after_backward_stepping(caplog):
+    testing_utils.run_gui(gui_config={'HISTORY_ENABLED': False, 'AUTO_BACKUP_ENABLED': False},
+                          libraries={'unit_test': os.path.join(testing_utils.TESTS_PATH, 'assets',
+                                                               'unit_test_state_machines',
+                                                               'backward_step_library_execution_test', 'test_library')
+                                     }
+                          )
+    call_gui_callback(initialize_global_variables)
+    try:
+        execute_forwards_backwards_with_execution_history_tree()
+    finally:
+        testing_utils.close_gui()
+        testing_utils.shutdown_environment(caplog=caplog)
+
+
 if __name__ == '__main__':
     # test_backward_stepping_library_state(None)
     test_backward_stepping_barrier_state(None)
@@ -308,6 +308,38 @@ def test_storage_with_gui(with_gui, caplog):
     print "test storage with gui {0} finished".format(with_gui)
 
 
+def save_packed_state_machine():
+    import rafcon
+    import rafcon.gui.helpers.state_machine as gui_helper_state_machine
+    from rafcon.core.storage import storage
+    from rafcon.core.storage.packed_storage import PACKED_STATE_MACHINE_EXTENSION, PackedStateMachineFile
+
+    call_gui_callback(create_models)
+    state_machine = rafcon.core.singleton.state_machine_manager.get_active_state_machine()
+    packed_path = os.path.join(testing_utils.get_unique_temp_path(), "packed" + PACKED_STATE_MACHINE_EXTENSION)
+    assert call_gui_callback(gui_helper_state_machine.save_state_machine_as, packed_path)
+    assert state_machine.file_system_path == packed_path
+
+    # the meta data of the GUI is part of the packed file
+    packed_file = PackedStateMachineFile(packed_path)
+    try:
+        assert storage.FILE_NAME_META_DATA in packed_file
+        assert os.path.join(state_machine.root_state.get_storage_path(), storage.FILE_NAME_META_DATA) in packed_file
+        for child_state in state_machine.root_state.states.itervalues():
+            assert os.path.join(child_state.get_storage_path(), storage.FILE_NAME_META_DATA) in packed_file
+    finally:
+        packed_file.close()
+
+
+def test_packed_storage_with_gui(caplog):
+    testing_utils.run_gui(gui_config={'HISTORY_ENABLED': False, 'AUTO_BACKUP_ENABLED': False})
+    try:
+        save_packed_state_machine()
+    finally:
+        testing_utils.close_gui()
+        testing_utils.shutdown_environment(caplog=caplog)
+
+
 # TODO add examples of bad naming that cause before problems \n or [ ] and so on
 def check_state_recursively_if_state_scripts_are_valid(state):
     from rafcon.core.states.container_state import ContainerState
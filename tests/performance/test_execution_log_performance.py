@@ -0,0 +1,103 @@
+import os
+import pickle
+import pytest
+
+import rafcon.utils.execution_log as log_helper
+from rafcon.core.execution.execution_history import ExecutionHistoryStorage
+
+import testing_utils
+
+NUMBER_OF_LOG_ITEMS = 200000
+
+
+def generate_execution_log(number_of_items):
+    """Generates the records of an execution log
+
+    The log consists of a hierarchy state executing an execution state in a loop. Each tenth iteration is a
+    barrier concurrency state with two execution states instead.
+
+    :param int number_of_items: the approximate number of records
+    :return: a dict mapping history_item_id --> record
+    """
+    records = {}
+    counter = [0]
+
+    def add_record(item_type, call_type, state_name, state_type, run_id, prev_id, data=None):
+        counter[0] += 1
+        history_item_id = "history_item_id.%020d" % counter[0]
+        pickled_data = {'value': pickle.dumps(data)} if data is not None else {}
+        records[history_item_id] = {
+            'item_type': item_type, 'call_type': call_type, 'state_name': state_name, 'state_type': state_type,
+            'run_id': run_id, 'prev_history_item_id': prev_id, 'history_item_id': history_item_id,
+            'timestamp': float(counter[0]), 'path': state_name, 'path_by_name': state_name, 'description': None,
+            'semantic_data': {}, 'is_library': False, 'library_state_name': None, 'library_name': None,
+            'library_path': None, 'input_output_data': pickled_data, 'scoped_data': {},
+            'outcome_name': 'success', 'outcome_id': 0}
+        return history_item_id
+
+    def add_execution(prev_id, state_name, run_id):
+        prev_id = add_record('CallItem', 'EXECUTE', state_name, 'ExecutionState', run_id, prev_id, 1)
+        return add_record('ReturnItem', 'EXECUTE', state_name, 'ExecutionState', run_id, prev_id, 2)
+
+    prev_id = add_record('StateMachineStartItem', 'EXECUTE', 'StateMachineStartItem', 'StateMachine',
+                         'run_id.start', None)
+    records[prev_id].update({'root_state_storage_id': 'root', 'state_machine_version': None,
+                             'used_rafcon_version': '0.0.0', 'creation_time': None, 'last_update': None,
+                             'os_environment': {}})
+    prev_id = add_record('CallItem', 'CONTAINER', 'root', 'HierarchyState', 'run_id.root', prev_id)
+    iteration = 0
+    while counter[0] < number_of_items:
+        iteration += 1
+        if iteration % 10:
+            prev_id = add_execution(prev_id, "loop", "run_id.%d" % iteration)
+        else:
+            run_id = "run_id.%d" % iteration
+            prev_id = add_record('CallItem', 'EXECUTE', 'barrier', 'BarrierConcurrencyState', run_id, prev_id)
+            prev_id = add_record('CallItem', 'CONTAINER', 'barrier', 'BarrierConcurrencyState', run_id, prev_id)
+            concurrency_id = add_record('ConcurrencyItem', 'CONTAINER', 'barrier', 'BarrierConcurrencyState',
+                                        run_id, prev_id)
+            for branch in range(2):
+                add_execution(concurrency_id, "branch", "run_id.%d.%d" % (iteration, branch))
+            prev_id = add_record('ReturnItem', 'CONTAINER', 'barrier', 'BarrierConcurrencyState', run_id,
+                                 concurrency_id)
+            prev_id = add_record('ReturnItem', 'EXECUTE', 'barrier', 'BarrierConcurrencyState', run_id, prev_id)
+    add_record('ReturnItem', 'CONTAINER', 'root', 'HierarchyState', 'run_id.root', prev_id)
+    return records
+
+
+@pytest.fixture(scope="module")
+def execution_log():
+    """Writes the generated records to a shelve log file, so that the benchmarks include reading the file
+
+    :return: the path of the log file and the number of records
+    """
+    records = generate_execution_log(NUMBER_OF_LOG_ITEMS)
+    filename = os.path.join(testing_utils.get_unique_temp_path(), "execution_log_performance.shelve")
+    execution_history_storage = ExecutionHistoryStorage(filename, asynchronous=False, log_format="shelve")
+    try:
+        for key, record in records.iteritems():
+            execution_history_storage.store_item(key, record)
+    finally:
+        execution_history_storage.close()
+    return filename, len(records)
+
+
+def test_log_to_raw_structure(benchmark, execution_log):
+    filename, number_of_records = execution_log
+    start_item, previous, next_, concurrent, grouped = benchmark.pedantic(
+        log_helper.log_to_raw_structure, args=(filename,), iterations=1, rounds=3)
+    assert start_item['item_type'] == 'StateMachineStartItem'
+    assert len(previous) == number_of_records - 1
+
+
+def test_log_to_collapsed_structure(benchmark, execution_log):
+    filename, number_of_records = execution_log
+    start_item, next_, concurrent, hierarchy, collapsed_items = benchmark.pedantic(
+        log_helper.log_to_collapsed_structure, args=(filename,), iterations=1, rounds=3)
+    assert start_item['state_name'] == 'StateMachineStartItem'
+    assert len(concurrent['run_id.10']) == 2
+    assert collapsed_items['run_id.1']['data_outs']['value'] == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
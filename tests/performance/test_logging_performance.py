@@ -0,0 +1,89 @@
+import logging
+import pytest
+
+from rafcon.core.global_variable_manager import GlobalVariableManager
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+import rafcon.core.singleton
+from rafcon.utils import log
+
+import testing_utils
+
+NUMBER_OF_STEPS = 10000
+# the value of a global variable, whose string conversion is expensive
+LARGE_VALUE = range(10000)
+
+# each step sets a global variable with a value, whose string conversion is expensive
+LOOP_SCRIPT = """
+def execute(self, inputs, outputs, gvm):
+    counter = gvm.get_variable("logging_performance_counter") + 1
+    gvm.set_variable("logging_performance_counter", counter)
+    gvm.set_variable("logging_performance_value", range(10000), per_reference=True)
+    return "success" if counter >= {0} else "loop"
+""".format(NUMBER_OF_STEPS)
+
+logger = log.get_logger("rafcon.core")
+
+
+def create_loop_state_machine():
+    loop_state = ExecutionState("loop_state")
+    loop_state.script_text = LOOP_SCRIPT
+    loop_outcome_id = loop_state.add_outcome("loop")
+    root_state = HierarchyState("root_state")
+    root_state.add_state(loop_state)
+    root_state.set_start_state(loop_state.state_id)
+    root_state.add_transition(loop_state.state_id, loop_outcome_id, loop_state.state_id, None)
+    root_state.add_transition(loop_state.state_id, 0, root_state.state_id, 0)
+    return StateMachine(root_state)
+
+
+@pytest.fixture
+def info_log_level(monkeypatch):
+    """Filters the debug messages of the core, as during an execution without GUI"""
+    monkeypatch.setattr(logger, "level", logging.INFO)
+
+
+@pytest.mark.parametrize("log_level", [logging.DEBUG, logging.INFO])
+def test_state_machine_step_logging(benchmark, monkeypatch, caplog, log_level):
+    """Executes a state machine with NUMBER_OF_STEPS steps with and without debug messages of the core"""
+    monkeypatch.setattr(logger, "level", log_level)
+    testing_utils.initialize_environment_core()
+    state_machine = create_loop_state_machine()
+    rafcon.core.singleton.state_machine_manager.add_state_machine(state_machine)
+    rafcon.core.singleton.state_machine_manager.active_state_machine_id = state_machine.state_machine_id
+
+    def reset_state_machine():
+        state_machine.clear_execution_histories()
+        rafcon.core.singleton.global_variable_manager.set_variable("logging_performance_counter", 0)
+
+    def execute_state_machine():
+        rafcon.core.singleton.state_machine_execution_engine.start()
+        rafcon.core.singleton.state_machine_execution_engine.join()
+
+    try:
+        benchmark.pedantic(execute_state_machine, setup=reset_state_machine, iterations=1, rounds=5)
+        assert rafcon.core.singleton.global_variable_manager.get_variable("logging_performance_counter") == \
+            NUMBER_OF_STEPS
+    finally:
+        testing_utils.shutdown_environment_only_core(caplog=caplog)
+
+
+def test_finalize_steps(benchmark, info_log_level):
+    state = ExecutionState("state")
+
+    def finalize_steps():
+        for _ in range(NUMBER_OF_STEPS):
+            state.finalize(state.outcomes[0])
+
+    benchmark.pedantic(finalize_steps, iterations=1, rounds=5)
+
+
+def test_set_global_variable_steps(benchmark, info_log_level):
+    global_variable_manager = GlobalVariableManager()
+
+    def set_variable_steps():
+        for _ in range(NUMBER_OF_STEPS):
+            global_variable_manager.set_variable("key", LARGE_VALUE, per_reference=True)
+
+    benchmark.pedantic(set_variable_steps, iterations=1, rounds=5)
@@ -0,0 +1,65 @@
+import os
+import pytest
+
+from rafcon.core.config import global_config
+from rafcon.core.states.execution_state import ExecutionState
+from rafcon.core.states.hierarchy_state import HierarchyState
+from rafcon.core.state_machine import StateMachine
+from rafcon.core.storage import storage
+
+import testing_utils
+
+NUMBER_OF_CONTAINER_STATES = 50
+NUMBER_OF_CHILD_STATES = 100
+NUMBER_OF_LOAD_THREADS = 8
+
+
+def create_state_machine(number_of_container_states, number_of_child_states):
+    """Creates a state machine with a root state, its container states and their execution states
+
+    :param int number_of_container_states: the number of hierarchy states in the root state
+    :param int number_of_child_states: the number of execution states in each hierarchy state
+    :return: the state machine
+    """
+    root_state = HierarchyState("root_state")
+    for i in range(number_of_container_states):
+        container_state = HierarchyState("container_state_{0}".format(i))
+        for j in range(number_of_child_states):
+            child_state = ExecutionState("child_state_{0}_{1}".format(i, j))
+            child_state.add_input_data_port("input", "int", j)
+            child_state.add_output_data_port("output", "int")
+            container_state.add_state(child_state)
+        root_state.add_state(container_state)
+    return StateMachine(root_state)
+
+
+@pytest.fixture(scope="module")
+def state_machine_path():
+    testing_utils.initialize_environment_core()
+    try:
+        path = os.path.join(testing_utils.get_unique_temp_path(), "load_performance")
+        storage.save_state_machine_to_path(create_state_machine(NUMBER_OF_CONTAINER_STATES, NUMBER_OF_CHILD_STATES),
+                                           path)
+        yield path
+    finally:
+        testing_utils.shutdown_environment_only_core()
+
+
+@pytest.mark.parametrize("number_of_threads", [0, NUMBER_OF_LOAD_THREADS])
+def test_load_state_machine(benchmark, state_machine_path, number_of_threads):
+    global_config.set_config_value("STORAGE_LOAD_THREADS", number_of_threads)
+    state_machine = benchmark.pedantic(storage.load_state_machine_from_path, args=(state_machine_path,),
+                                       iterations=1, rounds=3)
+    number_of_states, _ = state_machine.root_state.get_states_statistics(0)
+    assert number_of_states == 1 + NUMBER_OF_CONTAINER_STATES * (1 + NUMBER_OF_CHILD_STATES)
+
+
+def test_read_state_directories(benchmark, state_machine_path):
+    root_state_path = storage.read_state_directory(state_machine_path).child_state_paths[0]
+    state_directories = benchmark.pedantic(storage.read_state_directories,
+                                           args=(root_state_path, NUMBER_OF_LOAD_THREADS), iterations=1, rounds=3)
+    assert len(state_directories) == 1 + NUMBER_OF_CONTAINER_STATES * (1 + NUMBER_OF_CHILD_STATES)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
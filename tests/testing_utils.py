@@ -227,6 +227,10 @@ def initialize_environment_core(core_config=None, libraries=None, delete=False):
             for key, value in core_config.iteritems():
                 global_config.set_config_value(key, value)
 
+    # the library index of the tests must not be persisted to the cache of the user
+    if not isinstance(core_config, dict) or 'LIBRARY_INDEX_PATH' not in core_config:
+        global_config.set_config_value('LIBRARY_INDEX_PATH', join(RAFCON_TEMP_PATH_TEST_BASE, 'library_index.json'))
+
     rewind_and_set_libraries(libraries=libraries)
 
     # delete_all_state_machines must not be called here per default
@@ -438,7 +442,7 @@ def patch_gtkmvc_model_mt():
     print original_ModelMT_notify_observer, original_run_state_machine, original_state_start
     state_threads = []
 
-    def state_start(self, execution_history, backward_execution=False, generate_run_id=True):
+    def state_start(self, execution_history, backward_execution=False, generate_run_id=True, thread_pool=None):
         self.execution_history = execution_history
         if generate_run_id:
             self._run_id = run_id_generator()